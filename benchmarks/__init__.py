@@ -0,0 +1 @@
+"""Performance benchmarks for the PDF agent (run with `python -m benchmarks.<name>`)."""
@@ -0,0 +1,111 @@
+"""Compare the memory of indexed chunks held as per-chunk objects and in the columnar chunk store.
+
+Chunks come from synthetic page text run through `PDFProcessor.chunk_text`. The per-chunk layout is what
+the vector store kept before the chunk store: the document with its `PDFChunk` list plus a LangChain
+`Document` (with a merged metadata dict) per row. Memory is measured with tracemalloc; row lookups are
+timed too, since the chunk store builds a Document on every hit.
+
+Usage:
+    python -m benchmarks.chunk_store_benchmark --pages 20000
+"""
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Callable
+from uuid import uuid4
+
+from langchain_core.documents import Document
+
+from benchmarks.chunking_benchmark import synthetic_pages
+from pdf_agent.domain.pdf.pdf_document import PDFDocument
+from pdf_agent.infrastructure.pdf.pdf_processor import PDFProcessor
+from pdf_agent.infrastructure.vectorstore.chunk_store import ChunkColumns, ChunkStore
+
+
+def make_document(pages: int) -> PDFDocument:
+    now = datetime.now(timezone.utc)
+    return PDFDocument(
+        id=uuid4(),
+        filename='synthetic.pdf',
+        file_path='synthetic.pdf',
+        total_pages=pages,
+        file_size=0,
+        upload_date=now,
+        chunks=PDFProcessor().chunk_text(synthetic_pages(pages, 'dense')),
+        created_at=now,
+        updated_at=now
+    )
+
+
+def per_chunk_objects(pages: int) -> tuple[PDFDocument, dict[int, Document]]:
+    document = make_document(pages)
+    # Materialized as the PDFChunk list chunking used to return
+    document.chunks = list(document.chunks or [])
+    chunks = {
+        row: Document(
+            page_content=chunk.content,
+            metadata={
+                'chunk_id': chunk.chunk_id,
+                'document_id': str(document.id),
+                'page_number': chunk.page_number,
+                'chunk_index': chunk.chunk_index,
+                'filename': document.filename,
+                **chunk.metadata
+            }
+        )
+        for row, chunk in enumerate(document.chunks or [])
+    }
+    return document, chunks
+
+
+def columnar(pages: int) -> ChunkStore:
+    store = ChunkStore()
+    # Holds the chunks as chunking returned them: spans of the document text
+    store.add(ChunkColumns(make_document(pages), first_row=0))
+    return store
+
+
+def retained_mb(build: Callable[[int], Any], pages: int) -> tuple[Any, float]:
+    """Build a layout and return it with the memory it still holds once built, in MB."""
+    gc.collect()
+    tracemalloc.start()
+    result = build(pages)
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current / (1024 * 1024)
+
+
+def lookup_us(get: Callable[[int], Any], rows: list[int]) -> float:
+    started = time.perf_counter()
+    for row in rows:
+        get(row)
+    return (time.perf_counter() - started) / len(rows) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=20000, help='Dense synthetic pages (about 6 chunks each)')
+    parser.add_argument('--lookups', type=int, default=10000, help='Random row lookups to time')
+    args = parser.parse_args()
+
+    (_, objects), objects_mb = retained_mb(per_chunk_objects, args.pages)
+    store, store_mb = retained_mb(columnar, args.pages)
+    chunk_count = len(store)
+    rows = [random.randrange(chunk_count) for _ in range(args.lookups)]
+
+    print(f'{chunk_count} chunks from {args.pages} pages')
+    print(f"{'layout':>18} {'MB':>9} {'bytes/chunk':>12} {'lookup us':>10}")
+    for name, mb, get in (
+        ('per-chunk objects', objects_mb, objects.__getitem__),
+        ('chunk store', store_mb, store.get)
+    ):
+        print(f'{name:>18} {mb:>9.1f} {mb * 1024 * 1024 / chunk_count:>12.0f} {lookup_us(get, rows):>10.2f}')
+    print(f'chunk store uses {store_mb / objects_mb:.0%} of the per-chunk memory')
+
+
+if __name__ == '__main__':
+    main()
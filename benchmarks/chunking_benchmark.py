@@ -0,0 +1,88 @@
+"""Benchmark the offset chunker against the per-page LangChain splitter on synthetic page text.
+
+Pages are generated in memory (no PDF is written or parsed), so only chunking is measured: throughput
+in pages/second and, with tracemalloc, the peak traced memory of a run and the memory blocks its result
+still holds.
+
+Usage:
+    python -m benchmarks.chunking_benchmark --pages 1000 --densities dense sparse
+"""
+import argparse
+import random
+import time
+import tracemalloc
+
+from benchmarks.synthetic_pdf import DENSITIES, page_lines
+from pdf_agent.configs.env import CHUNK_OVERLAP, CHUNK_SIZE
+from pdf_agent.domain.shared.enumerations import ChunkingStrategy
+from pdf_agent.infrastructure.pdf.offset_chunker import DocumentText
+from pdf_agent.infrastructure.pdf.pdf_processor import PDFProcessor
+
+
+def synthetic_pages(pages: int, density: str, seed: int = 0) -> list[tuple[str, int]]:
+    """(text, page_number) pairs shaped like the output of `PDFProcessor.extract_text_from_pdf`."""
+    rng = random.Random(f'{seed}-{pages}-{density}')
+    return [('\n'.join(page_lines(rng, page, density)), page) for page in range(1, pages + 1)]
+
+
+def measure(chunk, text_with_pages: list[tuple[str, int]], repeat: int) -> dict:
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        chunk(text_with_pages)
+        best = min(best, time.perf_counter() - started)
+
+    # Separate traced run; tracemalloc slows allocation down too much to time alongside it
+    tracemalloc.start()
+    chunks = chunk(text_with_pages)
+    snapshot = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'chunks': len(chunks),
+        'seconds': best,
+        'pages_per_second': len(text_with_pages) / best if best else 0.0,
+        'retained_blocks': sum(stat.count for stat in snapshot.statistics('filename')),
+        'peak_mb': peak / (1024 * 1024)
+    }
+
+
+def run(pages: int, densities: list[str], repeat: int) -> list[dict]:
+    results = []
+    for density in densities:
+        text_with_pages = synthetic_pages(pages, density)
+        for strategy in ChunkingStrategy:
+            processor = PDFProcessor(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP, chunking_strategy=strategy)
+            results.append({
+                'density': density,
+                'strategy': strategy.value,
+                **measure(processor.chunk_text, text_with_pages, repeat)
+            })
+
+        # Spans alone, without the ids and arrays `chunk_text` builds from them
+        chunker = PDFProcessor(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP).offset_chunker
+        results.append({
+            'density': density,
+            'strategy': 'offset (spans only)',
+            **measure(lambda pages_: list(chunker.chunk(DocumentText(pages_))), text_with_pages, repeat)
+        })
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=1000, help='Pages per document')
+    parser.add_argument('--densities', nargs='+', choices=list(DENSITIES), default=list(DENSITIES),
+                        help='Amounts of text per page')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed runs per case (best is reported)')
+    args = parser.parse_args()
+
+    print(f"{'density':>8} {'strategy':>20} {'chunks':>7} {'seconds':>8} {'pages/s':>9} {'retained':>9} {'peak MB':>8}")
+    for row in run(args.pages, args.densities, args.repeat):
+        print(f"{row['density']:>8} {row['strategy']:>20} {row['chunks']:>7} {row['seconds']:>8.3f} "
+              f"{row['pages_per_second']:>9.0f} {row['retained_blocks']:>9} {row['peak_mb']:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
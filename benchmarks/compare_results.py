@@ -0,0 +1,78 @@
+"""Compare two ingestion benchmark result files and fail on regressions.
+
+A metric regresses when it is more than --threshold (relative) worse than the baseline. Timings below
+--min-seconds in the baseline are ignored, being mostly noise. Exits with status 1 on any regression.
+
+Usage:
+    python -m benchmarks.compare_results baseline.json benchmark-results.json --threshold 0.2
+"""
+import argparse
+import json
+import sys
+
+from benchmarks.ingestion_benchmark import STAGES
+
+METRICS = [f'{stage}_seconds' for stage in STAGES] + ['total_seconds', 'peak_rss_mb']
+
+
+def compare(baseline: dict, current: dict, threshold: float, min_seconds: float) -> tuple[list[dict], list[str]]:
+    """Return one row per (case, metric) present in both files, and the cases missing from `current`."""
+    current_cases = {row['case']: row for row in current['results']}
+    rows, missing = [], []
+    for base in baseline['results']:
+        row = current_cases.get(base['case'])
+        if row is None:
+            missing.append(base['case'])
+            continue
+        for metric in METRICS:
+            if metric not in base or metric not in row:
+                continue
+            before, after = base[metric], row[metric]
+            change = (after - before) / before if before else 0.0
+            ignored = metric.endswith('_seconds') and before < min_seconds
+            rows.append({
+                'case': base['case'],
+                'metric': metric,
+                'baseline': before,
+                'current': after,
+                'change': change,
+                'regression': not ignored and change > threshold
+            })
+    return rows, missing
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('baseline', help='Result file of the reference run')
+    parser.add_argument('current', help='Result file of the run to check')
+    parser.add_argument('--threshold', type=float, default=0.2, help='Allowed relative slowdown or growth')
+    parser.add_argument('--min-seconds', type=float, default=0.05, help='Ignore timings shorter than this')
+    args = parser.parse_args()
+
+    with open(args.baseline) as baseline_file, open(args.current) as current_file:
+        baseline, current = json.load(baseline_file), json.load(current_file)
+
+    for key in ('embedding_model', 'embedding_backend', 'cpu_count'):
+        if baseline['environment'].get(key) != current['environment'].get(key):
+            print(f"Warning: {key} differs ({baseline['environment'].get(key)} vs "
+                  f"{current['environment'].get(key)}), results may not be comparable", file=sys.stderr)
+
+    rows, missing = compare(baseline, current, args.threshold, args.min_seconds)
+
+    print(f"{'case':>12} {'metric':>20} {'baseline':>10} {'current':>10} {'change':>8}")
+    for row in rows:
+        flag = '  REGRESSION' if row['regression'] else ''
+        print(f"{row['case']:>12} {row['metric']:>20} {row['baseline']:>10.3f} {row['current']:>10.3f} "
+              f"{row['change']:>+7.1%}{flag}")
+    for case in missing:
+        print(f'{case:>12} missing from {args.current}')
+
+    regressions = [row for row in rows if row['regression']]
+    if regressions or missing:
+        print(f'{len(regressions)} regression(s) above {args.threshold:.0%}, {len(missing)} missing case(s)',
+              file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
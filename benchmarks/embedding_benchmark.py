@@ -0,0 +1,107 @@
+"""Benchmark embedding throughput (chunks/second) per backend and check parity with the torch reference.
+
+Every backend embeds the same chunks; its vectors are compared with the full-precision torch ones by
+cosine similarity. The run fails (exit status 1) when any backend's minimum cosine is below --min-cosine.
+
+Usage:
+    python -m benchmarks.embedding_benchmark path/to/manual.pdf --backends torch torch-int8 onnx
+    python -m benchmarks.embedding_benchmark --chunks 2000
+"""
+import argparse
+import random
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.synthetic_pdf import synthetic_text
+from pdf_agent.domain.shared.enumerations import EmbeddingBackend
+from pdf_agent.infrastructure.pdf.pdf_processor import PDFProcessor
+from pdf_agent.infrastructure.vectorstore.embedding_backends import create_embeddings
+
+DEFAULT_MODEL = 'sentence-transformers/all-MiniLM-L6-v2'
+
+
+def load_chunks(pdf_path: str | None, count: int) -> list[str]:
+    if pdf_path:
+        document = PDFProcessor().process_pdf(pdf_path)
+        return [chunk.content for chunk in document.chunks or []][:count]
+
+    # Manual-like filler of roughly chunk size, deterministic so runs are comparable
+    rng = random.Random(0)
+    return [synthetic_text(rng, 150) for _ in range(count)]
+
+
+def run(model_name: str, backends: list[EmbeddingBackend], texts: list[str], repeat: int, onnx_file: str) -> list[dict]:
+    reference = None
+    results = []
+    for backend in [EmbeddingBackend.TORCH] + [b for b in backends if b != EmbeddingBackend.TORCH]:
+        try:
+            started = time.perf_counter()
+            embeddings = create_embeddings(model_name, backend, onnx_file)
+            load_seconds = time.perf_counter() - started
+        except ImportError as e:
+            print(f'Skipping {backend.value}: {e}', file=sys.stderr)
+            continue
+
+        # Warm up so lazy initialization (and ONNX export) is not billed to the timed runs
+        embeddings.embed_documents(texts[:32])
+
+        best = float('inf')
+        vectors = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            vectors = np.asarray(embeddings.embed_documents(texts), dtype=np.float32)
+            best = min(best, time.perf_counter() - started)
+        assert vectors is not None
+
+        if reference is None:
+            reference = vectors
+        # Embeddings are normalized, so the row-wise dot product is the cosine similarity
+        cosines = np.einsum('ij,ij->i', vectors, reference)
+
+        if backend in backends:
+            results.append({
+                'backend': backend.value,
+                'load_seconds': load_seconds,
+                'seconds': best,
+                'chunks_per_second': len(texts) / best if best else 0.0,
+                'min_cosine': float(cosines.min()),
+                'mean_cosine': float(cosines.mean())
+            })
+
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('pdf_path', nargs='?', help='PDF whose chunks are embedded (synthetic text when omitted)')
+    parser.add_argument('--model', default=DEFAULT_MODEL, help='sentence-transformers model name')
+    parser.add_argument('--backends', nargs='+', default=[b.value for b in EmbeddingBackend],
+                        choices=[b.value for b in EmbeddingBackend], help='Backends to benchmark')
+    parser.add_argument('--onnx-file', default='', help='ONNX file inside the model repository for the onnx backend')
+    parser.add_argument('--chunks', type=int, default=1000, help='Maximum number of chunks to embed')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per backend (best is reported)')
+    parser.add_argument('--min-cosine', type=float, default=0.99, help='Fail when a backend agrees less than this')
+    args = parser.parse_args()
+
+    texts = load_chunks(args.pdf_path, args.chunks)
+    results = run(args.model, [EmbeddingBackend(b) for b in args.backends], texts, args.repeat, args.onnx_file)
+    baseline = next((row['chunks_per_second'] for row in results if row['backend'] == 'torch'), None)
+
+    print(f'{len(texts)} chunks, {args.model}')
+    print(f"{'backend':>11} {'load s':>8} {'seconds':>9} {'chunks/s':>9} {'speedup':>8} {'min cos':>8} {'mean cos':>9}")
+    failed = False
+    for row in results:
+        speedup = f"{row['chunks_per_second'] / baseline:>7.2f}x" if baseline else f"{'-':>8}"
+        print(f"{row['backend']:>11} {row['load_seconds']:>8.2f} {row['seconds']:>9.3f} "
+              f"{row['chunks_per_second']:>9.1f} {speedup} {row['min_cosine']:>8.4f} {row['mean_cosine']:>9.4f}")
+        failed = failed or row['min_cosine'] < args.min_cosine
+
+    if failed:
+        print(f'Parity check failed: cosine agreement below {args.min_cosine}', file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
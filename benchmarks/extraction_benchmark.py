@@ -0,0 +1,61 @@
+"""Benchmark PDF text extraction throughput (pages/second) as worker count increases.
+
+Usage:
+    python -m benchmarks.extraction_benchmark path/to/manual.pdf --workers 1 2 4 8 16
+"""
+import argparse
+import time
+
+import pdfplumber
+
+from pdf_agent.infrastructure.pdf.pdf_processor import PDFProcessor
+
+
+def run(pdf_path: str, workers: list[int], repeat: int) -> list[dict]:
+    with pdfplumber.open(pdf_path) as pdf:
+        page_count = len(pdf.pages)
+
+    results = []
+    for worker_count in workers:
+        # parallel_min_pages=0 forces the pool even for small files so every row is comparable
+        processor = PDFProcessor(max_workers=worker_count, parallel_min_pages=0)
+        try:
+            # Warm the pool so process start-up is not billed to the first run
+            processor.extract_text_from_pdf(pdf_path)
+
+            best = float('inf')
+            for _ in range(repeat):
+                started = time.perf_counter()
+                processor.extract_text_from_pdf(pdf_path)
+                best = min(best, time.perf_counter() - started)
+        finally:
+            processor.shutdown()
+
+        results.append({
+            'workers': worker_count,
+            'pages': page_count,
+            'seconds': best,
+            'pages_per_second': page_count / best if best else 0.0
+        })
+
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('pdf_path', help='PDF file to extract')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8, 16], help='Worker counts to try')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per worker count (best is reported)')
+    args = parser.parse_args()
+
+    results = run(args.pdf_path, args.workers, args.repeat)
+    baseline = results[0]['pages_per_second'] or 1.0
+
+    print(f"{'workers':>8} {'seconds':>10} {'pages/s':>10} {'speedup':>8}")
+    for row in results:
+        print(f"{row['workers']:>8} {row['seconds']:>10.3f} {row['pages_per_second']:>10.1f} "
+              f"{row['pages_per_second'] / baseline:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""Report recall@k against single-query latency for each FAISS index type and profile.
+
+Exact flat search provides the ground truth. Vectors come from a .npy file (e.g. embeddings exported from
+the embedding cache) or are generated as normalized, clustered synthetic vectors.
+
+Usage:
+    python -m benchmarks.index_benchmark --vectors 200000 --dimension 384 --k 4
+    python -m benchmarks.index_benchmark --from-npy embeddings.npy --types hnsw ivfpq --profiles fast accurate
+"""
+import argparse
+import time
+
+import faiss
+import numpy as np
+
+from pdf_agent.domain.shared.enumerations import VectorIndexType
+from pdf_agent.infrastructure.vectorstore.index_factory import INDEX_PROFILES, build_index, search_parameters
+
+
+def make_vectors(count: int, dimension: int, seed: int = 0) -> np.ndarray:
+    # Sentence embeddings have a low intrinsic dimension and chunks of one manual cluster together,
+    # so project clustered low-dimensional points up instead of drawing uniform noise
+    rng = np.random.default_rng(seed)
+    latent_dimension = min(32, dimension)
+    centers = 2 * rng.normal(size=(max(1, count // 500), latent_dimension))
+    latent = centers[rng.integers(len(centers), size=count)] + rng.normal(size=(count, latent_dimension))
+    projection = rng.normal(size=(latent_dimension, dimension))
+    vectors = (latent @ projection + 0.3 * rng.normal(size=(count, dimension))).astype(np.float32)
+    faiss.normalize_L2(vectors)
+    return vectors
+
+
+def run(
+    vectors: np.ndarray,
+    queries: np.ndarray,
+    k: int,
+    types: list[VectorIndexType],
+    profiles: list[str]
+) -> list[dict]:
+    ids = np.arange(len(vectors), dtype=np.int64)
+    exact = build_index(VectorIndexType.FLAT, vectors, ids, INDEX_PROFILES['balanced'])
+    _, truth = exact.search(queries, k)
+
+    results = []
+    for index_type in types:
+        # Flat search is exact, the profile does not apply
+        for profile_name in profiles if index_type != VectorIndexType.FLAT else ['exact']:
+            profile = INDEX_PROFILES.get(profile_name, INDEX_PROFILES['balanced'])
+
+            started = time.perf_counter()
+            index = build_index(index_type, vectors, ids, profile)
+            build_seconds = time.perf_counter() - started
+            params = search_parameters(index_type, profile, k)
+
+            latencies = []
+            found = np.empty_like(truth)
+            for row, query in enumerate(queries):
+                started = time.perf_counter()
+                _, labels = index.search(query[None, :], k, params=params)
+                latencies.append(time.perf_counter() - started)
+                found[row] = labels[0]
+
+            hits = sum(len(set(found[row]) & set(truth[row])) for row in range(len(queries)))
+            results.append({
+                'index': index_type.value,
+                'profile': profile_name,
+                'build_seconds': build_seconds,
+                'bytes_per_vector': len(faiss.serialize_index(index)) / len(vectors),
+                'p50_ms': float(np.percentile(latencies, 50) * 1000),
+                'p95_ms': float(np.percentile(latencies, 95) * 1000),
+                'recall': hits / truth.size
+            })
+
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--from-npy', help='float32 matrix of normalized vectors to index')
+    parser.add_argument('--vectors', type=int, default=50000, help='Number of synthetic vectors')
+    parser.add_argument('--dimension', type=int, default=384, help='Dimension of synthetic vectors')
+    parser.add_argument('--queries', type=int, default=200, help='Number of queries (held out from the corpus)')
+    parser.add_argument('--k', type=int, default=4, help='Results per query')
+    parser.add_argument('--types', nargs='+', default=[t.value for t in VectorIndexType],
+                        choices=[t.value for t in VectorIndexType], help='Index types to compare')
+    parser.add_argument('--profiles', nargs='+', default=list(INDEX_PROFILES), choices=list(INDEX_PROFILES),
+                        help='Latency/recall profiles of the approximate indexes')
+    args = parser.parse_args()
+
+    if args.from_npy:
+        data = np.ascontiguousarray(np.load(args.from_npy), dtype=np.float32)
+    else:
+        data = make_vectors(args.vectors + args.queries, args.dimension)
+    vectors, queries = data[:-args.queries], data[-args.queries:]
+
+    results = run(vectors, queries, args.k, [VectorIndexType(t) for t in args.types], args.profiles)
+
+    print(f'{len(vectors)} vectors x {vectors.shape[1]} dims, {len(queries)} queries, recall@{args.k}')
+    print(f"{'index':>6} {'profile':>9} {'build s':>8} {'bytes/vec':>10} {'p50 ms':>8} {'p95 ms':>8} {'recall':>7}")
+    for row in results:
+        print(f"{row['index']:>6} {row['profile']:>9} {row['build_seconds']:>8.2f} {row['bytes_per_vector']:>10.0f} "
+              f"{row['p50_ms']:>8.3f} {row['p95_ms']:>8.3f} {row['recall']:>7.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+"""Benchmark PDF ingestion stage by stage on a synthetic corpus and write machine-readable results.
+
+For every page count and text density a PDF is generated offline, then extraction, chunking, embedding
+and index build are timed separately and the peak RSS is recorded. Each case runs in a fresh process so
+peak RSS is per case. Compare two result files with `python -m benchmarks.compare_results`.
+
+Usage:
+    python -m benchmarks.ingestion_benchmark --output benchmark-results.json
+    python -m benchmarks.ingestion_benchmark --pages 10 100 --densities sparse --output quick.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+from benchmarks.synthetic_pdf import DENSITIES, write_pdf
+from pdf_agent.configs.env import CHUNK_OVERLAP, CHUNK_SIZE, EMBEDDING_BACKEND, EMBEDDING_MODEL
+from pdf_agent.domain.shared.enumerations import IngestionStage
+from pdf_agent.infrastructure.pdf.pdf_processor import PDFProcessor
+from pdf_agent.infrastructure.vectorstore.vector_store import VectorStore
+
+STAGES = ['extraction', 'chunking', 'embedding', 'indexing']
+
+
+def peak_rss_mb(who: int = resource.RUSAGE_SELF) -> float:
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    peak = resource.getrusage(who).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def run_case(pdf_path: str, pages: int, density: str, embedding_model: str, backend: str) -> dict:
+    """Ingest one PDF and time each stage; meant to run in its own process."""
+    # Caches and snapshots are off so every run does the full work
+    vector_store = VectorStore(embedding_model, backend=backend, embedding_cache_dir='', snapshot_dir='')
+    processor = PDFProcessor(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
+    baseline_rss = peak_rss_mb()
+
+    # Extraction and chunking both happen inside process_pdf; its progress callback marks the boundary
+    extraction_done = None
+
+    def progress(stage: IngestionStage, done: int, total: int) -> None:
+        nonlocal extraction_done
+        if stage == IngestionStage.CHUNKING and extraction_done is None:
+            extraction_done = time.perf_counter()
+
+    started = time.perf_counter()
+    document = processor.process_pdf(pdf_path, progress=progress)
+    chunked = time.perf_counter()
+    processor.shutdown()
+    extraction_done = extraction_done or chunked
+
+    vectors = vector_store.embed_document(document)
+    embedded = time.perf_counter()
+    vector_store.add_document(document, vectors=vectors)
+    indexed = time.perf_counter()
+
+    return {
+        'case': f'{pages}-{density}',
+        'pages': pages,
+        'density': density,
+        'file_size': os.path.getsize(pdf_path),
+        'chunks': len(document.chunks or []),
+        'extraction_seconds': extraction_done - started,
+        'chunking_seconds': chunked - extraction_done,
+        'embedding_seconds': embedded - chunked,
+        'indexing_seconds': indexed - embedded,
+        'total_seconds': indexed - started,
+        'pages_per_second': pages / (indexed - started),
+        'baseline_rss_mb': baseline_rss,
+        'peak_rss_mb': peak_rss_mb(),
+        # Extraction workers of large PDFs run in child processes
+        'peak_child_rss_mb': peak_rss_mb(resource.RUSAGE_CHILDREN)
+    }
+
+
+def run(page_counts: list[int], densities: list[str], embedding_model: str, backend: str, workdir: Path) -> list[dict]:
+    results = []
+    for density in densities:
+        for pages in page_counts:
+            pdf_path = write_pdf(workdir / f'{pages}-{density}.pdf', pages, density)
+            # A fresh spawned process per case keeps peak RSS and warm caches from leaking between cases
+            with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+                result = executor.submit(run_case, str(pdf_path), pages, density, embedding_model, backend).result()
+            print(f"{result['case']:>12}: {result['total_seconds']:.2f}s, {result['chunks']} chunks, "
+                  f"peak RSS {result['peak_rss_mb']:.0f} MB", file=sys.stderr)
+            results.append(result)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, nargs='+', default=[10, 100, 1000], help='Page counts to generate')
+    parser.add_argument('--densities', nargs='+', default=list(DENSITIES), choices=list(DENSITIES),
+                        help='Text densities to generate')
+    parser.add_argument('--model', default=EMBEDDING_MODEL, help='sentence-transformers model name')
+    parser.add_argument('--backend', default=EMBEDDING_BACKEND, help='Embedding backend (torch, torch-int8, onnx)')
+    parser.add_argument('--output', default='benchmark-results.json', help='JSON file to write the results to')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='pdf-agent-benchmark-') as workdir:
+        results = run(args.pages, args.densities, args.model, args.backend, Path(workdir))
+
+    report = {
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'embedding_model': args.model,
+            'embedding_backend': args.backend,
+            'chunk_size': CHUNK_SIZE,
+            'chunk_overlap': CHUNK_OVERLAP
+        },
+        'results': results
+    }
+    Path(args.output).write_text(json.dumps(report, indent=2))
+
+    print(f"{'case':>12} {'chunks':>7} " + ' '.join(f'{stage:>10}' for stage in STAGES) + f" {'peak MB':>8}")
+    for row in results:
+        print(f"{row['case']:>12} {row['chunks']:>7} "
+              + ' '.join(f"{row[f'{stage}_seconds']:>10.3f}" for stage in STAGES)
+              + f" {row['peak_rss_mb']:>8.0f}")
+    print(f'Results written to {args.output}')
+
+
+if __name__ == '__main__':
+    main()
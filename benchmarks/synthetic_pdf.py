@@ -0,0 +1,102 @@
+"""Generate synthetic text PDFs offline, for benchmarks that need reproducible documents of a given size.
+
+The files are written by hand (one Helvetica text stream per page), so no PDF authoring library is needed.
+
+Usage:
+    python -m benchmarks.synthetic_pdf out.pdf --pages 100 --density dense
+"""
+import argparse
+import random
+from pathlib import Path
+
+WORDS = (
+    'install configure device power cable network firmware update reset button display warranty '
+    'battery charge signal error code maintenance filter replace safety warning temperature sensor '
+    'manual page section figure table step press hold release connect disconnect mode setting'
+).split()
+
+# Lines of text per page; a dense page is a full page of prose, a sparse one a heading and a few notes
+DENSITIES = {
+    'dense': 48,
+    'sparse': 4,
+}
+WORDS_PER_LINE = 12
+
+PAGE_WIDTH = 612
+PAGE_HEIGHT = 792
+FONT_SIZE = 10
+LINE_HEIGHT = 14
+
+
+def synthetic_text(rng: random.Random, words: int) -> str:
+    """Manual-like filler: random words from a small technical vocabulary, ending in a full stop."""
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+
+def page_lines(rng: random.Random, page_number: int, density: str) -> list[str]:
+    lines = [f'Section {page_number}']
+    lines.extend(synthetic_text(rng, WORDS_PER_LINE) for _ in range(DENSITIES[density]))
+    return lines
+
+
+def _escape(text: str) -> str:
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def _content_stream(lines: list[str]) -> bytes:
+    operations = [f'BT /F1 {FONT_SIZE} Tf {LINE_HEIGHT} TL 72 {PAGE_HEIGHT - 72} Td']
+    operations.extend(f'({_escape(line)}) Tj T*' for line in lines)
+    operations.append('ET')
+    return '\n'.join(operations).encode('latin-1')
+
+
+def write_pdf(path: str | Path, pages: int, density: str = 'dense', seed: int = 0) -> Path:
+    """Write a `pages`-page PDF of synthetic text; the same arguments always produce the same file."""
+    rng = random.Random(f'{seed}-{pages}-{density}')
+    path = Path(path)
+
+    # Objects: 1 catalog, 2 page tree, 3 font, then a (page, content) pair per page
+    page_ids = [4 + 2 * index for index in range(pages)]
+    objects: dict[int, bytes] = {
+        1: b'<< /Type /Catalog /Pages 2 0 R >>',
+        2: f"<< /Type /Pages /Kids [{' '.join(f'{page_id} 0 R' for page_id in page_ids)}] /Count {pages} >>".encode(),
+        3: b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>',
+    }
+    for page_number, page_id in enumerate(page_ids, start=1):
+        stream = _content_stream(page_lines(rng, page_number, density))
+        objects[page_id] = (
+            f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] '
+            f'/Resources << /Font << /F1 3 0 R >> >> /Contents {page_id + 1} 0 R >>'
+        ).encode()
+        objects[page_id + 1] = b'<< /Length %d >>\nstream\n%s\nendstream' % (len(stream), stream)
+
+    with open(path, 'wb') as pdf:
+        pdf.write(b'%PDF-1.4\n')
+        offsets = {}
+        for object_id in sorted(objects):
+            offsets[object_id] = pdf.tell()
+            pdf.write(b'%d 0 obj\n%s\nendobj\n' % (object_id, objects[object_id]))
+
+        xref_offset = pdf.tell()
+        pdf.write(b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1))
+        for object_id in sorted(objects):
+            pdf.write(b'%010d 00000 n \n' % offsets[object_id])
+        pdf.write(b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref_offset))
+
+    return path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('output', help='PDF file to write')
+    parser.add_argument('--pages', type=int, default=100, help='Number of pages')
+    parser.add_argument('--density', choices=list(DENSITIES), default='dense', help='Amount of text per page')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the generated text')
+    args = parser.parse_args()
+
+    path = write_pdf(args.output, args.pages, args.density, args.seed)
+    print(f'Wrote {path} ({args.pages} {args.density} pages, {path.stat().st_size} bytes)')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,18 +1,26 @@
+import asyncio
 from contextlib import asynccontextmanager
 from typing import Any
 
-from fastapi import FastAPI
+from fastapi import FastAPI, status
 from fastapi.openapi.utils import get_openapi
+from fastapi.responses import JSONResponse
 
+from pdf_agent.presentation.dependencies import shutdown_services
 from pdf_agent.presentation.routes.pdf_routes import router as pdf_router
 from pdf_agent.presentation.utils.exception_handlers import register_exception_handlers
+from pdf_agent.presentation.utils.warm_up import warm_up_services, warm_up_state
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup
+    # Startup: warm up in the background so /health answers at once while /ready reports 503
+    warm_up = asyncio.create_task(warm_up_services())
     yield
     # Shutdown
+    if not warm_up.done():
+        warm_up.cancel()
+    await shutdown_services()
 
 
 app = FastAPI(
@@ -50,6 +58,17 @@ async def health_root() -> dict[str, str]:
     return {'message': 'PDF Q&A Agent is running'}
 
 
+@app.get('/ready')
+async def ready() -> JSONResponse:
+    """Readiness probe: 503 until the embedding model is loaded and the agent graph is compiled."""
+    if not warm_up_state.ready:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={'status': 'failed' if warm_up_state.error else 'warming_up', 'error': warm_up_state.error}
+        )
+    return JSONResponse(content={'status': 'ready', 'warm_up_seconds': warm_up_state.seconds})
+
+
 @app.get('/')
 async def read_root() -> dict[str, str]:
     return {'message': 'Welcome to PDF Q&A Agent - use /api/upload to upload PDFs and /api/ask to ask questions'}
@@ -0,0 +1,88 @@
+"""Per-request limits of an agent run."""
+import time
+from dataclasses import dataclass
+
+from langchain_core.messages import AIMessage, BaseMessage
+
+from pdf_agent.configs.env import (
+    AGENT_FINAL_ANSWER_RESERVE_SECONDS, AGENT_MAX_COMPLETION_TOKENS, AGENT_MAX_ITERATIONS, AGENT_MAX_PROMPT_TOKENS,
+    AGENT_TIMEOUT_SECONDS
+)
+from pdf_agent.utils.tokens import count_tokens
+
+
+@dataclass
+class AgentBudget:
+    """
+    Limits of one agent run and what it has used so far.
+
+    `deadline` is on the `time.monotonic()` clock. The last `final_answer_reserve` seconds before it
+    are kept for the final answer, so a run that is out of budget can still answer.
+    """
+    max_iterations: int
+    max_prompt_tokens: int
+    max_completion_tokens: int
+    deadline: float
+    final_answer_reserve: float
+    iterations: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    # Why the run was cut short, if it was
+    exhausted_reason: str | None = None
+
+    @classmethod
+    def create(cls, deadline: float | None = None) -> "AgentBudget":
+        """
+        Budget from the configured limits.
+
+        Args:
+            deadline: Unix time by which the answer is needed; only ever shortens AGENT_TIMEOUT_SECONDS
+        """
+        timeout = AGENT_TIMEOUT_SECONDS
+        if deadline is not None:
+            timeout = min(timeout, deadline - time.time())
+        return cls(
+            max_iterations=AGENT_MAX_ITERATIONS,
+            max_prompt_tokens=AGENT_MAX_PROMPT_TOKENS,
+            max_completion_tokens=AGENT_MAX_COMPLETION_TOKENS,
+            deadline=time.monotonic() + timeout,
+            final_answer_reserve=min(AGENT_FINAL_ANSWER_RESERVE_SECONDS, max(timeout, 0) / 2)
+        )
+
+    def remaining_seconds(self) -> float:
+        return self.deadline - time.monotonic()
+
+    def working_seconds(self) -> float:
+        """Time left for LLM calls and tools before the final answer reserve."""
+        return self.remaining_seconds() - self.final_answer_reserve
+
+    def exhausted(self) -> str | None:
+        """Reason the next LLM call has to produce the final answer, or None while within budget."""
+        if self.iterations + 1 >= self.max_iterations:
+            return "iterations"
+        if self.prompt_tokens >= self.max_prompt_tokens:
+            return "prompt_tokens"
+        if self.completion_tokens >= self.max_completion_tokens:
+            return "completion_tokens"
+        if self.working_seconds() <= 0:
+            return "deadline"
+        return None
+
+    def record(self, prompt: list[BaseMessage], response: AIMessage) -> None:
+        """Count an LLM call, from the provider's usage metadata or an estimate when there is none."""
+        self.iterations += 1
+        usage = response.usage_metadata
+        if usage:
+            self.prompt_tokens += usage["input_tokens"]
+            self.completion_tokens += usage["output_tokens"]
+        else:
+            self.prompt_tokens += sum(count_tokens(str(message.content)) for message in prompt)
+            self.completion_tokens += count_tokens(str(response.content))
+
+    def usage(self) -> dict:
+        return {
+            "iterations": self.iterations,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "exhausted": self.exhausted_reason
+        }
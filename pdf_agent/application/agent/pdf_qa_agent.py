@@ -1,8 +1,14 @@
 """LangGraph React-style agent for PDF Q&A."""
-import re
-from typing import List, Literal
-
-from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, AsyncIterator, Callable, Collection, List, Literal
+from uuid import UUID
+
+from langchain_core.documents import Document
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage, SystemMessage, ToolMessage
+from langchain_core.runnables import RunnableConfig
 from langchain_core.tools import tool
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_openai import ChatOpenAI
@@ -10,14 +16,30 @@ from langgraph.graph import END, StateGraph
 from langgraph.prebuilt import ToolNode
 from pydantic import SecretStr
 
+from pdf_agent.application.agent.budget import AgentBudget
 from pdf_agent.application.base_service import BaseService
-from pdf_agent.configs.env import GOOGLE_API_KEY, LLM_PROVIDER, OPENAI_API_KEY
+from pdf_agent.configs.env import AGENT_TOOL_WORKERS, GOOGLE_API_KEY, LLM_PROVIDER, OPENAI_API_KEY
 from pdf_agent.configs.log import get_logger
 from pdf_agent.domain.pdf.agent_state import AgentState
 from pdf_agent.infrastructure.vectorstore.vector_store import VectorStore
 
 logger = get_logger()
 
+# Documents named individually in the system prompt; larger corpora are summarized
+MAX_DOCUMENTS_IN_PROMPT = 20
+
+# Queries a single search_pdf_multi call may run
+MAX_QUERIES_PER_SEARCH = 8
+
+# Appended to the conversation when the budget forces the agent to answer
+FINAL_ANSWER_INSTRUCTION = (
+    "Stop searching and answer the question now, using only the information gathered so far. "
+    "If it is not enough for a complete answer, say which part is missing."
+)
+
+# Bounded pool for the CPU-bound part of tool calls, shared by all requests of the process
+_tool_pool = ThreadPoolExecutor(max_workers=AGENT_TOOL_WORKERS, thread_name_prefix="agent-tool")
+
 
 class PDFQAAgent(BaseService):
     """LangGraph-powered conversational agent for PDF Q&A."""
@@ -48,7 +70,9 @@ class PDFQAAgent(BaseService):
             self.llm = ChatOpenAI(
                 model=model_name,
                 temperature=temperature,
-                api_key=SecretStr(OPENAI_API_KEY) if OPENAI_API_KEY else None
+                api_key=SecretStr(OPENAI_API_KEY) if OPENAI_API_KEY else None,
+                # Token usage of streamed responses too, for the agent budget
+                stream_usage=True
             )
             logger.info(f"Initialized PDFQAAgent with OpenAI: {model_name}")
 
@@ -57,68 +81,174 @@ class PDFQAAgent(BaseService):
 
     def _create_vector_search_tool(self):
         """Create the vector search tool for LangGraph."""
-        @tool
-        def search_pdf(query: str, k: int = 4) -> str:
+        @tool(response_format="content_and_artifact")
+        async def search_pdf(query: str, config: RunnableConfig, k: int = 4) -> tuple[str, List[dict]]:
             """
-            Search the PDF document for relevant information.
-            Use this tool when you need to find specific information from the PDF.
+            Search the PDF documents for relevant information.
+            Use this tool when you need to find specific information from the PDFs.
 
             Args:
                 query: The search query (natural language)
                 k: Number of results to return (default: 4)
 
             Returns:
-                Formatted search results with page numbers and excerpts
+                Formatted search results with document names, page numbers and excerpts
             """
             logger.info(f"Tool called: search_pdf(query='{query}', k={k})")
 
-            results = self.vector_store.similarity_search(query, k=k)
+            # Documents the current request is restricted to, if any
+            document_ids = config.get("configurable", {}).get("document_ids")
+            # Encoding the query and searching the index are CPU-bound, keep them off the event loop
+            results = await _run_tool(
+                "search_pdf", self.vector_store.similarity_search, query, k=k, document_ids=document_ids
+            )
 
             if not results:
-                return "No relevant information found in the PDF."
+                return "No relevant information found in the PDF.", []
 
-            # Format results
-            formatted_results = []
-            for idx, (doc, score) in enumerate(results, 1):
-                page_num = doc.metadata.get("page_number", "Unknown")
-                content = doc.page_content[:300]  # Limit content length
+            # Format results for the LLM, the citations travel alongside as the message artifact
+            content = "\n\n".join(_format_result(idx, doc, score) for idx, (doc, score) in enumerate(results, 1))
+            return content, [_citation(doc, score) for doc, score in results]
 
-                formatted_results.append(
-                    f"Result {idx} (Page {page_num}, Score: {score:.3f}):\n{content}..."
-                )
+        return search_pdf
 
-            return "\n\n".join(formatted_results)
+    def _create_multi_search_tool(self):
+        """Create the batched variant of the vector search tool."""
+        @tool(response_format="content_and_artifact")
+        async def search_pdf_multi(
+            queries: List[str], config: RunnableConfig, k: int = 4
+        ) -> tuple[str, List[dict]]:
+            """
+            Search the PDF documents for several queries at once.
+            Use this tool instead of repeated search_pdf calls to look up several aspects,
+            sub-questions or phrasings of a question in one step.
 
-        return search_pdf
+            Args:
+                queries: The search queries (natural language), at most 8
+                k: Number of results to return per query (default: 4)
+
+            Returns:
+                Search results grouped by query; a passage is only listed under the first query that found it
+            """
+            queries = queries[:MAX_QUERIES_PER_SEARCH]
+            logger.info(f"Tool called: search_pdf_multi(queries={queries}, k={k})")
+
+            document_ids = config.get("configurable", {}).get("document_ids")
+            # One encoder batch and one FAISS search for all queries, off the event loop
+            results = await _run_tool(
+                "search_pdf_multi", self.vector_store.similarity_search_batch, queries, k=k, document_ids=document_ids
+            )
+
+            sections = []
+            citations = []
+            seen: dict[tuple, int] = {}
+            for query, query_results in zip(queries, results):
+                lines = [f'Query: "{query}"']
+                repeated = []
+                for doc, score in query_results:
+                    key = (doc.metadata.get("document_id"), doc.metadata.get("chunk_index"))
+                    if key in seen:
+                        repeated.append(seen[key])
+                        continue
+                    seen[key] = len(seen) + 1
+                    lines.append(_format_result(seen[key], doc, score))
+                    citations.append(_citation(doc, score))
+                if repeated:
+                    lines.append(f"Also matches result(s) {', '.join(map(str, repeated))} above.")
+                if len(lines) == 1:
+                    lines.append("No relevant information found in the PDF.")
+                sections.append("\n\n".join(lines))
+
+            return "\n\n---\n\n".join(sections), citations
+
+        return search_pdf_multi
 
     def _create_graph(self):
         """Create the LangGraph workflow."""
         # Create tool
-        search_tool = self._create_vector_search_tool()
-        tools = [search_tool]
+        tools = [self._create_vector_search_tool(), self._create_multi_search_tool()]
 
         # Bind tools to LLM
         llm_with_tools = self.llm.bind_tools(tools)
+        # Same tools so the gathered tool calls stay valid in the prompt, but none may be called
+        llm_final = self.llm.bind_tools(tools, tool_choice="none")
+
+        tool_executor = ToolNode(tools)
 
         # Define workflow
         workflow = StateGraph(AgentState)
 
-        # Define nodes
-        def agent_node(state: AgentState):
+        # Define nodes; both are async so a run never blocks the event loop while waiting for the LLM
+        async def agent_node(state: AgentState, config: RunnableConfig):
             """Agent reasoning node."""
             logger.info("Agent node: Reasoning about the question")
             messages = state["messages"]
-            response = llm_with_tools.invoke(messages)
-            return {"messages": [response]}
-
-        def tool_node(state: AgentState):
+            budget: AgentBudget = config["configurable"]["budget"]
+
+            reason = budget.exhausted()
+            if reason is None:
+                try:
+                    # The last seconds before the deadline are kept for a forced final answer
+                    response = await asyncio.wait_for(
+                        llm_with_tools.ainvoke(messages, config), timeout=budget.working_seconds()
+                    )
+                    budget.record(messages, response)
+                    return {"messages": [response]}
+                except TimeoutError:
+                    reason = "deadline"
+
+            return {"messages": [await final_answer(state, config, budget, reason)]}
+
+        async def final_answer(
+            state: AgentState,
+            config: RunnableConfig,
+            budget: AgentBudget,
+            reason: str
+        ) -> AIMessage:
+            """Answer from what the run gathered so far, without calling tools."""
+            logger.warning(f"Agent budget exhausted ({reason}), forcing a final answer")
+            budget.exhausted_reason = reason
+            prompt = [*state["messages"], HumanMessage(content=FINAL_ANSWER_INSTRUCTION)]
+            try:
+                response = await asyncio.wait_for(
+                    llm_final.ainvoke(prompt, config), timeout=max(budget.remaining_seconds(), 0)
+                )
+                budget.record(prompt, response)
+                # Some providers still return tool calls; the run ends here regardless
+                return AIMessage(content=response.content, usage_metadata=response.usage_metadata)
+            except TimeoutError:
+                logger.warning("Final answer missed the deadline, answering with the search results")
+                return AIMessage(content=_fallback_answer(state.get("search_results", [])))
+
+        async def tool_node(state: AgentState, config: RunnableConfig):
             """Tool execution node."""
-            logger.info("Tool node: Executing vector search")
-            # Execute tools
-            tool_executor = ToolNode(tools)
-            result = tool_executor.invoke(state)
-
-            return result
+            tool_calls = state["messages"][-1].tool_calls
+            logger.info(f"Tool node: Executing {len(tool_calls)} tool call(s)")
+            budget: AgentBudget = config["configurable"]["budget"]
+            started = time.perf_counter()
+            try:
+                # ToolNode runs the calls of one step concurrently and returns their messages in call order
+                result = await asyncio.wait_for(
+                    tool_executor.ainvoke(state, config), timeout=max(budget.working_seconds(), 0)
+                )
+            except TimeoutError:
+                logger.warning("Tool node: deadline reached, skipping the remaining tool calls")
+                result = {"messages": [
+                    ToolMessage(
+                        content="Search skipped: the request deadline was reached.",
+                        tool_call_id=call["id"],
+                        name=call["name"]
+                    )
+                    for call in tool_calls
+                ]}
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            logger.info(f"Tool node: {len(tool_calls)} tool call(s) took {elapsed_ms:.1f} ms")
+
+            # Citations of this step, appended to the run's search results by the state reducer
+            search_results = [
+                citation for message in result["messages"] for citation in getattr(message, "artifact", None) or []
+            ]
+            return {"messages": result["messages"], "search_results": search_results}
 
         def should_continue(state: AgentState) -> Literal["tools", "end"]:
             """Decide whether to continue or end."""
@@ -157,41 +287,166 @@ class PDFQAAgent(BaseService):
         # Compile
         return workflow.compile()
 
-    def ask(self, question: str, conversation_history: List[dict] | None = None) -> dict:
+    async def ask(
+        self,
+        question: str,
+        conversation_history: List[dict] | None = None,
+        document_ids: Collection[UUID] | None = None,
+        summary: str | None = None,
+        deadline: float | None = None
+    ) -> dict:
         """
-        Ask a question about the PDF.
+        Ask a question about the indexed PDFs.
 
         Args:
             question: User's question
             conversation_history: Previous messages (optional)
+            document_ids: Restrict retrieval to these documents (optional, all documents by default)
+            summary: Summary of the conversation before `conversation_history` (optional)
+            deadline: Unix time by which the answer is needed (optional, AGENT_TIMEOUT_SECONDS at most)
 
         Returns:
-            Dict with answer and sources
+            Dict with answer, sources and the budget used
         """
         logger.info(f"Received question: '{question}'")
 
-        # Check if document is loaded
-        doc_info = self.vector_store.get_current_document_info()
-        if "status" in doc_info and doc_info["status"] == "No document indexed":
-            return {
-                "answer": "No PDF document is currently loaded. Please upload a PDF first.",
-                "sources": [],
-                "error": "No document indexed"
-            }
+        # Check if documents are loaded
+        documents = self._searchable_documents(document_ids)
+        if not documents:
+            return self._no_document_result()
+
+        messages = self._build_messages(question, conversation_history, documents, summary)
+        budget = AgentBudget.create(deadline)
+
+        # Invoke the graph
+        try:
+            result = await self.graph.ainvoke(  # type: ignore[attr-defined]
+                {"messages": messages},
+                config=self._run_config(document_ids, budget)
+            )
+            return self._answer(result["messages"], result.get("search_results", []), budget)
+
+        except Exception as e:
+            logger.error(f"Error during agent execution: {e}")
+            return self._error_result(e)
+
+    async def stream(
+        self,
+        question: str,
+        conversation_history: List[dict] | None = None,
+        document_ids: Collection[UUID] | None = None,
+        summary: str | None = None,
+        deadline: float | None = None
+    ) -> AsyncIterator[tuple[str, dict]]:
+        """
+        Ask a question and yield (event, data) pairs while the graph runs.
+
+        Events:
+            tool_call: The agent called a tool, with its name and arguments
+            tool_result: A tool returned, with the page numbers it retrieved
+            token: A piece of LLM output (reasoning before tool calls included)
+            answer: Always last, the same dict `ask` returns
+
+        Args:
+            question: User's question
+            conversation_history: Previous messages (optional)
+            document_ids: Restrict retrieval to these documents (optional, all documents by default)
+            summary: Summary of the conversation before `conversation_history` (optional)
+            deadline: Unix time by which the answer is needed (optional, AGENT_TIMEOUT_SECONDS at most)
+        """
+        logger.info(f"Received question to stream: '{question}'")
+
+        documents = self._searchable_documents(document_ids)
+        if not documents:
+            yield "answer", self._no_document_result()
+            return
+
+        messages = self._build_messages(question, conversation_history, documents, summary)
+        budget = AgentBudget.create(deadline)
+        search_results: List[dict] = []
 
+        try:
+            # "messages" streams LLM tokens as they are generated, "updates" the output of each node
+            async for mode, data in self.graph.astream(  # type: ignore[attr-defined]
+                {"messages": messages},
+                config=self._run_config(document_ids, budget),
+                stream_mode=["messages", "updates"]
+            ):
+                if mode == "messages":
+                    chunk, metadata = data
+                    text = _text(chunk.content) if isinstance(chunk, AIMessageChunk) else ""
+                    if text and metadata.get("langgraph_node") == "agent":
+                        yield "token", {"content": text}
+                    continue
+
+                for update in data.values():
+                    search_results.extend((update or {}).get("search_results", []))
+                    for message in (update or {}).get("messages", []):
+                        messages.append(message)
+                        if isinstance(message, AIMessage):
+                            for call in message.tool_calls:
+                                yield "tool_call", {"name": call["name"], "args": call["args"]}
+                        elif isinstance(message, ToolMessage):
+                            pages = sorted({citation["page"] for citation in message.artifact or []})
+                            yield "tool_result", {"name": message.name, "pages": pages}
+
+            yield "answer", self._answer(messages, search_results, budget)
+
+        except Exception as e:
+            logger.error(f"Error during agent execution: {e}")
+            yield "answer", self._error_result(e)
+
+    def _run_config(self, document_ids: Collection[UUID] | None, budget: AgentBudget) -> RunnableConfig:
+        return {
+            "configurable": {"document_ids": document_ids, "budget": budget},
+            # Only a safety net, the budget ends the loop after max_iterations LLM calls
+            "recursion_limit": 2 * budget.max_iterations + 5
+        }
+
+    def _searchable_documents(self, document_ids: Collection[UUID] | None) -> List[dict]:
+        documents = self.vector_store.list_documents()
+        if document_ids is not None:
+            selected = {str(document_id) for document_id in document_ids}
+            documents = [doc for doc in documents if doc["id"] in selected]
+        return documents
+
+    def _no_document_result(self) -> dict:
+        return {
+            "answer": "No PDF document is currently loaded. Please upload a PDF first.",
+            "sources": [],
+            "error": "No document indexed"
+        }
+
+    def _error_result(self, error: Exception) -> dict:
+        return {
+            "answer": f"An error occurred: {str(error)}",
+            "sources": [],
+            "error": str(error)
+        }
+
+    def _build_messages(
+        self,
+        question: str,
+        conversation_history: List[dict] | None,
+        documents: List[dict],
+        summary: str | None = None
+    ) -> list[BaseMessage]:
+        """Build the system prompt, prior conversation and question passed to the graph."""
         # Prepare system message
-        system_message = SystemMessage(
-            content=f"""You are a helpful assistant that answers questions about a PDF document.
-The document is: {doc_info['filename']} ({doc_info['total_pages']} pages).
+        prompt = f"""You are a helpful assistant that answers questions about PDF documents.
+{self._describe_documents(documents)}
 
 When answering:
-1. Use the search_pdf tool to find relevant information from the document
-2. Always cite page numbers when referencing information
-3. If the information is not in the document, say so clearly
+1. Use the search_pdf tool to find relevant information from the documents; to look up several aspects
+   or phrasings, call search_pdf_multi once with all of them instead of searching repeatedly
+2. Always cite page numbers (and the document, when there are several) when referencing information
+3. If the information is not in the documents, say so clearly
 4. Provide concise, accurate answers based on the document content
 
 Be conversational and helpful."""
-        )
+        if summary:
+            prompt += f"\n\nSummary of the earlier conversation:\n{summary}"
+        system_message = SystemMessage(content=prompt)
 
         # Build messages
         messages: list[BaseMessage] = [system_message]
@@ -206,48 +461,118 @@ Be conversational and helpful."""
 
         # Add current question
         messages.append(HumanMessage(content=question))
+        return messages
 
-        # Invoke the graph
-        try:
-            result = self.graph.invoke({"messages": messages})  # type: ignore[attr-defined]
-
-            # Extract final answer
-            final_message = result["messages"][-1]
-            answer = final_message.content
-
-            # Extract sources (page numbers mentioned)
-            sources = self._extract_sources(result["messages"])
-
-            logger.info(f"Generated answer with {len(sources)} sources")
-
-            return {
-                "answer": answer,
-                "sources": sources,
-                "conversation": result["messages"]
-            }
-
-        except Exception as e:
-            logger.error(f"Error during agent execution: {e}")
-            return {
-                "answer": f"An error occurred: {str(e)}",
-                "sources": [],
-                "error": str(e)
-            }
-
-    def _extract_sources(self, messages: List[BaseMessage]) -> List[dict]:
-        """Extract page numbers and sources from messages."""
-        sources = []
-
-        for msg in messages:
-            content = str(msg.content)
-
-            # Look for page numbers in the format "Page X"
-            page_matches = re.findall(r'Page (\d+)', content)
+    async def summarize(self, summary: str | None, messages: List[dict], max_words: int) -> str:
+        """
+        Extend a rolling conversation summary with more messages.
 
-            for page_num in set(page_matches):
-                sources.append({
-                    "page": int(page_num),
-                    "type": "reference"
-                })
+        Args:
+            summary: Summary so far (None for the first batch)
+            messages: Messages to fold into the summary, oldest first
+            max_words: Length limit of the updated summary
 
-        return sources
+        Returns:
+            The updated summary
+        """
+        transcript = "\n".join(f"{msg['role']}: {msg['content']}" for msg in messages)
+        response = await self.llm.ainvoke([
+            SystemMessage(
+                content=f"""You maintain a running summary of a conversation about PDF documents.
+Update the summary with the new messages. Keep the facts, page numbers and open questions a follow-up
+question may refer to, drop small talk, and use at most {max_words} words. Reply with the summary only."""
+            ),
+            HumanMessage(content=f"Summary so far:\n{summary or '(none)'}\n\nNew messages:\n{transcript}")
+        ])
+        return _text(response.content).strip()
+
+    def _answer(self, messages: List[BaseMessage], search_results: List[dict], budget: AgentBudget) -> dict:
+        """Build the result of a finished run from its messages and the citations it collected."""
+        # Extract final answer
+        final_message = messages[-1]
+        answer = final_message.content
+
+        sources = self._extract_sources(search_results)
+
+        logger.info(f"Generated answer with {len(sources)} sources")
+
+        return {
+            "answer": answer,
+            "sources": sources,
+            "conversation": messages,
+            "budget": budget.usage()
+        }
+
+    def _describe_documents(self, documents: List[dict]) -> str:
+        """Describe the searchable documents for the system prompt, listing at most a few of them."""
+        if len(documents) == 1:
+            doc = documents[0]
+            return f"The document is: {doc['filename']} ({doc['total_pages']} pages)."
+
+        listed = "\n".join(
+            f"- {doc['filename']} ({doc['total_pages']} pages)"
+            for doc in documents[:MAX_DOCUMENTS_IN_PROMPT]
+        )
+        more = len(documents) - MAX_DOCUMENTS_IN_PROMPT
+        if more > 0:
+            listed += f"\n- ... and {more} more"
+        return f"There are {len(documents)} documents:\n{listed}"
+
+    def _extract_sources(self, search_results: List[dict]) -> List[dict]:
+        """One source per retrieved page, in retrieval order, with the best scoring chunk of the page."""
+        sources: dict[tuple, dict] = {}
+
+        for citation in search_results:
+            key = (citation["document_id"], citation["page"])
+            source = sources.get(key)
+            if source is None or citation["score"] > source["score"]:
+                sources[key] = {**citation, "type": "reference"}
+
+        return list(sources.values())
+
+
+def _text(content: str | list) -> str:
+    """Text of a message chunk; some providers send a list of content parts instead of a string."""
+    if isinstance(content, str):
+        return content
+    return "".join(
+        part if isinstance(part, str) else part.get("text", "")
+        for part in content
+        if isinstance(part, str) or part.get("type") == "text"
+    )
+
+
+def _fallback_answer(search_results: List[dict]) -> str:
+    """Answer without the LLM: point to the passages the run found."""
+    found = [(citation["filename"], citation["page"]) for citation in search_results]
+    if not found:
+        return "Sorry, I could not find an answer in time. Please try again or ask a narrower question."
+    listed = "\n".join(f"- {filename}, Page {page}" for filename, page in dict.fromkeys(found))
+    return f"I could not finish the answer in time. These passages look relevant:\n{listed}"
+
+
+async def _run_tool(name: str, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run the blocking part of a tool call on the tool pool and log how long it took."""
+    started = time.perf_counter()
+    result = await asyncio.get_running_loop().run_in_executor(_tool_pool, partial(func, *args, **kwargs))
+    logger.info(f"Tool {name} took {(time.perf_counter() - started) * 1000:.1f} ms")
+    return result
+
+
+def _citation(doc: Document, score: float) -> dict:
+    """Structured citation of a retrieved chunk."""
+    return {
+        "document_id": doc.metadata.get("document_id"),
+        "filename": doc.metadata.get("filename", "Unknown"),
+        "page": doc.metadata.get("page_number"),
+        "chunk_id": doc.metadata.get("chunk_id"),
+        "chunk_index": doc.metadata.get("chunk_index"),
+        "score": float(score)
+    }
+
+
+def _format_result(idx: int, doc: Document, score: float) -> str:
+    filename = doc.metadata.get("filename", "Unknown")
+    page_num = doc.metadata.get("page_number", "Unknown")
+    content = doc.page_content[:300]  # Limit content length
+    return f"Result {idx} ({filename}, Page {page_num}, Score: {score:.3f}):\n{content}..."
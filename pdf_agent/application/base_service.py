@@ -4,3 +4,7 @@ from abc import ABC
 class BaseService(ABC):
     def __init__(self):
         pass
+
+    async def close(self) -> None:
+        """Release what the service holds on shutdown."""
+        pass
@@ -0,0 +1,51 @@
+"""Cache of agent answers for repeated questions."""
+import hashlib
+import json
+from typing import Collection
+
+from pdf_agent.utils.lru_cache import LRUCache
+
+
+def answer_cache_key(
+    question: str,
+    document_ids: Collection[str],
+    history: list[dict],
+    settings: str
+) -> str:
+    """
+    Build the cache key of an answer.
+
+    Args:
+        question: User's question, normalized here (case and whitespace do not change the answer)
+        document_ids: Documents the answer may draw from; ids derive from the file content hash
+        history: Conversation messages preceding the question
+        settings: Model and retrieval configuration the answer was produced with
+    """
+    payload = {
+        "question": " ".join(question.split()).casefold(),
+        "documents": sorted(document_ids),
+        "history": [(message.get("role"), message.get("content")) for message in history],
+        "settings": settings
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class AnswerCache:
+    """LRU cache of successful answers with a time to live, keyed by `answer_cache_key`."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self._entries: LRUCache[str, dict] = LRUCache(max_entries, ttl_seconds=ttl_seconds)
+
+    def get(self, key: str) -> dict | None:
+        entry = self._entries.get(key)
+        # Callers add to the result, never hand out the cached dict itself
+        return dict(entry) if entry is not None else None
+
+    def set(self, key: str, result: dict) -> None:
+        self._entries.set(key, dict(result))
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict[str, int | float | None]:
+        return self._entries.stats()
@@ -1,16 +1,16 @@
 """Helper functions for Conversation domain operations."""
 from datetime import datetime, timezone
 from typing import List, Optional
-from uuid import uuid4
+from uuid import UUID, uuid4
 
 from pdf_agent.domain.pdf.conversation import Conversation, Message
 
 
-def create_conversation(pdf_filename: str) -> Conversation:
+def create_conversation(pdf_filename: str, conversation_id: Optional[UUID] = None) -> Conversation:
     """Create a new conversation instance with default values."""
     now = datetime.now(timezone.utc)
     return Conversation(
-        id=uuid4(),
+        id=conversation_id or uuid4(),
         created_at=now,
         updated_at=now,
         pdf_filename=pdf_filename,
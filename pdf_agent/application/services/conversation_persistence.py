@@ -0,0 +1,248 @@
+"""Write-behind persistence of conversations and their messages to the database."""
+import asyncio
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from uuid import UUID, uuid4
+
+from pdf_agent.configs.log import get_logger
+from pdf_agent.domain.pdf.conversation import Conversation, ConversationMessage, Message
+from pdf_agent.infrastructure.database.engine import engine
+from pdf_agent.infrastructure.repositories.conversation_repository import ConversationRepository
+from pdf_agent.infrastructure.repositories.message_repository import MessageRepository
+from pdf_agent.infrastructure.repositories.unit_of_work import UnitOfWork
+
+logger = get_logger()
+
+# Failed flushes of a batch before it is dropped, so a bad row cannot block everything queued behind it
+MAX_FLUSH_ATTEMPTS = 3
+
+
+@dataclass
+class _PendingWrite:
+    """A queued change: a message appended to a conversation, a deleted conversation or all cleared."""
+    kind: str
+    conversation_id: UUID | None = None
+    conversation: Conversation | None = None
+    message: Message | None = None
+
+
+class ConversationPersistence:
+    """
+    Store conversations in the database without making requests wait for it.
+
+    Appended messages and deletions are queued in memory and written by one background task, in
+    batches of up to `batch_size` every `flush_interval` seconds: the conversations of a batch are
+    upserted and its messages inserted with one `bulk_insert`, in a single transaction. The queue
+    holds at most `max_pending` writes; beyond that the oldest are dropped and counted.
+
+    Conversations are loaded back lazily, with only their newest `load_messages` messages. Neither
+    loading nor deleting one waits for the queue to be written.
+    """
+
+    def __init__(self, flush_interval: float, batch_size: int, max_pending: int, load_messages: int):
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.load_messages = load_messages
+        self._pending: deque[_PendingWrite] = deque(maxlen=max_pending)
+        # The batch being written, no longer queued but not committed yet either
+        self._in_flight: list[_PendingWrite] = []
+        self._attempts = 0
+        self._lock = asyncio.Lock()
+        self._wake = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._flushed = 0
+        self._dropped = 0
+        self._failures = 0
+
+    def append(self, conversation: Conversation, message: Message) -> None:
+        """Queue a message just added to `conversation`."""
+        self._enqueue(_PendingWrite("message", conversation.id, conversation, message))
+
+    def clear(self) -> None:
+        """Queue the removal of every stored conversation; writes queued before it are moot."""
+        self._dropped += len(self._pending)
+        self._pending.clear()
+        self._enqueue(_PendingWrite("clear"))
+
+    def _enqueue(self, write: _PendingWrite) -> None:
+        if len(self._pending) == self._pending.maxlen:
+            self._dropped += 1
+        self._pending.append(write)
+        if len(self._pending) >= self.batch_size:
+            self._wake.set()
+        self._ensure_writer()
+
+    def _ensure_writer(self) -> None:
+        if self._task is None or self._task.done():
+            # Keep a reference, the event loop only holds weak ones
+            self._task = asyncio.get_running_loop().create_task(self._write_loop())
+
+    async def _write_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    async def flush(self) -> None:
+        """
+        Write everything queued so far, one batch at a time.
+
+        The lock is held per batch rather than for the whole queue, so a `delete` waits for at most
+        the batch being written.
+        """
+        while self._pending:
+            async with self._lock:
+                if not self._pending:
+                    return
+                batch = [self._pending.popleft() for _ in range(min(self.batch_size, len(self._pending)))]
+                self._in_flight = batch
+                try:
+                    await self._write(batch)
+                except Exception as e:
+                    self._failures += 1
+                    self._attempts += 1
+                    if self._attempts >= MAX_FLUSH_ATTEMPTS:
+                        logger.error(f"Dropping {len(batch)} conversation writes after {self._attempts} attempts: {e}")
+                        self._dropped += len(batch)
+                        self._attempts = 0
+                    else:
+                        logger.warning(f"Could not write {len(batch)} conversation changes, will retry: {e}")
+                        # Back to the front, ahead of newer writes, unless the queue filled up meanwhile
+                        self._pending.extendleft(reversed(batch[:self._pending.maxlen - len(self._pending)]))
+                    return
+                finally:
+                    self._in_flight = []
+                self._attempts = 0
+                self._flushed += len(batch)
+
+    async def _write(self, batch: list[_PendingWrite]) -> None:
+        async with UnitOfWork(engine) as uow:
+            conversation_repository = ConversationRepository(uow.connection)
+            message_repository = MessageRepository(uow.connection)
+            index = 0
+            while index < len(batch):
+                write = batch[index]
+                if write.kind == "message":
+                    # Consecutive appends go out together; deletions in between keep their order
+                    end = index
+                    while end < len(batch) and batch[end].kind == "message":
+                        end += 1
+                    await self._write_messages(conversation_repository, message_repository, batch[index:end])
+                    index = end
+                    continue
+                if write.kind == "delete":
+                    await conversation_repository.bulk_delete([write.conversation_id])
+                else:
+                    await conversation_repository.delete_all()
+                index += 1
+
+    async def _write_messages(
+        self,
+        conversation_repository: ConversationRepository,
+        message_repository: MessageRepository,
+        writes: list[_PendingWrite]
+    ) -> None:
+        conversations = {write.conversation_id: write.conversation for write in writes}
+        await conversation_repository.upsert_many(list(conversations.values()))
+        now = datetime.now(timezone.utc)
+        await message_repository.bulk_insert([
+            ConversationMessage(
+                id=uuid4(),
+                created_at=now,
+                updated_at=now,
+                conversation_id=write.conversation_id,
+                role=write.message.role,
+                content=write.message.content,
+                timestamp=write.message.timestamp,
+                sources=write.message.sources
+            )
+            for write in writes
+        ])
+
+    async def load(self, conversation_id: UUID) -> Conversation | None:
+        """
+        Load a stored conversation with its newest messages.
+
+        A conversation with writes still queued is taken from the queue instead: the conversation of
+        its newest queued message holds every message, written or not.
+
+        Returns:
+            The conversation, or None when it is not stored, its deletion is queued or the database
+            cannot be read
+        """
+        queued = self._newest_write(conversation_id)
+        if queued is not None:
+            return queued.conversation if queued.kind == "message" else None
+        try:
+            async with UnitOfWork(engine) as uow:
+                conversation = await ConversationRepository(uow.connection).get_by_id(conversation_id)
+                if conversation is None:
+                    return None
+                message_repository = MessageRepository(uow.connection)
+                total = await message_repository.count(conversation_id)
+                stored = await message_repository.get_recent(conversation_id, self.load_messages)
+        except Exception as e:
+            logger.warning(f"Could not load conversation {conversation_id}: {e}")
+            return None
+
+        conversation.messages = [
+            Message(role=message.role, content=message.content, timestamp=message.timestamp, sources=message.sources)
+            for message in stored
+        ]
+        # Counts become relative to the first loaded message; older summarized messages stay in the summary
+        conversation.loaded_from = total - len(stored)
+        conversation.summarized_count = max(conversation.summarized_count - conversation.loaded_from, 0)
+        logger.info(f"Loaded conversation {conversation_id} with {len(stored)} of {total} messages")
+        return conversation
+
+    async def delete(self, conversation_id: UUID) -> bool:
+        """
+        Delete a conversation from the database right away and drop its queued writes.
+
+        Returns:
+            Whether it was stored or had writes queued
+        """
+        # Only waits for the batch being written, which could otherwise store it again afterwards
+        async with self._lock:
+            queued = any(write.conversation_id == conversation_id for write in self._pending)
+            if queued:
+                self._pending = deque(
+                    (write for write in self._pending if write.conversation_id != conversation_id),
+                    maxlen=self._pending.maxlen
+                )
+            try:
+                async with UnitOfWork(engine) as uow:
+                    deleted = await ConversationRepository(uow.connection).bulk_delete([conversation_id])
+            except Exception as e:
+                logger.warning(f"Could not delete conversation {conversation_id}, queued for retry: {e}")
+                self._enqueue(_PendingWrite("delete", conversation_id))
+                return queued
+        return bool(deleted) or queued
+
+    def _newest_write(self, conversation_id: UUID) -> _PendingWrite | None:
+        """The latest write not committed yet that affects `conversation_id`, if any."""
+        for write in reversed([*self._in_flight, *self._pending]):
+            if write.kind == "clear" or write.conversation_id == conversation_id:
+                return write
+        return None
+
+    async def close(self) -> None:
+        """Write what is still queued and stop the background writer."""
+        if self._task is not None:
+            # Not in the middle of a batch, which would be rolled back and lost
+            async with self._lock:
+                self._task.cancel()
+                self._task = None
+        await self.flush()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "pending": len(self._pending),
+            "flushed": self._flushed,
+            "dropped": self._dropped,
+            "failures": self._failures
+        }
@@ -0,0 +1,65 @@
+"""Bounded in-memory store of per-session conversations."""
+from uuid import UUID
+
+from pdf_agent.application.services.conversation_helper import create_conversation
+from pdf_agent.configs.log import get_logger
+from pdf_agent.domain.pdf.conversation import Conversation
+from pdf_agent.utils.lru_cache import LRUCache
+
+logger = get_logger()
+
+# Rough per-message overhead (object, timestamp, sources) on top of its text
+MESSAGE_OVERHEAD_BYTES = 512
+
+
+def conversation_size(conversation: Conversation) -> int:
+    """Approximate memory held by a conversation, in bytes."""
+    messages = conversation.messages or []
+    return (
+        MESSAGE_OVERHEAD_BYTES + len(conversation.summary or "")
+        + sum(len(message.content) + MESSAGE_OVERHEAD_BYTES for message in messages)
+    )
+
+
+class ConversationStore:
+    """
+    Conversations keyed by id, evicted least recently used first.
+
+    Bounded by the number of conversations and their approximate total size; conversations idle for
+    longer than `idle_ttl_seconds` expire. Call `save` after changing a conversation so its size is
+    accounted for.
+    """
+
+    def __init__(self, max_conversations: int, idle_ttl_seconds: float, max_bytes: int):
+        self._entries: LRUCache[UUID, Conversation] = LRUCache(
+            max_conversations,
+            ttl_seconds=idle_ttl_seconds,
+            max_bytes=max_bytes,
+            sizeof=conversation_size,
+            sliding_ttl=True
+        )
+
+    def get(self, conversation_id: UUID) -> Conversation | None:
+        return self._entries.get(conversation_id)
+
+    def get_or_create(self, conversation_id: UUID, pdf_filename: str) -> Conversation:
+        """Return the conversation, starting a new one under this id when it is unknown or was evicted."""
+        conversation = self._entries.get(conversation_id)
+        if conversation is None:
+            logger.info(f"Starting conversation {conversation_id}")
+            conversation = create_conversation(pdf_filename=pdf_filename, conversation_id=conversation_id)
+            self._entries.set(conversation_id, conversation)
+        return conversation
+
+    def save(self, conversation: Conversation) -> None:
+        self._entries.set(conversation.id, conversation)
+
+    def remove(self, conversation_id: UUID) -> bool:
+        return self._entries.pop(conversation_id) is not None
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict[str, int | float | None]:
+        stats = self._entries.stats()
+        return {"active_sessions": stats.pop("entries"), **stats}
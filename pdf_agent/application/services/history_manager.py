@@ -0,0 +1,79 @@
+"""Token-budgeted conversation history with a rolling summary of older turns."""
+import asyncio
+from typing import Awaitable, Callable
+from uuid import UUID
+
+from pdf_agent.application.services.conversation_helper import get_conversation_history
+from pdf_agent.configs.log import get_logger
+from pdf_agent.domain.pdf.conversation import Conversation
+from pdf_agent.utils.tokens import count_tokens
+
+logger = get_logger()
+
+# (previous summary, messages to fold in, maximum words) -> updated summary
+Summarizer = Callable[[str | None, list[dict], int], Awaitable[str]]
+
+
+class HistoryManager:
+    """
+    Decide which part of a conversation is replayed to the LLM.
+
+    The newest turns are kept verbatim within `token_budget` tokens. Older messages are folded into
+    the conversation's rolling summary, which is extended with each batch of folded messages
+    instead of being recomputed, so the prompt stops growing with the length of the conversation.
+    """
+
+    def __init__(self, token_budget: int, summary_max_words: int):
+        self.token_budget = token_budget
+        self.summary_max_words = summary_max_words
+        self._folding: set[UUID] = set()
+        self._tasks: set[asyncio.Task] = set()
+
+    def window(self, conversation: Conversation) -> tuple[str | None, list[dict]]:
+        """
+        Context for the question just added to `conversation`.
+
+        Returns:
+            Tuple of (summary of older messages or None, recent messages before the question)
+        """
+        messages = get_conversation_history(conversation)[conversation.summarized_count:-1]
+        # Messages that should have been folded already (summarization lagging or failed) are dropped
+        return conversation.summary, messages[self._first_kept(messages):]
+
+    def schedule_fold(self, conversation: Conversation, summarize: Summarizer) -> None:
+        """Fold messages beyond the budget into the summary in the background, after the answer is out."""
+        task = asyncio.get_running_loop().create_task(self.fold(conversation, summarize))
+        # The event loop only keeps weak references to tasks
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def fold(self, conversation: Conversation, summarize: Summarizer) -> None:
+        """Fold the messages that no longer fit the budget into the conversation's summary."""
+        if conversation.id in self._folding:
+            return
+        self._folding.add(conversation.id)
+        try:
+            messages = get_conversation_history(conversation)[conversation.summarized_count:]
+            count = self._first_kept(messages)
+            if count == 0:
+                return
+            conversation.summary = await summarize(conversation.summary, messages[:count], self.summary_max_words)
+            conversation.summarized_count += count
+            logger.info(f"Folded {count} messages of conversation {conversation.id} into its summary")
+        except Exception as e:
+            logger.warning(f"Could not summarize conversation {conversation.id}: {e}")
+        finally:
+            self._folding.discard(conversation.id)
+
+    def _first_kept(self, messages: list[dict]) -> int:
+        """Index of the oldest message kept verbatim: whole turns, newest first, within the token budget."""
+        start = len(messages)
+        used = 0
+        for index in range(len(messages) - 1, -1, -1):
+            used += count_tokens(messages[index]["content"])
+            if used > self.token_budget:
+                break
+            # Only cut in front of a question, so no answer is replayed without its question
+            if messages[index]["role"] == "user":
+                start = index
+        return start
@@ -0,0 +1,78 @@
+"""Content-addressed cache of ingested PDFs."""
+from concurrent.futures import Future
+from dataclasses import dataclass
+from threading import Lock
+from typing import Callable
+
+import numpy as np
+
+from pdf_agent.configs.log import get_logger
+from pdf_agent.domain.pdf.pdf_document import PDFDocument
+from pdf_agent.utils.lru_cache import LRUCache
+
+logger = get_logger()
+
+
+@dataclass
+class IngestedDocument:
+    """Result of extracting, chunking and embedding one PDF."""
+    document: PDFDocument
+    vectors: np.ndarray
+
+
+class IngestionCache:
+    """
+    LRU cache of ingested documents keyed by file content hash and ingestion settings.
+
+    Concurrent requests for the same key share one in-flight ingestion: the first caller
+    runs the factory and the others wait for its result instead of repeating the work.
+    """
+
+    def __init__(self, max_entries: int):
+        self._entries: LRUCache[str, IngestedDocument] = LRUCache(max_entries)
+        self._in_flight: dict[str, Future[IngestedDocument]] = {}
+        self._lock = Lock()
+
+    def get_or_create(self, key: str, factory: Callable[[], IngestedDocument]) -> tuple[IngestedDocument, bool]:
+        """
+        Return the cached entry for `key`, creating it with `factory` on a miss.
+
+        Returns:
+            Tuple of (entry, cached) where `cached` is False only for the caller that ran the factory
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                return entry, True
+
+            future = self._in_flight.get(key)
+            is_owner = future is None
+            if future is None:
+                future = Future()
+                self._in_flight[key] = future
+
+        if not is_owner:
+            logger.info(f"Waiting for in-flight ingestion of {key}")
+            return future.result(), True
+
+        try:
+            entry = factory()
+        except BaseException as e:
+            with self._lock:
+                self._in_flight.pop(key, None)
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            self._entries.set(key, entry)
+            self._in_flight.pop(key, None)
+        future.set_result(entry)
+
+        return entry, False
+
+    def clear(self) -> None:
+        """Drop all cached entries (in-flight ingestions still complete)."""
+        self._entries.clear()
+
+    def stats(self) -> dict[str, int | float]:
+        return self._entries.stats()
@@ -0,0 +1,134 @@
+"""Background execution and progress tracking of PDF ingestion."""
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Callable
+from uuid import UUID, uuid4
+
+from pdf_agent.configs.log import get_logger
+from pdf_agent.domain.pdf.ingestion_job import IngestionJob, ProgressCallback
+from pdf_agent.domain.shared.enumerations import IngestionStage
+from pdf_agent.infrastructure.ingestion.job_store import JobStore
+from pdf_agent.utils.lru_cache import LRUCache
+
+logger = get_logger()
+
+# Finished jobs kept around so clients can still poll their status
+MAX_TRACKED_JOBS = 1000
+
+# Progress within a stage is published to other workers at most this often
+JOB_SAVE_INTERVAL_SECONDS = 0.5
+
+# Share of overall progress reached once extraction, and then embedding, is done
+EXTRACTED_PROGRESS = 0.5
+EMBEDDED_PROGRESS = 0.95
+
+
+def create_job(filename: str) -> IngestionJob:
+    """Create a new queued ingestion job."""
+    now = datetime.now(timezone.utc)
+    return IngestionJob(id=uuid4(), created_at=now, updated_at=now, filename=filename)
+
+
+def job_progress(job: IngestionJob) -> float:
+    """
+    Overall completion of a job between 0 and 1, never decreasing as the job moves through its stages.
+
+    Extraction covers up to `EXTRACTED_PROGRESS`, embedding up to `EMBEDDED_PROGRESS`; only a completed
+    job is at 1.
+    """
+    if job.stage == IngestionStage.COMPLETED:
+        return 1.0
+    if job.stage == IngestionStage.EXTRACTING:
+        return EXTRACTED_PROGRESS * job.pages_done / job.pages_total if job.pages_total else 0.0
+    if job.stage == IngestionStage.CHUNKING:
+        # Extraction is done; chunking is a single fast pass
+        return EXTRACTED_PROGRESS
+    if job.stage == IngestionStage.EMBEDDING:
+        done = job.chunks_done / job.chunks_total if job.chunks_total else 0.0
+        return EXTRACTED_PROGRESS + (EMBEDDED_PROGRESS - EXTRACTED_PROGRESS) * done
+    if job.stage == IngestionStage.INDEXING:
+        # Vectors are inserted in one step
+        return EMBEDDED_PROGRESS
+    return 0.0
+
+
+class IngestionJobManager:
+    """
+    Runs ingestions on a bounded thread pool so the event loop is never blocked by parsing or embedding.
+
+    With a `job_dir` the status of every job is also saved there, so any worker process can answer
+    status requests for jobs running in another one.
+    """
+
+    def __init__(self, max_concurrent: int, job_dir: str = ""):
+        self.max_concurrent = max(1, max_concurrent)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrent, thread_name_prefix="ingestion")
+        self._jobs: LRUCache[UUID, IngestionJob] = LRUCache(MAX_TRACKED_JOBS)
+        self._store = JobStore(job_dir, MAX_TRACKED_JOBS) if job_dir else None
+
+    def submit(self, filename: str, task: Callable[[ProgressCallback], dict]) -> IngestionJob:
+        """
+        Queue an ingestion and return its job right away.
+
+        Args:
+            filename: Original filename, for status reporting
+            task: Runs the ingestion, reporting progress through the given callback,
+                  and returns the result dict ({"status": "error", ...} on failure)
+        """
+        job = create_job(filename)
+        self._jobs.set(job.id, job)
+        self._save(job)
+        self._executor.submit(self._run, job, task)
+        logger.info(f"Queued ingestion job {job.id} for {filename}")
+        return job
+
+    def get(self, job_id: UUID) -> IngestionJob | None:
+        """The job, from this worker when it runs here, else as last saved by the worker running it."""
+        job = self._jobs.get(job_id)
+        if job is None and self._store is not None:
+            job = self._store.load(job_id)
+        return job
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, job: IngestionJob, task: Callable[[ProgressCallback], dict]) -> None:
+        last_saved = time.monotonic()
+
+        def progress(stage: IngestionStage, done: int, total: int) -> None:
+            nonlocal last_saved
+            stage_changed = stage != job.stage
+            job.stage = stage
+            if stage == IngestionStage.EXTRACTING:
+                job.pages_done, job.pages_total = done, total
+            elif stage != IngestionStage.INDEXING:
+                # Chunking reports the chunks it produced, embedding the chunks embedded; indexing keeps
+                # the counts of embedding rather than starting over from 0
+                job.chunks_done, job.chunks_total = done, total
+            job.updated_at = datetime.now(timezone.utc)
+            if stage_changed or time.monotonic() - last_saved >= JOB_SAVE_INTERVAL_SECONDS:
+                self._save(job)
+                last_saved = time.monotonic()
+
+        try:
+            result = task(progress)
+        except Exception as e:
+            logger.error(f"Ingestion job {job.id} failed: {e}")
+            result = {"status": "error", "message": str(e)}
+
+        if result.get("status") == "error":
+            job.stage = IngestionStage.FAILED
+            job.error = result.get("message")
+        else:
+            job.stage = IngestionStage.COMPLETED
+            job.result = result
+        job.updated_at = datetime.now(timezone.utc)
+        self._save(job)
+        if self._store is not None:
+            self._store.prune()
+        logger.info(f"Ingestion job {job.id} finished: {job.stage.value}")
+
+    def _save(self, job: IngestionJob) -> None:
+        if self._store is not None:
+            self._store.save(job)
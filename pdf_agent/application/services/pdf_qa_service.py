@@ -1,20 +1,48 @@
 """PDF Q&A Service - Application layer service."""
+import asyncio
+import os
+from dataclasses import dataclass, replace
+from datetime import datetime, timezone
+from typing import AsyncIterator, Collection
+from uuid import UUID, uuid4
 
 from pdf_agent.application.agent.pdf_qa_agent import PDFQAAgent
 from pdf_agent.application.base_service import BaseService
-from pdf_agent.application.services.conversation_helper import (
-    add_message, create_conversation, get_conversation_history
-)
+from pdf_agent.application.services.answer_cache import AnswerCache, answer_cache_key
+from pdf_agent.application.services.conversation_helper import add_message, get_conversation_history
+from pdf_agent.application.services.conversation_persistence import ConversationPersistence
+from pdf_agent.application.services.conversation_store import ConversationStore
+from pdf_agent.application.services.history_manager import HistoryManager
+from pdf_agent.application.services.ingestion_cache import IngestedDocument, IngestionCache
+from pdf_agent.application.services.ingestion_jobs import IngestionJobManager, job_progress
 from pdf_agent.application.services.pdf_document_helper import total_chunks
-from pdf_agent.configs.env import LLM_MODEL, LLM_PROVIDER, LLM_TEMPERATURE
+from pdf_agent.configs.env import (
+    ANSWER_CACHE_SIZE, ANSWER_CACHE_TTL, CONVERSATION_FLUSH_BATCH_SIZE, CONVERSATION_FLUSH_INTERVAL,
+    CONVERSATION_IDLE_TTL, CONVERSATION_LOAD_MESSAGES, CONVERSATION_MAX_PENDING, CONVERSATION_STORE_MAX_MB,
+    CONVERSATION_STORE_SIZE, HISTORY_SUMMARY_MAX_WORDS, HISTORY_TOKEN_BUDGET, INGESTION_CACHE_SIZE, INGESTION_JOB_DIR,
+    LLM_MODEL, LLM_PROVIDER, LLM_TEMPERATURE, MAX_CONCURRENT_INGESTIONS, PERSIST_CONVERSATIONS
+)
 from pdf_agent.configs.log import get_logger
 from pdf_agent.domain.pdf.conversation import Conversation
-from pdf_agent.infrastructure.pdf.pdf_processor import PDFProcessor
+from pdf_agent.domain.pdf.ingestion_job import IngestionJob, ProgressCallback
+from pdf_agent.domain.shared.enumerations import CacheStatus
+from pdf_agent.errors import DataNotFoundException
+from pdf_agent.infrastructure.pdf.pdf_processor import PDFProcessor, document_id, hash_file
 from pdf_agent.infrastructure.vectorstore.vector_store import VectorStore
+from pdf_agent.utils.tokens import count_tokens
 
 logger = get_logger()
 
 
+@dataclass
+class _Turn:
+    """A question being answered, with the context it is answered in."""
+    conversation: Conversation
+    summary: str | None
+    history: list[dict]
+    cache_key: str
+
+
 class PDFQAService(BaseService):
     """Service for managing PDF Q&A operations."""
 
@@ -23,17 +51,67 @@ class PDFQAService(BaseService):
         super().__init__()
         self.pdf_processor = PDFProcessor(chunk_size=1000, chunk_overlap=200)
         self.vector_store = VectorStore()
+        self.ingestion_cache = IngestionCache(max_entries=INGESTION_CACHE_SIZE)
+        self.ingestion_jobs = IngestionJobManager(max_concurrent=MAX_CONCURRENT_INGESTIONS, job_dir=INGESTION_JOB_DIR)
+        self.answer_cache = AnswerCache(ANSWER_CACHE_SIZE, ANSWER_CACHE_TTL) if ANSWER_CACHE_SIZE > 0 else None
         self.agent: PDFQAAgent | None = None
-        self.current_conversation: Conversation | None = None
+        # Each client session has its own conversation
+        self.conversations = ConversationStore(
+            CONVERSATION_STORE_SIZE, CONVERSATION_IDLE_TTL, CONVERSATION_STORE_MAX_MB * 1024 * 1024
+        )
+        self.history = HistoryManager(HISTORY_TOKEN_BUDGET, HISTORY_SUMMARY_MAX_WORDS)
+        # Database copy of the conversations, so they outlive evictions and worker restarts
+        self.persistence = ConversationPersistence(
+            CONVERSATION_FLUSH_INTERVAL, CONVERSATION_FLUSH_BATCH_SIZE, CONVERSATION_MAX_PENDING,
+            CONVERSATION_LOAD_MESSAGES
+        ) if PERSIST_CONVERSATIONS else None
         logger.info(f"PDFQAService initialized with {LLM_PROVIDER} provider")
 
-    def upload_and_index_pdf(self, file_path: str, filename: str) -> dict:
+    def submit_pdf(self, file_path: str, filename: str, content_hash: str | None = None) -> dict:
+        """
+        Queue a PDF for background ingestion.
+
+        The service takes ownership of `file_path` and deletes it once the job finishes.
+
+        Returns:
+            Dict with the queued job's status
+        """
+        def task(progress: ProgressCallback) -> dict:
+            try:
+                return self.upload_and_index_pdf(file_path, filename, content_hash, progress)
+            finally:
+                os.unlink(file_path)
+
+        job = self.ingestion_jobs.submit(filename, task)
+        return self._job_info(job)
+
+    def get_ingestion_job(self, job_id: UUID) -> dict | None:
+        """Get the status and progress of an ingestion job."""
+        job = self.ingestion_jobs.get(job_id)
+        return self._job_info(job) if job else None
+
+    def _job_info(self, job: IngestionJob) -> dict:
+        """Serialize a job together with its overall progress."""
+        return {**job.to_dict(), "progress": job_progress(job)}
+
+    def upload_and_index_pdf(
+        self,
+        file_path: str,
+        filename: str,
+        content_hash: str | None = None,
+        progress: ProgressCallback | None = None
+    ) -> dict:
         """
         Upload and index a PDF file.
 
+        Content that is already indexed is not processed again, and re-uploads of identical content
+        with the same chunking and embedding settings reuse the cached chunks and vectors.
+
         Args:
             file_path: Path to the PDF file
             filename: Original filename
+            content_hash: SHA-256 of the file content, computed from the file when not given
+            progress: Optional callback receiving (stage, done, total) updates
 
         Returns:
             Dict with status and document info
@@ -41,28 +119,46 @@ class PDFQAService(BaseService):
         try:
             logger.info(f"Processing PDF: {filename}")
 
-            # Process PDF
-            document = self.pdf_processor.process_pdf(file_path)
+            content_hash = content_hash or hash_file(file_path)
 
-            # Index in vector store
-            self.vector_store.index_document(document)
+            # Already indexed, by this worker or by another one sharing the index snapshots
+            indexed = self.vector_store.get_document(document_id(content_hash))
+            if indexed is not None:
+                logger.info(f"{filename} is already indexed as {indexed['id']} ({content_hash})")
+                self._get_agent()
+                return {
+                    "status": "success",
+                    "document_id": indexed["id"],
+                    "filename": indexed["filename"],
+                    "total_pages": indexed["total_pages"],
+                    "total_chunks": indexed["total_chunks"],
+                    "message": f"PDF '{filename}' is already indexed"
+                }
 
-            # Initialize agent if not already done
-            if not self.agent:
-                self.agent = PDFQAAgent(
-                    self.vector_store,
-                    model_name=LLM_MODEL,
-                    temperature=LLM_TEMPERATURE,
-                    provider=LLM_PROVIDER
-                )
+            cache_key = self._ingestion_key(content_hash)
 
-            # Start new conversation
-            self.current_conversation = create_conversation(pdf_filename=filename)
+            # Process and index, or reuse a previous ingestion of the same content
+            entry, cached = self.ingestion_cache.get_or_create(
+                cache_key,
+                lambda: self._ingest(file_path, filename, content_hash, progress)
+            )
+            if cached:
+                logger.info(f"Reusing cached ingestion of {filename} ({content_hash})")
+
+            now = datetime.now(timezone.utc)
+            document = replace(entry.document, filename=filename, upload_date=now, updated_at=now)
+
+            # Add to the corpus incrementally: only the new chunks are inserted
+            self.vector_store.add_document(document, vectors=entry.vectors, progress=progress)
+
+            # Initialize agent if not already done
+            self._get_agent()
 
             logger.info(f"Successfully indexed {filename} with {total_chunks(document)} chunks")
 
             return {
                 "status": "success",
+                "document_id": str(document.id),
                 "filename": document.filename,
                 "total_pages": document.total_pages,
                 "total_chunks": total_chunks(document),
@@ -76,70 +172,312 @@ class PDFQAService(BaseService):
                 "message": f"Failed to process PDF: {str(e)}"
             }
 
-    def ask_question(self, question: str) -> dict:
+    def _ingestion_key(self, content_hash: str) -> str:
+        """Cache key covering the file content and every setting that shapes its chunks and vectors."""
+        return f"{content_hash}|{self.pdf_processor.settings_key}|{self.vector_store.embedding_id}"
+
+    def _ingest(
+        self,
+        file_path: str,
+        filename: str,
+        content_hash: str,
+        progress: ProgressCallback | None = None
+    ) -> IngestedDocument:
+        """Extract, chunk and embed a PDF."""
+        document = self.pdf_processor.process_pdf(
+            file_path, filename=filename, content_hash=content_hash, progress=progress
+        )
+        if not document.chunks:
+            raise ValueError(f"No text could be extracted from '{filename}'")
+        vectors = self.vector_store.embed_document(document, progress)
+        return IngestedDocument(document=document, vectors=vectors)
+
+    async def ask_question(
+        self,
+        question: str,
+        conversation_id: UUID | None = None,
+        document_ids: Collection[UUID] | None = None,
+        use_cache: bool = True,
+        deadline: float | None = None
+    ) -> dict:
         """
-        Ask a question about the PDF.
+        Ask a question about the indexed PDFs.
+
+        Answers are cached per question, documents, conversation history and model settings,
+        so repeating a question skips the LLM and tool loop.
 
         Args:
             question: User's question
+            conversation_id: Conversation the question belongs to (a new one when None)
+            document_ids: Restrict the answer to these documents (optional)
+            use_cache: Whether a cached answer may be returned (a fresh answer is cached either way)
+            deadline: Unix time by which the answer is needed (optional)
 
         Returns:
-            Dict with answer and sources
+            Dict with answer, sources, the conversation id and the answer cache status (HIT, MISS or BYPASS)
+
+        Raises:
+            DataNotFoundException: when `conversation_id` is unknown, see `open_conversation`
         """
-        if not self.agent:
-            return {
-                "answer": "No PDF has been uploaded yet. Please upload a PDF first.",
-                "sources": [],
-                "error": "No agent initialized"
-            }
+        agent = self._get_agent()
+        if not agent:
+            return self._no_agent_result()
 
-        if not self.current_conversation:
-            self.current_conversation = create_conversation(
-                pdf_filename=self.vector_store.get_current_document_info().get("filename", "Unknown")
+        turn, result = await self._begin_turn(question, conversation_id, document_ids, use_cache)
+        if result is None:
+            # Ask the agent
+            result = await agent.ask(
+                question,
+                conversation_history=turn.history,
+                document_ids=document_ids,
+                summary=turn.summary,
+                deadline=deadline
             )
+            result = self._store_answer(turn, result, use_cache)
+
+        return self._end_turn(turn, result)
+
+    async def stream_question(
+        self,
+        question: str,
+        conversation_id: UUID | None = None,
+        document_ids: Collection[UUID] | None = None,
+        use_cache: bool = True,
+        deadline: float | None = None
+    ) -> AsyncIterator[tuple[str, dict]]:
+        """
+        Ask a question and yield (event, data) pairs as the agent works, see `PDFQAAgent.stream`.
+
+        The last event is always "answer", carrying the same dict as `ask_question`. A cached
+        answer is sent as that single event.
+        """
+        agent = self._get_agent()
+        if not agent:
+            yield "answer", self._no_agent_result()
+            return
+
+        turn, result = await self._begin_turn(question, conversation_id, document_ids, use_cache)
+        if result is not None:
+            yield "answer", self._end_turn(turn, result)
+            return
+
+        async for event, data in agent.stream(
+            question,
+            conversation_history=turn.history,
+            document_ids=document_ids,
+            summary=turn.summary,
+            deadline=deadline
+        ):
+            if event == "answer":
+                data = self._end_turn(turn, self._store_answer(turn, data, use_cache))
+            yield event, data
+
+    def _no_agent_result(self) -> dict:
+        return {
+            "answer": "No PDF has been uploaded yet. Please upload a PDF first.",
+            "sources": [],
+            "error": "No agent initialized"
+        }
+
+    async def _begin_turn(
+        self,
+        question: str,
+        conversation_id: UUID | None,
+        document_ids: Collection[UUID] | None,
+        use_cache: bool
+    ) -> tuple[_Turn, dict | None]:
+        """
+        Record the question in its conversation and look its answer up in the cache.
+
+        Returns:
+            Tuple of (the turn, cached result or None)
+        """
+        conversation = await self.open_conversation(conversation_id)
+        if conversation is None:
+            raise DataNotFoundException(detail=f"Conversation {conversation_id} not found")
 
         # Add user message to conversation
-        add_message(self.current_conversation, "user", question)
+        add_message(conversation, "user", question)
+        self.conversations.save(conversation)
+        self._persist_last_message(conversation)
+
+        # Recent messages and a summary of the older ones, within the history token budget
+        summary, history = self.history.window(conversation)
 
-        # Get conversation history for context
-        history = get_conversation_history(self.current_conversation)[:-1]  # Exclude current question
+        cache_key = self._answer_key(question, summary, history, document_ids)
+        result = self.answer_cache.get(cache_key) if self.answer_cache and use_cache else None
+        if result is not None:
+            logger.info("Answer cache hit")
+            result["cache"] = CacheStatus.HIT
+        return _Turn(conversation, summary, history, cache_key), result
 
-        # Ask the agent
-        result = self.agent.ask(question, conversation_history=history)
+    def _store_answer(self, turn: _Turn, result: dict, use_cache: bool) -> dict:
+        """Cache a fresh answer unless it failed or was cut short by the agent budget."""
+        exhausted = result.get("budget", {}).get("exhausted")
+        if self.answer_cache and not result.get("error") and not exhausted:
+            self.answer_cache.set(turn.cache_key, result)
+        result["cache"] = CacheStatus.MISS if self.answer_cache and use_cache else CacheStatus.BYPASS
+        return result
 
+    def _end_turn(self, turn: _Turn, result: dict) -> dict:
+        """Record the answer in the conversation and fold what no longer fits the history budget."""
+        conversation = turn.conversation
         # Add assistant response to conversation
         if "answer" in result:
             add_message(
-                self.current_conversation,
+                conversation,
                 "assistant",
                 result["answer"],
                 sources=result.get("sources", [])
             )
+            # Re-inserted so its grown size counts (and in case it was evicted meanwhile)
+            self.conversations.save(conversation)
+            self._persist_last_message(conversation)
+            if self.agent:
+                self.history.schedule_fold(conversation, self.agent.summarize)
 
+        result["conversation_id"] = str(conversation.id)
         return result
 
-    def get_document_info(self) -> dict:
-        """Get information about the currently indexed document."""
-        return self.vector_store.get_current_document_info()
+    async def open_conversation(self, conversation_id: UUID | None) -> Conversation | None:
+        """
+        The conversation to continue, or a new one when `conversation_id` is None.
+
+        An id that is neither in this worker's memory nor stored gives None instead of a new
+        conversation under that id: it may be held by another worker, and continuing it here would
+        fork its history.
+        """
+        if conversation_id is not None:
+            return await self._find_conversation(conversation_id)
+        documents = self.vector_store.list_documents()
+        return self.conversations.get_or_create(
+            uuid4(),
+            pdf_filename=documents[-1]["filename"] if documents else "Unknown"
+        )
+
+    async def _find_conversation(self, conversation_id: UUID) -> Conversation | None:
+        """The conversation from memory, else loaded back from the database when persistence is on."""
+        conversation = self.conversations.get(conversation_id)
+        if conversation is None and self.persistence:
+            conversation = await self.persistence.load(conversation_id)
+            if conversation is not None:
+                self.conversations.save(conversation)
+        return conversation
+
+    def _persist_last_message(self, conversation: Conversation) -> None:
+        """Queue the message just added to the conversation for the database."""
+        if self.persistence and conversation.messages:
+            self.persistence.append(conversation, conversation.messages[-1])
+
+    def _answer_key(
+        self,
+        question: str,
+        summary: str | None,
+        history: list[dict],
+        document_ids: Collection[UUID] | None
+    ) -> str:
+        """Answer cache key; document ids derive from the file content, so re-uploads keep their answers."""
+        indexed = [document["id"] for document in self.vector_store.list_documents()]
+        if document_ids is not None:
+            selected = {str(document_id) for document_id in document_ids}
+            indexed = [document_id for document_id in indexed if document_id in selected]
+        settings = (
+            f"{LLM_PROVIDER}|{LLM_MODEL}|{LLM_TEMPERATURE}|"
+            f"{self.pdf_processor.settings_key}|{self.vector_store.embedding_id}"
+        )
+        if summary:
+            history = [{"role": "summary", "content": summary}, *history]
+        return answer_cache_key(question, indexed, history, settings)
+
+    def _get_agent(self) -> PDFQAAgent | None:
+        """
+        Get the agent, creating it once the vector store has documents.
+
+        Documents may come from a snapshot published by another worker, so this worker
+        can answer questions without having ingested anything itself.
+        """
+        if not self.agent and self.vector_store.list_documents():
+            self.agent = self._create_agent()
+        return self.agent
+
+    def _create_agent(self) -> PDFQAAgent:
+        return PDFQAAgent(
+            self.vector_store,
+            model_name=LLM_MODEL,
+            temperature=LLM_TEMPERATURE,
+            provider=LLM_PROVIDER
+        )
+
+    def warm_up(self) -> None:
+        """
+        Do the one-off work the first request would otherwise pay for.
+
+        Runs a dummy embedding through the model and builds the agent, which creates the LLM
+        client and compiles the LangGraph workflow.
+        """
+        self.vector_store.warm_up()
+        # Loads (on first use, downloads) the tokenizer that measures conversation history
+        count_tokens("warm up")
+        if not self.agent:
+            try:
+                self.agent = self._create_agent()
+            except Exception as e:
+                # e.g. a missing API key; uploads still work and questions report the error
+                logger.warning(f"Could not create the agent during warm-up: {e}")
+
+    async def close(self) -> None:
+        """Write the conversation changes still queued before the worker exits."""
+        self.vector_store.close()
+        if self.persistence:
+            await self.persistence.close()
+
+    def list_documents(self) -> list:
+        """List the indexed documents."""
+        return self.vector_store.list_documents()
+
+    def remove_document(self, document_id: UUID) -> dict:
+        """Remove a document from the index."""
+        if not self.vector_store.remove_document(document_id):
+            return {"status": "info", "message": "Document is not indexed"}
+        return {"status": "success", "message": "Document removed"}
+
+    def get_stats(self) -> dict:
+        """Get cache and ingestion counters."""
+        return {
+            "ingestion_cache": self.ingestion_cache.stats(),
+            "answer_cache": self.answer_cache.stats() if self.answer_cache else None,
+            "conversations": self.conversations.stats(),
+            "conversation_persistence": self.persistence.stats() if self.persistence else None,
+            **self.vector_store.get_stats()
+        }
 
-    def get_conversation_history(self) -> list:
-        """Get the current conversation history."""
-        if not self.current_conversation:
+    async def get_conversation_history(self, conversation_id: UUID) -> list:
+        """Get the (recent) history of a conversation, empty when it is unknown or expired."""
+        conversation = await self._find_conversation(conversation_id)
+        if not conversation:
             return []
-        return get_conversation_history(self.current_conversation)
+        return get_conversation_history(conversation)
 
-    def clear_conversation(self) -> dict:
-        """Clear the current conversation history."""
-        if self.current_conversation:
-            filename = self.current_conversation.pdf_filename
-            self.current_conversation = create_conversation(pdf_filename=filename)
+    async def clear_conversation(self, conversation_id: UUID) -> dict:
+        """Clear a conversation's history."""
+        removed = self.conversations.remove(conversation_id)
+        if self.persistence:
+            # Stored conversations are deleted whether or not this worker has them in memory
+            removed = await self.persistence.delete(conversation_id) or removed
+        if removed:
             return {"status": "success", "message": "Conversation cleared"}
         return {"status": "info", "message": "No active conversation"}
 
-    def clear_all(self) -> dict:
-        """Clear everything (document, vector store, conversation)."""
-        self.vector_store.clear()
-        self.current_conversation = None
+    async def clear_all(self) -> dict:
+        """Clear everything (documents, vector store, conversation)."""
+        # Publishing the change takes the snapshot file lock and writes a checkpoint, off the event loop
+        await asyncio.to_thread(self.vector_store.clear)
+        self.ingestion_cache.clear()
+        if self.answer_cache:
+            self.answer_cache.clear()
+        self.conversations.clear()
+        if self.persistence:
+            self.persistence.clear()
         self.agent = None
         logger.info("Cleared all data")
         return {"status": "success", "message": "All data cleared"}
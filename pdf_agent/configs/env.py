@@ -1,4 +1,4 @@
-from os import getenv
+from os import cpu_count, getenv
 
 from dotenv import load_dotenv
 
@@ -30,4 +30,80 @@ LLM_MODEL = getenv('LLM_MODEL', 'gpt-4o-mini')
 LLM_TEMPERATURE = float(getenv('LLM_TEMPERATURE', '0.0'))
 CHUNK_SIZE = int(getenv('CHUNK_SIZE', '1000'))
 CHUNK_OVERLAP = int(getenv('CHUNK_OVERLAP', '200'))
+# offset: one pass over the whole document, chunks may span pages; recursive: LangChain splitter per page
+CHUNKING_STRATEGY = getenv('CHUNKING_STRATEGY', 'offset')
 EMBEDDING_MODEL = getenv('EMBEDDING_MODEL', 'sentence-transformers/all-MiniLM-L6-v2')
+
+# Embedding Backend Configuration (torch, torch-int8 or onnx; onnx needs `optimum[onnxruntime]`)
+EMBEDDING_BACKEND = getenv('EMBEDDING_BACKEND', 'torch')
+# ONNX file inside the model repository, e.g. onnx/model_qint8_avx512.onnx for a pre-quantized export
+EMBEDDING_ONNX_FILE = getenv('EMBEDDING_ONNX_FILE', '')
+
+# PDF Extraction Configuration
+PDF_EXTRACTION_WORKERS = int(getenv('PDF_EXTRACTION_WORKERS', str(cpu_count() or 1)))
+PDF_PARALLEL_MIN_PAGES = int(getenv('PDF_PARALLEL_MIN_PAGES', '50'))
+
+# Upload Configuration
+MAX_UPLOAD_SIZE_MB = int(getenv('MAX_UPLOAD_SIZE_MB', '100'))
+UPLOAD_BLOCK_SIZE = int(getenv('UPLOAD_BLOCK_SIZE', '1048576'))
+
+# Ingestion Configuration
+INGESTION_CACHE_SIZE = int(getenv('INGESTION_CACHE_SIZE', '16'))
+MAX_CONCURRENT_INGESTIONS = int(getenv('MAX_CONCURRENT_INGESTIONS', '2'))
+# Status of ingestion jobs shared by all workers (set to an empty string to keep it per worker)
+INGESTION_JOB_DIR = getenv('INGESTION_JOB_DIR', '.cache/jobs')
+
+# Embedding Cache Configuration (set EMBEDDING_CACHE_DIR to an empty string to disable)
+EMBEDDING_CACHE_DIR = getenv('EMBEDDING_CACHE_DIR', '.cache/embeddings')
+EMBEDDING_CACHE_MAX_MB = int(getenv('EMBEDDING_CACHE_MAX_MB', '512'))
+
+# Conversation Store Configuration (per-session conversations kept in memory)
+CONVERSATION_STORE_SIZE = int(getenv('CONVERSATION_STORE_SIZE', '10000'))
+CONVERSATION_IDLE_TTL = float(getenv('CONVERSATION_IDLE_TTL', '3600'))
+CONVERSATION_STORE_MAX_MB = int(getenv('CONVERSATION_STORE_MAX_MB', '256'))
+
+# Conversation Persistence Configuration (conversations written to the database in the background)
+PERSIST_CONVERSATIONS = getenv('PERSIST_CONVERSATIONS', 'false').lower() == 'true'
+CONVERSATION_FLUSH_INTERVAL = float(getenv('CONVERSATION_FLUSH_INTERVAL', '1.0'))
+CONVERSATION_FLUSH_BATCH_SIZE = int(getenv('CONVERSATION_FLUSH_BATCH_SIZE', '500'))
+CONVERSATION_MAX_PENDING = int(getenv('CONVERSATION_MAX_PENDING', '50000'))
+# Messages loaded back when a conversation is not in memory
+CONVERSATION_LOAD_MESSAGES = int(getenv('CONVERSATION_LOAD_MESSAGES', '50'))
+
+# Agent Configuration (threads running the blocking work of tool calls, e.g. vector searches)
+AGENT_TOOL_WORKERS = int(getenv('AGENT_TOOL_WORKERS', '4'))
+# Per-question budget; once spent the agent answers from what it has found so far
+AGENT_MAX_ITERATIONS = int(getenv('AGENT_MAX_ITERATIONS', '6'))
+AGENT_MAX_PROMPT_TOKENS = int(getenv('AGENT_MAX_PROMPT_TOKENS', '60000'))
+AGENT_MAX_COMPLETION_TOKENS = int(getenv('AGENT_MAX_COMPLETION_TOKENS', '4000'))
+AGENT_TIMEOUT_SECONDS = float(getenv('AGENT_TIMEOUT_SECONDS', '30'))
+AGENT_FINAL_ANSWER_RESERVE_SECONDS = float(getenv('AGENT_FINAL_ANSWER_RESERVE_SECONDS', '5'))
+
+# Conversation History Configuration
+# Recent messages replayed verbatim to the LLM fit in this many tokens; older ones are folded into a summary
+HISTORY_TOKEN_BUDGET = int(getenv('HISTORY_TOKEN_BUDGET', '2000'))
+HISTORY_SUMMARY_MAX_WORDS = int(getenv('HISTORY_SUMMARY_MAX_WORDS', '200'))
+
+# Answer Cache Configuration (set ANSWER_CACHE_SIZE to 0 to disable)
+ANSWER_CACHE_SIZE = int(getenv('ANSWER_CACHE_SIZE', '256'))
+ANSWER_CACHE_TTL = float(getenv('ANSWER_CACHE_TTL', '3600'))
+
+# Query Embedding Cache Configuration (set QUERY_EMBEDDING_CACHE_SIZE to 0 to disable)
+QUERY_EMBEDDING_CACHE_SIZE = int(getenv('QUERY_EMBEDDING_CACHE_SIZE', '4096'))
+QUERY_EMBEDDING_CACHE_TTL = float(getenv('QUERY_EMBEDDING_CACHE_TTL', '3600'))
+QUERY_EMBEDDING_CACHE_MAX_MB = int(getenv('QUERY_EMBEDDING_CACHE_MAX_MB', '16'))
+
+# Vector Index Configuration
+# auto picks flat, hnsw or ivfpq from the corpus size; set flat, hnsw or ivfpq to force one
+VECTOR_INDEX_TYPE = getenv('VECTOR_INDEX_TYPE', 'auto')
+VECTOR_INDEX_FLAT_MAX = int(getenv('VECTOR_INDEX_FLAT_MAX', '20000'))
+VECTOR_INDEX_HNSW_MAX = int(getenv('VECTOR_INDEX_HNSW_MAX', '500000'))
+# Latency/recall trade-off of the approximate indexes: fast, balanced or accurate
+VECTOR_INDEX_PROFILE = getenv('VECTOR_INDEX_PROFILE', 'balanced')
+
+# Index Snapshot Configuration (set INDEX_SNAPSHOT_DIR to an empty string to keep the index in memory only)
+INDEX_SNAPSHOT_DIR = getenv('INDEX_SNAPSHOT_DIR', '.cache/index')
+# Journaled index changes between two full checkpoints of the index
+INDEX_CHECKPOINT_INTERVAL = int(getenv('INDEX_CHECKPOINT_INTERVAL', '20'))
+# Seconds between checks for index changes published by other workers
+INDEX_REFRESH_INTERVAL = float(getenv('INDEX_REFRESH_INTERVAL', '1.0'))
@@ -1,4 +1,5 @@
 """Agent state entity for PDF Q&A agent."""
+import operator
 from typing import Annotated, TypedDict
 
 from langchain_core.messages import BaseMessage
@@ -8,5 +9,6 @@ from langgraph.graph.message import add_messages
 class AgentState(TypedDict):
     """State for the PDF Q&A agent."""
     messages: Annotated[list[BaseMessage], add_messages]
-    search_results: list[dict]
+    # Citations of the passages retrieved during the run, appended to by each tool step
+    search_results: Annotated[list[dict], operator.add]
     final_answer: str
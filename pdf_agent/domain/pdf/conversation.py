@@ -2,6 +2,7 @@
 from dataclasses import dataclass
 from datetime import datetime
 from typing import Any
+from uuid import UUID
 
 from pdf_agent.domain.shared.base_entity import BaseEntity
 
@@ -20,3 +21,22 @@ class Conversation(BaseEntity):
     """Conversation aggregate root."""
     pdf_filename: str
     messages: list[Message] | None = None
+    # Rolling summary of the first `summarized_count` messages, which are no longer replayed verbatim
+    summary: str | None = None
+    summarized_count: int = 0
+    # Position of `messages[0]` among all messages; older ones were not loaded back from the database
+    loaded_from: int = 0
+
+    class config(BaseEntity.config):
+        # Messages are stored in their own table, `loaded_from` only describes this copy
+        db_excluded_fields = ["messages", "loaded_from"]
+
+
+@dataclass
+class ConversationMessage(BaseEntity):
+    """A message as stored in the database, one row per message."""
+    conversation_id: UUID
+    role: str
+    content: str
+    timestamp: datetime
+    sources: list[dict[str, Any]] | None = None
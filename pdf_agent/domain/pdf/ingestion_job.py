@@ -0,0 +1,22 @@
+"""Ingestion job entity - tracks a PDF being processed in the background."""
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from pdf_agent.domain.shared.base_entity import BaseEntity
+from pdf_agent.domain.shared.enumerations import IngestionStage
+
+# Called as progress(stage, done, total) while a PDF moves through ingestion
+ProgressCallback = Callable[[IngestionStage, int, int], None]
+
+
+@dataclass
+class IngestionJob(BaseEntity):
+    """Background ingestion of one uploaded PDF."""
+    filename: str
+    stage: IngestionStage = IngestionStage.QUEUED
+    pages_total: int = 0
+    pages_done: int = 0
+    chunks_total: int = 0
+    chunks_done: int = 0
+    result: dict[str, Any] | None = None
+    error: str | None = None
@@ -1,6 +1,7 @@
 """PDF Document entity - represents a PDF in the domain."""
 from dataclasses import dataclass
 from datetime import datetime
+from typing import Sequence
 
 from pdf_agent.domain.shared.base_entity import BaseEntity
 
@@ -23,4 +24,5 @@ class PDFDocument(BaseEntity):
     total_pages: int
     file_size: int
     upload_date: datetime
-    chunks: list[PDFChunk] | None = None
+    # Any sequence of chunks; processed documents hold spans of their text that build chunks on access
+    chunks: Sequence[PDFChunk] | None = None
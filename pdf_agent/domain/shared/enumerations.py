@@ -27,6 +27,39 @@ class StrEnum(TypeDecorator[Enum]):
         return self._enumtype(value) if value is not None else None
 
 
+class IngestionStage(str, Enum):
+    QUEUED = 'queued'
+    EXTRACTING = 'extracting'
+    CHUNKING = 'chunking'
+    EMBEDDING = 'embedding'
+    INDEXING = 'indexing'
+    COMPLETED = 'completed'
+    FAILED = 'failed'
+
+
+class EmbeddingBackend(str, Enum):
+    TORCH = 'torch'
+    TORCH_INT8 = 'torch-int8'
+    ONNX = 'onnx'
+
+
+class VectorIndexType(str, Enum):
+    FLAT = 'flat'
+    HNSW = 'hnsw'
+    IVF_PQ = 'ivfpq'
+
+
+class ChunkingStrategy(str, Enum):
+    OFFSET = 'offset'
+    RECURSIVE = 'recursive'
+
+
+class CacheStatus(str, Enum):
+    HIT = 'HIT'
+    MISS = 'MISS'
+    BYPASS = 'BYPASS'
+
+
 # class HolidayType(StrEnum, str, Enum):
 #     RELIGIOUS = 'religious'
 #     NATIONAL = 'national'
@@ -1,6 +1,39 @@
-# Database schema definitions would go here
-# Currently empty as schema is managed through Alembic migrations
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Table, Text, func, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 
 from pdf_agent.infrastructure.database.engine import metadata
 
-__all__ = ['metadata']
+conversations = Table(
+    'conversations',
+    metadata,
+    Column('id', PG_UUID(as_uuid=True), primary_key=True),
+    Column('pdf_filename', String, nullable=False),
+    Column('summary', Text, nullable=True),
+    # Messages covered by the summary, counted from the first message of the conversation
+    Column('summarized_count', Integer, nullable=False, server_default='0'),
+    Column('created_at', DateTime(timezone=True), nullable=False, server_default=func.now()),
+    Column('updated_at', DateTime(timezone=True), nullable=False, server_default=func.now()),
+)
+
+messages = Table(
+    'messages',
+    metadata,
+    Column('id', PG_UUID(as_uuid=True), primary_key=True, server_default=text('gen_random_uuid()')),
+    Column(
+        'conversation_id',
+        PG_UUID(as_uuid=True),
+        ForeignKey('conversations.id', ondelete='CASCADE'),
+        nullable=False
+    ),
+    Column('role', String(16), nullable=False),
+    Column('content', Text, nullable=False),
+    Column('sources', JSONB, nullable=True),
+    Column('timestamp', DateTime(timezone=True), nullable=False),
+    Column('created_at', DateTime(timezone=True), nullable=False, server_default=func.now()),
+    Column('updated_at', DateTime(timezone=True), nullable=False, server_default=func.now()),
+    # Recent history of a conversation is read newest first
+    Index('ix_messages_conversation_id_timestamp', 'conversation_id', 'timestamp'),
+)
+
+__all__ = ['metadata', 'conversations', 'messages']
@@ -0,0 +1 @@
+"""Infrastructure ingestion package."""
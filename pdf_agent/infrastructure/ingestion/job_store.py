@@ -0,0 +1,74 @@
+"""Ingestion job status on disk, readable by every worker process."""
+import json
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+from uuid import UUID
+
+from pdf_agent.configs.log import get_logger
+from pdf_agent.domain.pdf.ingestion_job import IngestionJob
+from pdf_agent.domain.shared.enumerations import IngestionStage
+from pdf_agent.utils.date_parser import iso_str_to_datetime
+
+logger = get_logger()
+
+
+class JobStore:
+    """
+    One JSON file per job, replaced atomically on every save.
+
+    Jobs run in the worker that received the upload while status requests may reach any worker,
+    so each save is a complete file and readers never see a half-written one.
+    """
+
+    def __init__(self, directory: str, max_jobs: int):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_jobs = max_jobs
+
+    def save(self, job: IngestionJob) -> None:
+        path = self.directory / f"{job.id}.json"
+        tmp_path = self.directory / f"{job.id}.{os.getpid()}.tmp"
+        try:
+            tmp_path.write_text(json.dumps(job.to_dict()))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            # Status reporting must not fail the ingestion itself
+            logger.warning(f"Could not save ingestion job {job.id}: {e}")
+
+    def load(self, job_id: UUID) -> Optional[IngestionJob]:
+        try:
+            data = json.loads((self.directory / f"{job_id}.json").read_text())
+            job = IngestionJob.from_dict(data)
+            job.id = UUID(data["id"])
+            job.stage = IngestionStage(data["stage"])
+            job.created_at = _utc_datetime(data["created_at"])
+            job.updated_at = _utc_datetime(data["updated_at"])
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Could not read ingestion job {job_id}: {e}")
+            return None
+        return job
+
+    def prune(self) -> None:
+        """Delete the oldest job files beyond `max_jobs`."""
+        paths = sorted(self.directory.glob("*.json"), key=_modified_ns, reverse=True)
+        for path in paths[self.max_jobs:]:
+            path.unlink(missing_ok=True)
+
+
+def _utc_datetime(value: str) -> datetime:
+    parsed = iso_str_to_datetime(value)
+    if parsed is None:
+        raise ValueError(f"Invalid job timestamp: {value}")
+    return parsed.replace(tzinfo=timezone.utc)
+
+
+def _modified_ns(path: Path) -> int:
+    try:
+        return path.stat().st_mtime_ns
+    except FileNotFoundError:
+        # Pruned by another worker meanwhile
+        return 0
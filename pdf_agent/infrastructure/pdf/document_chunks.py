@@ -0,0 +1,144 @@
+"""Chunks of a document kept as spans of its text, sliced out only when a chunk is read."""
+import hashlib
+import sys
+from typing import Iterable, Iterator, List, Sequence, overload
+
+import numpy as np
+
+from pdf_agent.domain.pdf.pdf_document import PDFChunk
+from pdf_agent.infrastructure.pdf.offset_chunker import ChunkSpan, DocumentText
+
+# Characters of a chunk that go into its id
+CHUNK_ID_PREFIX = 50
+
+
+def chunk_id(page_number: int, chunk_index: int, prefix: str) -> str:
+    """Id of a chunk from its page, position and the first `CHUNK_ID_PREFIX` characters of its text."""
+    return hashlib.md5(f"{page_number}_{chunk_index}_{prefix[:CHUNK_ID_PREFIX]}".encode()).hexdigest()
+
+
+class DocumentChunks(Sequence[PDFChunk]):
+    """
+    The chunks of one document: a single text buffer and, per chunk, its [start, end) offsets into
+    it, the pages it starts and ends on and its id.
+
+    Chunking only produces these arrays. A chunk's string, and its `PDFChunk`, are built when the
+    chunk is read, e.g. while its batch is embedded or when it is a search hit.
+    """
+
+    __slots__ = ("text", "starts", "ends", "pages", "page_ends", "chunk_ids")
+
+    def __init__(
+        self,
+        text: str,
+        starts: np.ndarray,
+        ends: np.ndarray,
+        pages: np.ndarray,
+        page_ends: np.ndarray,
+        chunk_ids: np.ndarray
+    ):
+        self.text = text
+        self.starts = starts
+        self.ends = ends
+        self.pages = pages
+        self.page_ends = page_ends
+        self.chunk_ids = chunk_ids
+
+    @classmethod
+    def from_spans(cls, document: DocumentText, spans: Iterable[ChunkSpan]) -> "DocumentChunks":
+        """Chunks over the document buffer itself, which is shared rather than copied."""
+        span_list = list(spans)
+        text = document.text
+        return cls(
+            text,
+            np.array([span.start for span in span_list], dtype=np.int64),
+            np.array([span.end for span in span_list], dtype=np.int64),
+            np.array([span.page_number for span in span_list], dtype=np.int32),
+            np.array([span.page_end for span in span_list], dtype=np.int32),
+            np.array(
+                [
+                    chunk_id(span.page_number, index, text[span.start:span.start + CHUNK_ID_PREFIX]).encode()
+                    for index, span in enumerate(span_list)
+                ],
+                dtype=np.bytes_
+            )
+        )
+
+    @classmethod
+    def from_texts(cls, texts_with_pages: List[tuple[str, int]]) -> "DocumentChunks":
+        """Chunks split into separate strings, each on a single page, concatenated into one buffer."""
+        lengths = np.array([len(text) for text, _ in texts_with_pages], dtype=np.int64)
+        ends = np.cumsum(lengths)
+        pages = np.array([page for _, page in texts_with_pages], dtype=np.int32)
+        return cls(
+            "".join(text for text, _ in texts_with_pages),
+            ends - lengths,
+            ends,
+            pages,
+            pages.copy(),
+            np.array(
+                [chunk_id(page, index, text).encode() for index, (text, page) in enumerate(texts_with_pages)],
+                dtype=np.bytes_
+            )
+        )
+
+    @classmethod
+    def of(cls, chunks: Sequence[PDFChunk]) -> "DocumentChunks":
+        """`chunks` as DocumentChunks: as is when they already are, else concatenated into one buffer."""
+        if isinstance(chunks, DocumentChunks):
+            return chunks
+        converted = cls.from_texts([(chunk.content, chunk.page_number) for chunk in chunks])
+        converted.page_ends = np.array(
+            [chunk.metadata.get("page_end", chunk.page_number) for chunk in chunks], dtype=np.int32
+        )
+        converted.chunk_ids = np.array([chunk.chunk_id.encode() for chunk in chunks], dtype=np.bytes_)
+        return converted
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    @overload
+    def __getitem__(self, position: int) -> PDFChunk:
+        ...
+
+    @overload
+    def __getitem__(self, position: slice) -> List[PDFChunk]:
+        ...
+
+    def __getitem__(self, position: int | slice) -> PDFChunk | List[PDFChunk]:
+        if isinstance(position, slice):
+            return [self._chunk(index) for index in range(*position.indices(len(self)))]
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError(position)
+        return self._chunk(position)
+
+    def __iter__(self) -> Iterator[PDFChunk]:
+        return (self._chunk(position) for position in range(len(self)))
+
+    def content(self, position: int) -> str:
+        """Text of the chunk at `position`, sliced out of the buffer."""
+        return self.text[int(self.starts[position]):int(self.ends[position])]
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held, in bytes."""
+        arrays = (self.starts, self.ends, self.pages, self.page_ends, self.chunk_ids)
+        return sys.getsizeof(self.text) + sum(array.nbytes for array in arrays)
+
+    def _chunk(self, position: int) -> PDFChunk:
+        content = self.content(position)
+        page = int(self.pages[position])
+        return PDFChunk(
+            chunk_id=self.chunk_ids[position].decode(),
+            content=content,
+            page_number=page,
+            chunk_index=position,
+            metadata={
+                "page": page,
+                "page_end": int(self.page_ends[position]),
+                "chunk_index": position,
+                "char_count": len(content)
+            }
+        )
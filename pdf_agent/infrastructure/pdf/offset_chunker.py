@@ -0,0 +1,105 @@
+"""Single-pass chunker that cuts a whole document into overlapping spans of one text buffer."""
+from bisect import bisect_right
+from typing import Iterator, List, NamedTuple, Sequence
+
+# Joins consecutive pages in the document buffer; splits at page ends rank like paragraph breaks
+PAGE_SEPARATOR = "\n\n"
+
+# Preferred split points, best first; without any of them a chunk is cut at `chunk_size`
+SEPARATORS = ("\n\n", "\n", ". ", " ")
+
+
+class ChunkSpan(NamedTuple):
+    """A chunk as [start, end) offsets into the document buffer and the pages it covers."""
+    start: int
+    end: int
+    page_number: int
+    page_end: int
+
+
+class DocumentText:
+    """The text of all pages of a document in one buffer, with the offset each page starts at."""
+
+    def __init__(self, text_with_pages: Sequence[tuple[str, int]]):
+        self.text = PAGE_SEPARATOR.join(text for text, _ in text_with_pages)
+        self.page_starts: List[int] = []
+        self.page_numbers: List[int] = []
+        offset = 0
+        for text, page_num in text_with_pages:
+            self.page_starts.append(offset)
+            self.page_numbers.append(page_num)
+            offset += len(text) + len(PAGE_SEPARATOR)
+
+    def page_at(self, offset: int) -> int:
+        """Page number of the character at `offset`."""
+        return self.page_numbers[bisect_right(self.page_starts, offset) - 1]
+
+    def slice(self, span: ChunkSpan) -> str:
+        return self.text[span.start:span.end]
+
+
+class OffsetChunker:
+    """
+    Split a document in one pass over its text, without intermediate strings.
+
+    Each chunk is at most `chunk_size` characters and ends at the best separator within that window
+    (paragraph, line, sentence, word), like `RecursiveCharacterTextSplitter`. The next chunk starts
+    about `chunk_overlap` characters earlier, at a word boundary. Chunks may span pages; only offsets
+    are produced, so callers slice out the strings they actually need.
+    """
+
+    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 200, separators: Sequence[str] = SEPARATORS):
+        if not 0 <= chunk_overlap < chunk_size:
+            raise ValueError(f"chunk_overlap ({chunk_overlap}) must be smaller than chunk_size ({chunk_size})")
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.separators = separators
+
+    def chunk(self, document: DocumentText) -> Iterator[ChunkSpan]:
+        """Yield the chunks of a document in order, with the pages each one starts and ends on."""
+        for start, end in self.spans(document.text):
+            yield ChunkSpan(start, end, document.page_at(start), document.page_at(end - 1))
+
+    def spans(self, text: str) -> Iterator[tuple[int, int]]:
+        """Yield the (start, end) offsets of the chunks of `text`, stripped of surrounding whitespace."""
+        length = len(text)
+        start = _skip_space(text, 0, length)
+        while start < length:
+            end = length if start + self.chunk_size >= length else self._split_point(text, start)
+            stripped_end = _trim_space(text, start, end)
+            if stripped_end > start:
+                yield start, stripped_end
+            if end >= length:
+                return
+            start = _skip_space(text, self._overlap_start(text, start, end), length)
+
+    def _split_point(self, text: str, start: int) -> int:
+        """End of the chunk starting at `start`: just after the best separator in its window."""
+        limit = start + self.chunk_size
+        # A split before this point would leave the next chunk starting at or before `start`
+        earliest = start + self.chunk_overlap + 1
+        for separator in self.separators:
+            index = text.rfind(separator, earliest, limit)
+            if index != -1:
+                return index + len(separator)
+        return limit
+
+    def _overlap_start(self, text: str, start: int, end: int) -> int:
+        """Start of the chunk after [start, end): `chunk_overlap` back from `end`, moved to a word start."""
+        target = max(end - self.chunk_overlap, start + 1)
+        if target >= end:
+            return end
+        candidates = [index for index in (text.find(" ", target, end), text.find("\n", target, end)) if index != -1]
+        return min(candidates) + 1 if candidates else target
+
+
+def _skip_space(text: str, start: int, end: int) -> int:
+    while start < end and text[start].isspace():
+        start += 1
+    return start
+
+
+def _trim_space(text: str, start: int, end: int) -> int:
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return end
@@ -1,95 +1,228 @@
 """PDF processor - extracts text and chunks from PDF files."""
 import hashlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
+from threading import Lock
 from typing import List
 from uuid import UUID
 
 import pdfplumber
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 
-from pdf_agent.domain.pdf.pdf_document import PDFChunk, PDFDocument
+from pdf_agent.configs.env import CHUNKING_STRATEGY, PDF_EXTRACTION_WORKERS, PDF_PARALLEL_MIN_PAGES
+from pdf_agent.domain.pdf.ingestion_job import ProgressCallback
+from pdf_agent.domain.pdf.pdf_document import PDFDocument
+from pdf_agent.domain.shared.enumerations import ChunkingStrategy, IngestionStage
+from pdf_agent.infrastructure.pdf.document_chunks import DocumentChunks
+from pdf_agent.infrastructure.pdf.offset_chunker import DocumentText, OffsetChunker
+
+# Page ranges handed out per worker; more batches than workers keeps the pool busy
+# when some pages (scans, dense tables) are much slower to parse than others.
+BATCHES_PER_WORKER = 4
+
+
+def hash_file(pdf_path: str, block_size: int = 1024 * 1024) -> str:
+    """Return the SHA-256 hex digest of a file's content, read in blocks."""
+    digest = hashlib.sha256()
+    with open(pdf_path, "rb") as pdf_file:
+        while block := pdf_file.read(block_size):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def document_id(content_hash: str) -> UUID:
+    """Id of the document with the given content hash, so identical uploads share one id."""
+    return UUID(content_hash[:32])
+
+
+def extract_page_range(pdf_path: str, start: int, end: int) -> List[tuple[str, int]]:
+    """
+    Extract text from pages start..end (1-based, inclusive).
+    Runs inside a worker process, so the file is opened here rather than shared.
+    """
+    text_with_pages = []
+
+    with pdfplumber.open(pdf_path, pages=list(range(start, end + 1))) as pdf:
+        for page in pdf.pages:
+            text = page.extract_text()
+            if text:
+                text_with_pages.append((text, page.page_number))
+
+    return text_with_pages
 
 
 class PDFProcessor:
     """Handles PDF text extraction and chunking."""
 
-    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 200):
+    def __init__(
+        self,
+        chunk_size: int = 1000,
+        chunk_overlap: int = 200,
+        max_workers: int = PDF_EXTRACTION_WORKERS,
+        parallel_min_pages: int = PDF_PARALLEL_MIN_PAGES,
+        chunking_strategy: ChunkingStrategy | str = CHUNKING_STRATEGY
+    ):
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
+        self.chunking_strategy = ChunkingStrategy(chunking_strategy)
+        self.max_workers = max(1, max_workers)
+        self.parallel_min_pages = parallel_min_pages
+        self._executor: ProcessPoolExecutor | None = None
+        # Concurrent uploads would otherwise each start a pool, leaking all but one
+        self._executor_lock = Lock()
         self.text_splitter = RecursiveCharacterTextSplitter(
             chunk_size=chunk_size,
             chunk_overlap=chunk_overlap,
             length_function=len,
             separators=["\n\n", "\n", ". ", " ", ""]
         )
+        self.offset_chunker = OffsetChunker(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
 
-    def extract_text_from_pdf(self, pdf_path: str) -> List[tuple[str, int]]:
+    def extract_text_from_pdf(
+        self,
+        pdf_path: str,
+        progress: ProgressCallback | None = None
+    ) -> List[tuple[str, int]]:
         """
         Extract text from PDF with page numbers.
-        Returns: List of (text, page_number) tuples.
+        Documents with at least `parallel_min_pages` pages are split across a process pool.
+        Returns: List of (text, page_number) tuples, ordered by page.
         """
         text_with_pages = []
 
         with pdfplumber.open(pdf_path) as pdf:
-            for page_num, page in enumerate(pdf.pages, start=1):
-                text = page.extract_text()
-                if text:
-                    text_with_pages.append((text, page_num))
+            page_count = len(pdf.pages)
+            if self.max_workers <= 1 or page_count < self.parallel_min_pages:
+                for page_num, page in enumerate(pdf.pages, start=1):
+                    text = page.extract_text()
+                    if text:
+                        text_with_pages.append((text, page_num))
+                    if progress:
+                        progress(IngestionStage.EXTRACTING, page_num, page_count)
+                return text_with_pages
+
+        return self.extract_text_parallel(pdf_path, page_count, progress)
+
+    def extract_text_parallel(
+        self,
+        pdf_path: str,
+        page_count: int,
+        progress: ProgressCallback | None = None
+    ) -> List[tuple[str, int]]:
+        """Extract text by splitting the page range across the worker pool."""
+        if page_count == 0:
+            return []
+        batch_count = min(page_count, self.max_workers * BATCHES_PER_WORKER)
+        batch_size = -(-page_count // batch_count)
+        ranges = [
+            (start, min(start + batch_size - 1, page_count))
+            for start in range(1, page_count + 1, batch_size)
+        ]
+
+        text_with_pages = []
+        executor = self._get_executor()
+        # map() yields in submission order, so pages stay sorted
+        batches = executor.map(
+            extract_page_range,
+            [pdf_path] * len(ranges),
+            [start for start, _ in ranges],
+            [end for _, end in ranges]
+        )
+        for (_, end), batch in zip(ranges, batches):
+            text_with_pages.extend(batch)
+            if progress:
+                progress(IngestionStage.EXTRACTING, end, page_count)
 
         return text_with_pages
 
-    def chunk_text(self, text_with_pages: List[tuple[str, int]]) -> List[PDFChunk]:
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Lazily create the extraction pool; spawned workers avoid forking a threaded server."""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            return self._executor
+
+    def shutdown(self) -> None:
+        """Stop the extraction worker pool, if one was started."""
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def chunk_text(self, text_with_pages: List[tuple[str, int]]) -> DocumentChunks:
         """
         Chunk the extracted text while preserving page numbers.
+
+        With the offset strategy chunks may span pages; `page_number` is the page a chunk starts on
+        and its metadata also records the page it ends on. Chunks are spans of the document text
+        and their strings are only sliced out when a chunk is read.
         """
+        if self.chunking_strategy == ChunkingStrategy.RECURSIVE:
+            return self._chunk_pages(text_with_pages)
+
+        document = DocumentText(text_with_pages)
+        return DocumentChunks.from_spans(document, self.offset_chunker.chunk(document))
+
+    def _chunk_pages(self, text_with_pages: List[tuple[str, int]]) -> DocumentChunks:
+        """Split each page on its own with the LangChain splitter; chunks never span pages."""
         chunks = []
-        chunk_counter = 0
 
         for text, page_num in text_with_pages:
             # Split text into chunks
-            text_chunks = self.text_splitter.split_text(text)
-
-            for chunk_text in text_chunks:
-                chunk_id = hashlib.md5(
-                    f"{page_num}_{chunk_counter}_{chunk_text[:50]}".encode()
-                ).hexdigest()
-
-                chunk = PDFChunk(
-                    chunk_id=chunk_id,
-                    content=chunk_text,
-                    page_number=page_num,
-                    chunk_index=chunk_counter,
-                    metadata={
-                        "page": page_num,
-                        "chunk_index": chunk_counter,
-                        "char_count": len(chunk_text)
-                    }
-                )
-                chunks.append(chunk)
-                chunk_counter += 1
+            for chunk_text in self.text_splitter.split_text(text):
+                chunks.append((chunk_text, page_num))
+
+        return DocumentChunks.from_texts(chunks)
 
-        return chunks
+    @property
+    def settings_key(self) -> str:
+        """Identifies the chunking settings, for cache keys of processed output."""
+        return (
+            f"chunk_size={self.chunk_size};chunk_overlap={self.chunk_overlap};"
+            f"chunking={self.chunking_strategy.value}"
+        )
 
-    def process_pdf(self, pdf_path: str) -> PDFDocument:
+    def process_pdf(
+        self,
+        pdf_path: str,
+        filename: str | None = None,
+        content_hash: str | None = None,
+        progress: ProgressCallback | None = None
+    ) -> PDFDocument:
         """
         Process a PDF file end-to-end.
-        Returns: PDFDocument entity with all chunks.
+
+        Args:
+            pdf_path: Path to the PDF file
+            filename: Original filename (defaults to the file's own name)
+            content_hash: SHA-256 of the file content, computed here when not given
+            progress: Optional callback receiving (stage, done, total) updates
+
+        Returns: PDFDocument entity with all chunks; its id is derived from the content hash.
         """
         path = Path(pdf_path)
+        content_hash = content_hash or hash_file(pdf_path)
 
         # Extract text with page numbers
-        text_with_pages = self.extract_text_from_pdf(pdf_path)
+        text_with_pages = self.extract_text_from_pdf(pdf_path, progress)
 
-        # Chunk the text
+        # Chunk the text; its progress counts chunks, the page counters keep the extraction totals
+        if progress:
+            progress(IngestionStage.CHUNKING, 0, 0)
         chunks = self.chunk_text(text_with_pages)
+        if progress:
+            progress(IngestionStage.CHUNKING, len(chunks), len(chunks))
 
         # Create PDFDocument entity
         now = datetime.now(timezone.utc)
-        doc_id_str = hashlib.md5(path.name.encode()).hexdigest()
         document = PDFDocument(
-            id=UUID(doc_id_str[:32].ljust(32, '0')),
-            filename=path.name,
+            id=document_id(content_hash),
+            filename=filename or path.name,
             file_path=str(path.absolute()),
             total_pages=len(text_with_pages),
             chunks=chunks,
@@ -0,0 +1,39 @@
+from typing import Any
+
+from sqlalchemy import delete, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from pdf_agent.domain.pdf.conversation import Conversation
+from pdf_agent.infrastructure.database.schema import conversations
+from pdf_agent.infrastructure.repositories.base_repository import BaseRepository
+
+
+class ConversationRepository(BaseRepository[Conversation]):
+    def __init__(self, connection: AsyncConnection):
+        super().__init__(connection, Conversation, conversations)
+
+    async def upsert_many(self, entities: list[Conversation]) -> None:
+        """Insert the conversations, or update summary and timestamps of those already stored."""
+        if not entities:
+            return
+        data = [self._to_row(entity) for entity in entities]
+        stmt = insert(self.table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[self.table.c.id],
+            set_={
+                'summary': stmt.excluded.summary,
+                'summarized_count': stmt.excluded.summarized_count,
+                'updated_at': func.greatest(self.table.c.updated_at, stmt.excluded.updated_at)
+            }
+        )
+        await self.connection.execute(stmt, data)
+
+    async def delete_all(self) -> None:
+        await self.connection.execute(delete(self.table))
+
+    def _to_row(self, entity: Conversation) -> dict[str, Any]:
+        data = entity.to_dict(entity.config.db_excluded_fields, False)
+        # In memory the count is relative to the first loaded message, stored it counts from the first message
+        data['summarized_count'] = entity.loaded_from + entity.summarized_count
+        return data
@@ -0,0 +1,29 @@
+from uuid import UUID
+
+from sqlalchemy import desc, func, select
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from pdf_agent.domain.pdf.conversation import ConversationMessage
+from pdf_agent.infrastructure.database.schema import messages
+from pdf_agent.infrastructure.repositories.base_repository import BaseRepository
+
+
+class MessageRepository(BaseRepository[ConversationMessage]):
+    def __init__(self, connection: AsyncConnection):
+        super().__init__(connection, ConversationMessage, messages)
+
+    async def get_recent(self, conversation_id: UUID, limit: int) -> list[ConversationMessage]:
+        """The newest `limit` messages of a conversation, oldest first."""
+        cmd = (
+            self._get_select_statement()
+            .where(self.table.c.conversation_id == conversation_id)
+            .order_by(desc(self.table.c.timestamp))
+            .limit(limit)
+        )
+        result = await self.connection.execute(cmd)
+        return [self._map_row_to_model(row) for row in reversed(result.all())]
+
+    async def count(self, conversation_id: UUID) -> int:
+        cmd = select(func.count(self.table.c.id)).where(self.table.c.conversation_id == conversation_id)
+        result = await self.connection.execute(cmd)
+        return result.scalar_one()
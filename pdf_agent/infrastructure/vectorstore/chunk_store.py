@@ -0,0 +1,103 @@
+"""Compact columnar storage of indexed chunks, materialized as LangChain Documents on demand."""
+from bisect import bisect_right, insort
+from typing import List
+from uuid import UUID
+
+from langchain_core.documents import Document
+
+from pdf_agent.domain.pdf.pdf_document import PDFDocument
+from pdf_agent.infrastructure.pdf.document_chunks import DocumentChunks
+
+
+class ChunkColumns:
+    """
+    The chunks of one document under consecutive row ids.
+
+    Holds the document's `DocumentChunks` as produced by chunking: the document text stored once,
+    with start/end offsets, pages and ids of its chunks in numpy arrays, instead of a dataclass, a
+    Document and two metadata dicts per chunk. Overlapping chunks share their text.
+    """
+
+    __slots__ = ("document_id", "filename", "first_row", "chunks")
+
+    def __init__(self, document: PDFDocument, first_row: int):
+        self.document_id = document.id
+        self.filename = document.filename
+        self.first_row = first_row
+        self.chunks = DocumentChunks.of(document.chunks or [])
+
+    def __len__(self) -> int:
+        return len(self.chunks)
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held, in bytes."""
+        return self.chunks.nbytes
+
+    def document(self, position: int) -> Document:
+        """Build the LangChain Document of the chunk at `position` within this document."""
+        chunks = self.chunks
+        content = chunks.content(position)
+        page = int(chunks.pages[position])
+        return Document(
+            page_content=content,
+            metadata={
+                "chunk_id": chunks.chunk_ids[position].decode(),
+                "document_id": str(self.document_id),
+                "page_number": page,
+                "chunk_index": position,
+                "filename": self.filename,
+                "page": page,
+                "page_end": int(chunks.page_ends[position]),
+                "char_count": len(content)
+            }
+        )
+
+
+class ChunkStore:
+    """
+    Chunks of every indexed document, looked up by their index row id.
+
+    Rows of a document are consecutive, so a row is found by bisecting the first rows of the documents.
+    Documents are only built for the rows asked for, i.e. for search hits.
+    """
+
+    def __init__(self):
+        self._columns: dict[UUID, ChunkColumns] = {}
+        self._first_rows: List[int] = []
+        self._by_first_row: dict[int, ChunkColumns] = {}
+
+    def add(self, columns: ChunkColumns) -> None:
+        self._columns[columns.document_id] = columns
+        insort(self._first_rows, columns.first_row)
+        self._by_first_row[columns.first_row] = columns
+
+    def remove(self, document_id: UUID) -> None:
+        columns = self._columns.pop(document_id)
+        self._first_rows.remove(columns.first_row)
+        del self._by_first_row[columns.first_row]
+
+    def clear(self) -> None:
+        self._columns.clear()
+        self._first_rows.clear()
+        self._by_first_row.clear()
+
+    def get(self, row: int) -> Document:
+        """Document of the chunk indexed under `row`; raises KeyError for unknown rows."""
+        index = bisect_right(self._first_rows, row) - 1
+        if index >= 0:
+            columns = self._by_first_row[self._first_rows[index]]
+            if row - columns.first_row < len(columns):
+                return columns.document(row - columns.first_row)
+        raise KeyError(row)
+
+    def columns(self) -> dict[UUID, ChunkColumns]:
+        """Columns per document, e.g. for snapshots; not to be modified."""
+        return self._columns
+
+    def __len__(self) -> int:
+        return sum(len(columns) for columns in self._columns.values())
+
+    @property
+    def nbytes(self) -> int:
+        return sum(columns.nbytes for columns in self._columns.values())
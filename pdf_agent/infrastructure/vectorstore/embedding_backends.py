@@ -0,0 +1,62 @@
+"""Embedding model backends for CPU inference."""
+from importlib.util import find_spec
+
+from langchain_community.embeddings import HuggingFaceEmbeddings
+
+from pdf_agent.configs.log import get_logger
+from pdf_agent.domain.shared.enumerations import EmbeddingBackend
+
+logger = get_logger()
+
+
+def embedding_id(model_name: str, backend: EmbeddingBackend, onnx_file: str = "") -> str:
+    """
+    Identify the vectors a model/backend pair produces, for keying caches and snapshots.
+
+    Backends agree closely but not exactly, so vectors from different backends are never mixed.
+    The reference backend keeps the bare model name so existing caches stay valid.
+    """
+    if backend == EmbeddingBackend.TORCH:
+        return model_name
+    if backend == EmbeddingBackend.ONNX and onnx_file:
+        return f"{model_name}@{backend.value}:{onnx_file}"
+    return f"{model_name}@{backend.value}"
+
+
+def create_embeddings(
+    model_name: str,
+    backend: EmbeddingBackend = EmbeddingBackend.TORCH,
+    onnx_file: str = ""
+) -> HuggingFaceEmbeddings:
+    """
+    Load a sentence-transformers model on CPU with the given backend.
+
+    - torch: full-precision PyTorch (reference)
+    - torch-int8: PyTorch with Linear layers dynamically quantized to int8
+    - onnx: ONNX Runtime, exporting the model on first load unless the repository ships `onnx_file`
+    """
+    model_kwargs: dict = {'device': 'cpu'}
+    if backend == EmbeddingBackend.ONNX:
+        if find_spec("optimum") is None or find_spec("onnxruntime") is None:
+            raise ImportError(
+                "The onnx embedding backend needs ONNX Runtime. "
+                "Please install it with `pip install optimum[onnxruntime]`."
+            )
+        model_kwargs["backend"] = "onnx"
+        if onnx_file:
+            model_kwargs["model_kwargs"] = {"file_name": onnx_file}
+
+    embeddings = HuggingFaceEmbeddings(
+        model_name=model_name,
+        model_kwargs=model_kwargs,
+        encode_kwargs={'normalize_embeddings': True}
+    )
+
+    if backend == EmbeddingBackend.TORCH_INT8:
+        import torch
+
+        # Weights of every Linear layer become int8, activations are quantized on the fly
+        torch.ao.quantization.quantize_dynamic(embeddings.client, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+
+    logger.info(f"Loaded embedding model {model_name} with {backend.value} backend")
+    return embeddings
@@ -0,0 +1,300 @@
+"""Persistent on-disk cache of chunk embeddings keyed by normalized chunk text."""
+import hashlib
+import json
+import os
+import re
+from contextlib import contextmanager
+from pathlib import Path
+from threading import Lock
+from typing import Iterator, List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from pdf_agent.configs.log import get_logger
+
+try:
+    import fcntl
+except ImportError:  # Windows development machines; a single process uses the cache there
+    fcntl = None  # type: ignore[assignment]
+
+logger = get_logger()
+
+KEY_SIZE = 16
+VECTORS_FILE = "vectors.f32"
+KEYS_FILE = "keys.bin"
+META_FILE = "meta.json"
+LOCK_FILE = ".lock"
+
+# Evicting trims the cache to this fraction of its limit so eviction is not repeated on every write
+EVICTION_TARGET = 0.8
+
+
+def text_key(text: str) -> bytes:
+    """Hash of the chunk text with whitespace normalized."""
+    normalized = " ".join(text.split())
+    return hashlib.blake2b(normalized.encode("utf-8"), digest_size=KEY_SIZE).digest()
+
+
+class EmbeddingCache:
+    """
+    Embedding cache for one model, stored as a memory-mapped float32 matrix plus a hash index.
+
+    `vectors.f32` holds one row per cached chunk and `keys.bin` the matching 16-byte text hashes
+    in the same order. Both files are append-only until eviction compacts them; worker processes
+    sharing the directory serialize writes with a file lock and pick up each other's rows, reading
+    under a shared lock so they never see one file compacted and the other not yet.
+    """
+
+    def __init__(self, directory: str, model_name: str, max_bytes: int):
+        self.model_name = model_name
+        self.max_bytes = max_bytes
+        self.directory = Path(directory) / re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = Lock()
+        self._rows: dict[bytes, int] = {}
+        self._last_used: List[int] = []
+        self._clock = 0
+        self._dimension: Optional[int] = None
+        self._vectors: Optional[np.memmap] = None
+        self._keys_inode: Optional[int] = None
+        with self._lock, self._file_lock():
+            self._sync()
+            self._discard_partial_rows()
+
+    @property
+    def size_bytes(self) -> int:
+        return len(self._rows) * ((self._dimension or 0) * 4 + KEY_SIZE)
+
+    def get_many(self, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """Look up cached embeddings; missing entries are None."""
+        with self._lock:
+            with self._file_lock(shared=True):
+                self._sync()
+            results: List[Optional[np.ndarray]] = []
+            for text in texts:
+                row = self._rows.get(text_key(text))
+                if row is None or self._vectors is None:
+                    self.misses += 1
+                    results.append(None)
+                    continue
+                self.hits += 1
+                self._touch(row)
+                results.append(np.array(self._vectors[row]))
+            return results
+
+    def put_many(self, texts: List[str], vectors: List[List[float]]) -> None:
+        """Append new embeddings and evict the least recently used ones beyond `max_bytes`."""
+        if not texts:
+            return
+
+        matrix = np.asarray(vectors, dtype=np.float32)
+        with self._lock, self._file_lock():
+            self._sync()
+            if self._dimension != matrix.shape[1]:
+                if self._dimension is not None:
+                    logger.warning(f"Embedding dimension changed for {self.model_name}, resetting cache")
+                self._reset(matrix.shape[1])
+            # New rows are numbered from the rows read, so the files must hold exactly those
+            self._discard_partial_rows()
+
+            new_keys, new_rows = [], []
+            for text, vector in zip(texts, matrix):
+                key = text_key(text)
+                if key not in self._rows:
+                    self._rows[key] = len(self._last_used)
+                    self._last_used.append(0)
+                    self._touch(self._rows[key])
+                    new_keys.append(key)
+                    new_rows.append(vector)
+            if not new_keys:
+                return
+
+            # Vectors first: keys are only ever visible for rows that are fully written
+            with open(self.directory / VECTORS_FILE, "ab") as vectors_file:
+                vectors_file.write(np.stack(new_rows).tobytes())
+            with open(self.directory / KEYS_FILE, "ab") as keys_file:
+                keys_file.write(b"".join(new_keys))
+            self._keys_inode = (self.directory / KEYS_FILE).stat().st_ino
+
+            if self.size_bytes > self.max_bytes:
+                self._evict()
+            self._map_vectors()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "model": self.model_name,
+                "entries": len(self._rows),
+                "size_bytes": self.size_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+    @contextmanager
+    def _file_lock(self, shared: bool = False) -> Iterator[None]:
+        with open(self.directory / LOCK_FILE, "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _touch(self, row: int) -> None:
+        self._clock += 1
+        self._last_used[row] = self._clock
+
+    def _sync(self) -> None:
+        """Pick up rows appended, or files compacted, by other processes since the last look."""
+        keys_path = self.directory / KEYS_FILE
+        try:
+            keys_stat = keys_path.stat()
+        except FileNotFoundError:
+            if self._rows:
+                self._clear_memory()
+            self._keys_inode = None
+            return
+
+        if keys_stat.st_ino != self._keys_inode:
+            self._clear_memory()
+            self._dimension = None
+            self._keys_inode = keys_stat.st_ino
+        known = len(self._last_used)
+        if keys_stat.st_size < (known + 1) * KEY_SIZE:
+            return
+
+        if self._dimension is None:
+            meta_path = self.directory / META_FILE
+            if not meta_path.exists():
+                return
+            self._dimension = json.loads(meta_path.read_text())["dimension"]
+        assert self._dimension is not None
+
+        with open(keys_path, "rb") as keys_file:
+            keys_file.seek(known * KEY_SIZE)
+            tail = keys_file.read()
+        try:
+            vector_rows = (self.directory / VECTORS_FILE).stat().st_size // (self._dimension * 4)
+        except FileNotFoundError:
+            vector_rows = 0
+        if vector_rows < known:
+            # Compacted or reset under rows already read (only possible without fcntl): reload next time
+            self._clear_memory()
+            self._keys_inode = None
+            return
+        count = min(len(tail) // KEY_SIZE, vector_rows - known)
+
+        for offset in range(count):
+            self._rows[tail[offset * KEY_SIZE:(offset + 1) * KEY_SIZE]] = known + offset
+            # Files carry no access times, so insertion order stands in for recency
+            self._last_used.append(0)
+            self._touch(known + offset)
+        self._map_vectors()
+        if known == 0:
+            logger.info(f"Loaded {count} cached embeddings for {self.model_name}")
+
+    def _discard_partial_rows(self) -> None:
+        """
+        Cut both files back to the rows read by `_sync`, whose key and vector are both complete.
+
+        A writer that died between appending vectors and appending their keys leaves vector rows
+        without keys; rows appended after them would then be read back under the wrong keys.
+        Called with the file lock held, so no other writer is appending meanwhile.
+        """
+        if self._dimension is None:
+            return
+        rows = len(self._last_used)
+        for name, size in ((VECTORS_FILE, rows * self._dimension * 4), (KEYS_FILE, rows * KEY_SIZE)):
+            path = self.directory / name
+            try:
+                actual = path.stat().st_size
+            except FileNotFoundError:
+                continue
+            if actual > size:
+                logger.warning(f"Discarding {actual - size} bytes of an interrupted write to {path}")
+                os.truncate(path, size)
+
+    def _map_vectors(self) -> None:
+        rows = len(self._last_used)
+        if rows == 0 or self._dimension is None:
+            self._vectors = None
+            return
+        self._vectors = np.memmap(
+            self.directory / VECTORS_FILE, dtype=np.float32, mode="r", shape=(rows, self._dimension)
+        )
+
+    def _evict(self) -> None:
+        """Rewrite both files keeping only the most recently used rows."""
+        assert self._dimension is not None
+        row_bytes = self._dimension * 4 + KEY_SIZE
+        keep_count = int(self.max_bytes * EVICTION_TARGET) // row_bytes
+        keep = np.sort(np.argsort(np.asarray(self._last_used))[::-1][:keep_count])
+
+        keys_by_row = {row: key for key, row in self._rows.items()}
+        vectors = np.memmap(
+            self.directory / VECTORS_FILE, dtype=np.float32, mode="r", shape=(len(self._last_used), self._dimension)
+        )
+
+        tmp_vectors = self.directory / f"{VECTORS_FILE}.tmp"
+        tmp_keys = self.directory / f"{KEYS_FILE}.tmp"
+        np.ascontiguousarray(vectors[keep]).tofile(tmp_vectors)
+        tmp_keys.write_bytes(b"".join(keys_by_row[int(row)] for row in keep))
+        del vectors
+        self._vectors = None
+        os.replace(tmp_vectors, self.directory / VECTORS_FILE)
+        os.replace(tmp_keys, self.directory / KEYS_FILE)
+        self._keys_inode = (self.directory / KEYS_FILE).stat().st_ino
+
+        self.evictions += len(self._last_used) - len(keep)
+        self._rows = {keys_by_row[int(row)]: new_row for new_row, row in enumerate(keep)}
+        self._last_used = [self._last_used[int(row)] for row in keep]
+        logger.info(f"Evicted embedding cache for {self.model_name} down to {len(keep)} entries")
+
+    def _clear_memory(self) -> None:
+        self._vectors = None
+        self._rows = {}
+        self._last_used = []
+
+    def _reset(self, dimension: int) -> None:
+        """Start an empty cache for vectors of the given dimension."""
+        self._clear_memory()
+        self._dimension = dimension
+        for name in (VECTORS_FILE, KEYS_FILE):
+            (self.directory / name).unlink(missing_ok=True)
+        (self.directory / META_FILE).write_text(json.dumps({"model": self.model_name, "dimension": dimension}))
+        self._keys_inode = None
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper that only encodes chunks missing from an EmbeddingCache."""
+
+    def __init__(self, embeddings: Embeddings, cache: EmbeddingCache):
+        self.embeddings = embeddings
+        self.cache = cache
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        cached = self.cache.get_many(texts)
+        missing = [idx for idx, vector in enumerate(cached) if vector is None]
+
+        computed: List[List[float]] = []
+        if missing:
+            computed = self.embeddings.embed_documents([texts[idx] for idx in missing])
+            self.cache.put_many([texts[idx] for idx in missing], computed)
+
+        results: List[List[float]] = [vector.tolist() if vector is not None else [] for vector in cached]
+        for idx, vector in zip(missing, computed):
+            results[idx] = vector
+        logger.debug(f"Embedding cache: {len(texts) - len(missing)} hits, {len(missing)} misses")
+        return results
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embeddings.embed_query(text)
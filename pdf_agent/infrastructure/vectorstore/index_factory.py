@@ -0,0 +1,142 @@
+"""Selection and construction of the FAISS index structure for a corpus."""
+import math
+from dataclasses import dataclass
+from typing import Optional
+
+import faiss
+import numpy as np
+
+from pdf_agent.domain.shared.enumerations import VectorIndexType
+
+# IVF-PQ codebooks need ~39 training points per centroid (256 centroids per subquantizer)
+IVF_PQ_MIN_VECTORS = 39 * 256
+IVF_PQ_MAX_TRAINING_VECTORS = 50_000
+
+# Approximate indexes only ever move up this order as the corpus grows, see `select_index_type`
+INDEX_ORDER = [VectorIndexType.FLAT, VectorIndexType.HNSW, VectorIndexType.IVF_PQ]
+
+
+@dataclass(frozen=True)
+class IndexProfile:
+    """Latency/recall trade-off of the approximate indexes."""
+    hnsw_m: int
+    hnsw_ef_construction: int
+    hnsw_ef_search: int
+    ivf_nprobe: int
+    # Vector dimensions encoded by each 8-bit PQ code; fewer means larger, more accurate codes
+    pq_dims_per_code: int
+
+
+INDEX_PROFILES = {
+    "fast": IndexProfile(hnsw_m=16, hnsw_ef_construction=80, hnsw_ef_search=32, ivf_nprobe=8, pq_dims_per_code=4),
+    "balanced": IndexProfile(
+        hnsw_m=32, hnsw_ef_construction=120, hnsw_ef_search=64, ivf_nprobe=16, pq_dims_per_code=2
+    ),
+    "accurate": IndexProfile(
+        hnsw_m=48, hnsw_ef_construction=200, hnsw_ef_search=128, ivf_nprobe=32, pq_dims_per_code=1
+    ),
+}
+
+
+def select_index_type(
+    vector_count: int,
+    current: Optional[VectorIndexType] = None,
+    forced: Optional[VectorIndexType] = None,
+    flat_max: int = 20000,
+    hnsw_max: int = 500000
+) -> VectorIndexType:
+    """
+    Pick the index structure for a corpus of `vector_count` vectors.
+
+    Exact flat search below `flat_max`, HNSW up to `hnsw_max` and IVF-PQ beyond. The choice never
+    moves back down from `current` (documents being removed does not trigger a rebuild), and IVF-PQ
+    is only used once there are enough vectors to train its codebooks.
+    """
+    if forced is not None:
+        target = forced
+    elif vector_count <= flat_max:
+        target = VectorIndexType.FLAT
+    elif vector_count <= hnsw_max:
+        target = VectorIndexType.HNSW
+    else:
+        target = VectorIndexType.IVF_PQ
+
+    if current is not None and INDEX_ORDER.index(current) > INDEX_ORDER.index(target):
+        target = current
+    if target == VectorIndexType.IVF_PQ and vector_count < IVF_PQ_MIN_VECTORS:
+        target = VectorIndexType.HNSW
+    return target
+
+
+def build_index(
+    index_type: VectorIndexType,
+    vectors: np.ndarray,
+    ids: np.ndarray,
+    profile: IndexProfile
+) -> faiss.Index:
+    """Build an inner-product index of `index_type` holding `vectors` under the int64 `ids`."""
+    dimension = vectors.shape[1]
+
+    index: faiss.Index
+    if index_type == VectorIndexType.FLAT:
+        index = faiss.IndexIDMap2(faiss.IndexFlatIP(dimension))
+    elif index_type == VectorIndexType.HNSW:
+        hnsw = faiss.IndexHNSWFlat(dimension, profile.hnsw_m, faiss.METRIC_INNER_PRODUCT)
+        hnsw.hnsw.efConstruction = profile.hnsw_ef_construction
+        index = faiss.IndexIDMap2(hnsw)
+    else:
+        # IVF indexes store ids natively and, unlike an IDMap2 wrapper, support removal
+        nlist = max(1, min(int(4 * math.sqrt(len(vectors))), len(vectors) // 39))
+        quantizer = faiss.IndexFlatIP(dimension)
+        index = faiss.IndexIVFPQ(
+            quantizer, dimension, nlist, _pq_codes(dimension, profile.pq_dims_per_code), 8,
+            faiss.METRIC_INNER_PRODUCT
+        )
+        index.nprobe = profile.ivf_nprobe
+        rng = np.random.default_rng(0)
+        sample = vectors
+        if len(vectors) > IVF_PQ_MAX_TRAINING_VECTORS:
+            sample = vectors[rng.choice(len(vectors), IVF_PQ_MAX_TRAINING_VECTORS, replace=False)]
+        index.train(sample)
+
+    if len(vectors):
+        index.add_with_ids(vectors, ids)
+    return index
+
+
+def index_type_of(index: faiss.Index) -> VectorIndexType:
+    """Recognize an index built by `build_index`, e.g. after loading it from disk."""
+    index = faiss.downcast_index(index)
+    if isinstance(index, faiss.IndexIDMap2):
+        index = faiss.downcast_index(index.index)
+    if isinstance(index, faiss.IndexHNSW):
+        return VectorIndexType.HNSW
+    if isinstance(index, faiss.IndexIVF):
+        return VectorIndexType.IVF_PQ
+    return VectorIndexType.FLAT
+
+
+def supports_removal(index_type: VectorIndexType) -> bool:
+    """HNSW graphs cannot drop vectors; removed rows are masked out at search time instead."""
+    return index_type != VectorIndexType.HNSW
+
+
+def search_parameters(
+    index_type: VectorIndexType,
+    profile: IndexProfile,
+    k: int,
+    selector: Optional[faiss.IDSelector] = None
+) -> faiss.SearchParameters:
+    if index_type == VectorIndexType.HNSW:
+        return faiss.SearchParametersHNSW(sel=selector, efSearch=max(profile.hnsw_ef_search, k))
+    if index_type == VectorIndexType.IVF_PQ:
+        return faiss.SearchParametersIVF(sel=selector, nprobe=profile.ivf_nprobe)
+    return faiss.SearchParameters(sel=selector)
+
+
+def _pq_codes(dimension: int, dims_per_code: int) -> int:
+    """Number of PQ sub-quantizers: about dimension / dims_per_code, and a divisor of dimension."""
+    codes = max(1, dimension // dims_per_code)
+    while dimension % codes:
+        codes -= 1
+    return codes
@@ -0,0 +1,354 @@
+"""On-disk journal and checkpoints of the vector index shared by every worker process."""
+import json
+import os
+import re
+import shutil
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from threading import Lock
+from typing import Iterator, List, Optional
+from uuid import UUID
+
+import faiss
+import numpy as np
+
+from pdf_agent.configs.log import get_logger
+from pdf_agent.domain.pdf.pdf_document import PDFDocument
+from pdf_agent.infrastructure.pdf.document_chunks import DocumentChunks
+
+try:
+    import fcntl
+except ImportError:  # Windows development machines; a single process writes snapshots there
+    fcntl = None  # type: ignore[assignment]
+
+logger = get_logger()
+
+JOURNAL_DIR = "journal"
+POINTER_FILE = "CHECKPOINT"
+LOCK_FILE = ".lock"
+DOCUMENTS_DIR = "documents"
+CHECKPOINTS_DIR = "checkpoints"
+
+DOCUMENT_FILE = "document.json"
+TEXT_FILE = "text.txt"
+CHUNKS_FILE = "chunks.npz"
+VECTORS_FILE = "vectors.npy"
+INDEX_FILE = "index.faiss"
+MANIFEST_FILE = "manifest.json"
+TOMBSTONES_FILE = "tombstones.npy"
+
+# Older checkpoints are kept briefly so a worker loading one while it is superseded can still finish
+KEEP_CHECKPOINTS = 2
+
+
+@dataclass(frozen=True)
+class JournalPosition:
+    """Place in the journal: a segment, named by the checkpoint it starts at, and a byte offset in it."""
+    segment: int
+    offset: int
+
+
+@dataclass
+class StoredDocument:
+    """A published document: its details, its chunks and their vectors, memory-mapped."""
+    document: PDFDocument
+    chunks: DocumentChunks
+    vectors: np.ndarray
+
+
+@dataclass
+class Checkpoint:
+    """The whole index as of journal entry `seq`; later changes are replayed from the segment it starts."""
+    name: str
+    seq: int
+    next_row: int
+    has_index: bool
+    tombstones: set[int]
+    # (document id, stored document name, first row) in indexing order
+    documents: List[tuple[UUID, str, int]]
+
+
+class SnapshotStore:
+    """
+    Index changes of one embedding model, published for every worker.
+
+    Adding a document writes only that document (details, chunk offsets, text and raw vectors) to
+    `documents/<name>/` and appends one line to the journal; removals and clears are one line each.
+    Workers replay the lines appended since they last looked. Every so often the whole index is
+    written to `checkpoints/<name>/` and a new journal segment, `journal/<seq>.jsonl`, is started, so
+    workers started later replay only the segment since. Segments older than every kept checkpoint
+    are pruned with it.
+
+    Nothing is pickled: details and journal entries are JSON, arrays are `.npy`/`.npz` files loaded
+    without pickle support. Files are written under a temporary name and renamed, so readers never see
+    partial ones. Writers from all processes serialize on a file lock.
+    """
+
+    def __init__(self, directory: str, model_name: str):
+        self.directory = Path(directory) / re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name)
+        (self.directory / DOCUMENTS_DIR).mkdir(parents=True, exist_ok=True)
+        (self.directory / CHECKPOINTS_DIR).mkdir(parents=True, exist_ok=True)
+        (self.directory / JOURNAL_DIR).mkdir(parents=True, exist_ok=True)
+        self._lock = Lock()
+
+    def journal_end(self) -> JournalPosition:
+        """Cheap change marker: the end of the newest segment, as segments only ever grow."""
+        segments = self._segments()
+        if not segments:
+            return JournalPosition(0, 0)
+        try:
+            return JournalPosition(segments[-1], self._segment_path(segments[-1]).stat().st_size)
+        except FileNotFoundError:
+            return JournalPosition(segments[-1], 0)
+
+    def read_journal(self, position: JournalPosition) -> tuple[List[tuple[dict, JournalPosition]], JournalPosition]:
+        """
+        Read the complete journal entries after `position`, following on into later segments.
+
+        Returns:
+            The entries, each with the position just past it, and the position reading stopped at
+
+        Raises:
+            FileNotFoundError: The segment at `position` has been pruned
+        """
+        segments = self._segments()
+        if position.segment not in segments:
+            if any(segment > position.segment for segment in segments):
+                raise FileNotFoundError(f"Journal segment {position.segment} has been pruned")
+            return [], position
+
+        entries = []
+        for segment in [segment for segment in segments if segment >= position.segment]:
+            offset = position.offset if segment == position.segment else 0
+            with open(self._segment_path(segment), "rb") as journal:
+                journal.seek(offset)
+                data = journal.read()
+
+            # A line without its newline is still being written, or was cut short by a crash
+            # when a later segment exists
+            for line in data.splitlines(keepends=True):
+                if not line.endswith(b"\n"):
+                    break
+                offset += len(line)
+                try:
+                    entries.append((json.loads(line), JournalPosition(segment, offset)))
+                except ValueError as e:
+                    logger.warning(f"Skipping unreadable index journal entry: {e}")
+            position = JournalPosition(segment, offset)
+        return entries, position
+
+    def append(self, entries: List[dict], position: JournalPosition) -> JournalPosition:
+        """
+        Append entries to the journal, which the caller has read up to `position` while holding the lock.
+
+        Returns:
+            The new end of the journal
+        """
+        with open(self._segment_path(position.segment), "ab") as journal:
+            if journal.tell() > position.offset:
+                # Tail of a write interrupted by a crash
+                journal.truncate(position.offset)
+            journal.write(b"".join(json.dumps(entry).encode() + b"\n" for entry in entries))
+            journal.flush()
+            os.fsync(journal.fileno())
+            return JournalPosition(position.segment, journal.tell())
+
+    def write_document(self, document: PDFDocument, chunks: DocumentChunks, vectors: np.ndarray) -> str:
+        """Write a document about to be journaled; returns the name it is stored under."""
+        name = f"{document.id}-{time.time_ns()}"
+        tmp_dir = self.directory / DOCUMENTS_DIR / f"{name}.tmp"
+        tmp_dir.mkdir()
+
+        (tmp_dir / DOCUMENT_FILE).write_text(json.dumps({
+            "id": str(document.id),
+            "created_at": document.created_at.isoformat(),
+            "updated_at": document.updated_at.isoformat(),
+            "filename": document.filename,
+            "file_path": document.file_path,
+            "total_pages": document.total_pages,
+            "file_size": document.file_size,
+            "upload_date": document.upload_date.isoformat()
+        }))
+        # Bytes, so no newline translation shifts the chunk offsets
+        (tmp_dir / TEXT_FILE).write_bytes(chunks.text.encode("utf-8", "surrogatepass"))
+        np.savez(
+            tmp_dir / CHUNKS_FILE,
+            starts=chunks.starts,
+            ends=chunks.ends,
+            pages=chunks.pages,
+            page_ends=chunks.page_ends,
+            chunk_ids=chunks.chunk_ids
+        )
+        np.save(tmp_dir / VECTORS_FILE, vectors)
+
+        os.replace(tmp_dir, self.directory / DOCUMENTS_DIR / name)
+        return name
+
+    def read_document(self, name: str) -> StoredDocument:
+        """Load a stored document; raises FileNotFoundError once it has been pruned."""
+        path = self.directory / DOCUMENTS_DIR / name
+        details = json.loads((path / DOCUMENT_FILE).read_text())
+        document = PDFDocument(
+            id=UUID(details["id"]),
+            created_at=datetime.fromisoformat(details["created_at"]),
+            updated_at=datetime.fromisoformat(details["updated_at"]),
+            filename=details["filename"],
+            file_path=details["file_path"],
+            total_pages=details["total_pages"],
+            file_size=details["file_size"],
+            upload_date=datetime.fromisoformat(details["upload_date"])
+        )
+        with np.load(path / CHUNKS_FILE, allow_pickle=False) as arrays:
+            chunks = DocumentChunks(
+                (path / TEXT_FILE).read_bytes().decode("utf-8", "surrogatepass"),
+                arrays["starts"],
+                arrays["ends"],
+                arrays["pages"],
+                arrays["page_ends"],
+                arrays["chunk_ids"]
+            )
+        return StoredDocument(document, chunks, self.read_vectors(name))
+
+    def read_vectors(self, name: str) -> np.ndarray:
+        """A stored document's raw vectors, memory-mapped read-only."""
+        return np.load(self.directory / DOCUMENTS_DIR / name / VECTORS_FILE, mmap_mode="r", allow_pickle=False)
+
+    def current_checkpoint(self) -> Optional[str]:
+        try:
+            return (self.directory / POINTER_FILE).read_text().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def checkpoint_seq(self) -> int:
+        """Journal entry the current checkpoint was taken at, 0 before the first one."""
+        name = self.current_checkpoint()
+        return int(name.split("-")[0]) if name else 0
+
+    def load_checkpoint(self) -> Optional[Checkpoint]:
+        """Read the current checkpoint's manifest; its index is loaded separately with `load_index`."""
+        name = self.current_checkpoint()
+        if name is None:
+            return None
+
+        path = self.directory / CHECKPOINTS_DIR / name
+        manifest = json.loads((path / MANIFEST_FILE).read_text())
+        tombstones = np.load(path / TOMBSTONES_FILE, allow_pickle=False)
+        return Checkpoint(
+            name=name,
+            seq=manifest["seq"],
+            next_row=manifest["next_row"],
+            has_index=manifest["has_index"],
+            tombstones=set(tombstones.tolist()),
+            documents=[
+                (UUID(document["id"]), document["name"], document["first_row"])
+                for document in manifest["documents"]
+            ]
+        )
+
+    def load_index(self, checkpoint: str, mmap: bool = True) -> faiss.Index:
+        """
+        Load a checkpoint's index, memory-mapping its vectors when `mmap` is set.
+
+        A memory-mapped index is read-only; load it with `mmap=False` before mutating it.
+        """
+        flags = faiss.IO_FLAG_MMAP_IFC if mmap else 0
+        return faiss.read_index(str(self.directory / CHECKPOINTS_DIR / checkpoint / INDEX_FILE), flags)
+
+    def save_checkpoint(
+        self,
+        index: Optional[faiss.Index],
+        seq: int,
+        next_row: int,
+        tombstones: set[int],
+        documents: List[tuple[UUID, str, int]]
+    ) -> str:
+        """
+        Write the whole index as of journal entry `seq` and make it current; later entries go to
+        a new journal segment.
+
+        Returns:
+            The checkpoint's name
+        """
+        name = f"{seq:012d}-{time.time_ns()}"
+        tmp_dir = self.directory / CHECKPOINTS_DIR / f"{name}.tmp"
+        tmp_dir.mkdir()
+
+        if index is not None:
+            faiss.write_index(index, str(tmp_dir / INDEX_FILE))
+        np.save(tmp_dir / TOMBSTONES_FILE, np.fromiter(tombstones, dtype=np.int64, count=len(tombstones)))
+        (tmp_dir / MANIFEST_FILE).write_text(json.dumps({
+            "seq": seq,
+            "next_row": next_row,
+            "has_index": index is not None,
+            "documents": [
+                {"id": str(document_id), "name": document_name, "first_row": first_row}
+                for document_id, document_name, first_row in documents
+            ]
+        }))
+
+        os.replace(tmp_dir, self.directory / CHECKPOINTS_DIR / name)
+        # Started before the checkpoint is current, so whoever still replays the previous segment
+        # finds this one after it
+        self._segment_path(seq).touch()
+        tmp_pointer = self.directory / f"{POINTER_FILE}.tmp"
+        tmp_pointer.write_text(name)
+        os.replace(tmp_pointer, self.directory / POINTER_FILE)
+
+        self._prune({document_name for _, document_name, _ in documents})
+        logger.info(f"Saved index checkpoint {name} ({len(documents)} documents)")
+        return name
+
+    @contextmanager
+    def lock(self) -> Iterator[None]:
+        """Exclusive lock held while catching up with the journal, changing the index and publishing it."""
+        with self._lock, open(self.directory / LOCK_FILE, "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _segment_path(self, segment: int) -> Path:
+        return self.directory / JOURNAL_DIR / f"{segment:012d}.jsonl"
+
+    def _segments(self) -> List[int]:
+        """Journal segments, oldest first."""
+        return sorted(int(path.stem) for path in (self.directory / JOURNAL_DIR).glob("*.jsonl"))
+
+    def _prune(self, live_documents: set[str]) -> None:
+        """
+        Delete all but the newest checkpoints, the journal segments and documents none of them or
+        the live index refer to, and leftovers of interrupted writes.
+        """
+        checkpoints_dir = self.directory / CHECKPOINTS_DIR
+        # Names start with the zero-padded journal entry, so the current checkpoint sorts first
+        kept = sorted(
+            (path for path in checkpoints_dir.iterdir() if not path.name.endswith(".tmp")),
+            key=lambda path: path.name,
+            reverse=True
+        )[:KEEP_CHECKPOINTS]
+
+        referenced = set(live_documents)
+        for path in kept:
+            try:
+                manifest = json.loads((path / MANIFEST_FILE).read_text())
+            except (OSError, ValueError):
+                continue
+            referenced.update(document["name"] for document in manifest["documents"])
+
+        stale = [path for path in checkpoints_dir.iterdir() if path not in kept]
+        stale += [path for path in (self.directory / DOCUMENTS_DIR).iterdir() if path.name not in referenced]
+        for path in stale:
+            # Workers that memory-mapped these files keep their mapping after the unlink
+            shutil.rmtree(path, ignore_errors=True)
+
+        # The oldest kept checkpoint replays from its own segment on
+        oldest_seq = min((int(path.name.split("-")[0]) for path in kept), default=0)
+        for segment in self._segments():
+            if segment < oldest_seq:
+                self._segment_path(segment).unlink(missing_ok=True)
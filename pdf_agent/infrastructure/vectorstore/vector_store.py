@@ -1,110 +1,662 @@
 """In-memory vector store using FAISS and sentence transformers."""
-from typing import List, Optional, Tuple
+from contextlib import contextmanager
+from dataclasses import replace
+from threading import Event, Lock, Thread
+from typing import Collection, Iterator, List, Optional, Tuple
+from uuid import UUID
 
-from langchain_community.embeddings import HuggingFaceEmbeddings
-from langchain_community.vectorstores import FAISS
+import faiss
+import numpy as np
 from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
 
-from pdf_agent.application.services.pdf_document_helper import total_chunks
+from pdf_agent.configs.env import (
+    EMBEDDING_BACKEND, EMBEDDING_CACHE_DIR, EMBEDDING_CACHE_MAX_MB, EMBEDDING_ONNX_FILE, INDEX_CHECKPOINT_INTERVAL,
+    INDEX_REFRESH_INTERVAL, INDEX_SNAPSHOT_DIR, QUERY_EMBEDDING_CACHE_MAX_MB, QUERY_EMBEDDING_CACHE_SIZE,
+    QUERY_EMBEDDING_CACHE_TTL, VECTOR_INDEX_FLAT_MAX, VECTOR_INDEX_HNSW_MAX, VECTOR_INDEX_PROFILE, VECTOR_INDEX_TYPE
+)
 from pdf_agent.configs.log import get_logger
+from pdf_agent.domain.pdf.ingestion_job import ProgressCallback
 from pdf_agent.domain.pdf.pdf_document import PDFDocument
+from pdf_agent.domain.shared.enumerations import EmbeddingBackend, IngestionStage, VectorIndexType
+from pdf_agent.infrastructure.vectorstore.chunk_store import ChunkColumns, ChunkStore
+from pdf_agent.infrastructure.vectorstore.embedding_backends import create_embeddings, embedding_id
+from pdf_agent.infrastructure.vectorstore.embedding_cache import CachedEmbeddings, EmbeddingCache
+from pdf_agent.infrastructure.vectorstore.index_factory import (
+    INDEX_PROFILES, build_index, index_type_of, search_parameters, select_index_type, supports_removal
+)
+from pdf_agent.infrastructure.vectorstore.index_snapshot import JournalPosition, SnapshotStore
+from pdf_agent.utils.lru_cache import LRUCache
+from pdf_agent.utils.rw_lock import ReadWriteLock
 
 logger = get_logger()
 
+# Chunks embedded per call, so progress can be reported while a large document is encoded
+EMBEDDING_BATCH_SIZE = 256
+
+# An HNSW index is rebuilt without its removed rows once they make up this share of it
+TOMBSTONE_COMPACTION_RATIO = 0.2
+
 
 class VectorStore:
-    """In-memory vector store for PDF chunks using FAISS."""
+    """
+    In-memory vector store for the chunks of many PDFs in a single FAISS index.
+
+    Every chunk gets a stable int64 row id, so documents can be added and removed incrementally
+    and searches can be restricted to a set of documents with an IDSelector applied inside FAISS.
 
-    def __init__(self, embedding_model: str = "sentence-transformers/all-MiniLM-L6-v2"):
-        """Initialize vector store with embedding model."""
+    The index structure follows the corpus size: exact flat search for small corpora, HNSW for
+    mid-size ones and IVF-PQ for large ones, rebuilt from the stored vectors when a threshold is
+    crossed (see `select_index_type`). Rebuilds use the raw vectors kept per document, as IVF-PQ
+    only stores lossy codes; with snapshots they are memory-mapped from the published files.
+
+    When snapshots are enabled every change is published to disk as a delta (the added document or
+    the removed id) that the other workers apply in a background thread, checking every
+    `INDEX_REFRESH_INTERVAL` seconds, so reads never wait for it. Workers started later (or
+    recycled) memory-map the latest checkpoint of the whole index and apply the deltas since then,
+    instead of re-embedding anything.
+    """
+
+    def __init__(
+        self,
+        embedding_model: str = "sentence-transformers/all-MiniLM-L6-v2",
+        backend: EmbeddingBackend | str = EMBEDDING_BACKEND,
+        onnx_file: str = EMBEDDING_ONNX_FILE,
+        index_type: VectorIndexType | str = VECTOR_INDEX_TYPE,
+        index_profile: str = VECTOR_INDEX_PROFILE,
+        embedding_cache_dir: str = EMBEDDING_CACHE_DIR,
+        snapshot_dir: str = INDEX_SNAPSHOT_DIR,
+        query_cache_size: int = QUERY_EMBEDDING_CACHE_SIZE
+    ):
+        """Initialize vector store with embedding model and inference backend."""
         self.embedding_model = embedding_model
-        self.embeddings = HuggingFaceEmbeddings(
-            model_name=embedding_model,
-            model_kwargs={'device': 'cpu'},
-            encode_kwargs={'normalize_embeddings': True}
-        )
-        self.vector_store: Optional[FAISS] = None
-        self.current_document: Optional[PDFDocument] = None
-        logger.info(f"Initialized VectorStore with model: {embedding_model}")
+        self.backend = EmbeddingBackend(backend)
+        # Vectors from different backends are kept apart in caches and snapshots
+        self.embedding_id = embedding_id(embedding_model, self.backend, onnx_file)
+        self.embeddings: Embeddings = create_embeddings(embedding_model, self.backend, onnx_file)
+        self._query_embeddings = self.embeddings
+
+        # Reuse vectors of chunks seen before (e.g. unchanged pages of a revised edition)
+        self.embedding_cache: Optional[EmbeddingCache] = None
+        if embedding_cache_dir:
+            self.embedding_cache = EmbeddingCache(
+                embedding_cache_dir, self.embedding_id, max_bytes=EMBEDDING_CACHE_MAX_MB * 1024 * 1024
+            )
+            self.embeddings = CachedEmbeddings(self.embeddings, self.embedding_cache)
+
+        # Agents repeat the same searches within and across conversations; skip re-encoding them
+        self.query_cache: Optional[LRUCache[tuple[str, str], np.ndarray]] = None
+        if query_cache_size > 0:
+            self.query_cache = LRUCache(
+                query_cache_size,
+                ttl_seconds=QUERY_EMBEDDING_CACHE_TTL,
+                max_bytes=QUERY_EMBEDDING_CACHE_MAX_MB * 1024 * 1024,
+                sizeof=lambda vector: vector.nbytes
+            )
+
+        self.forced_index_type = None if index_type == "auto" else VectorIndexType(index_type)
+        self.index_profile = INDEX_PROFILES[index_profile]
+        self.index: Optional[faiss.Index] = None
+        self.index_type: Optional[VectorIndexType] = None
+        # Rows of removed chunks still in an index that cannot delete them (HNSW)
+        self._tombstones: set[int] = set()
+        # Document details only; their chunks live in the chunk store, by column
+        self.documents: dict[UUID, PDFDocument] = {}
+        self._chunks = ChunkStore()
+        self._document_rows: dict[UUID, np.ndarray] = {}
+        # Raw vectors of each document, in row order, for rebuilding the index
+        self._vectors: dict[UUID, np.ndarray] = {}
+        self._next_row = 0
+        # Searches run concurrently; adding or removing rows waits for them and blocks new ones
+        self._lock = ReadWriteLock()
+        self._write_mutex = Lock()
+
+        self._snapshots: Optional[SnapshotStore] = None
+        # Stored name of each published document, and how far into the journal this worker is
+        self._document_names: dict[UUID, str] = {}
+        self._journal_position: Optional[JournalPosition] = None
+        self._journal_seq = 0
+        self._checkpoint: Optional[str] = None
+        self._index_mapped = False
+        self._closed = Event()
+        if snapshot_dir:
+            self._snapshots = SnapshotStore(snapshot_dir, self.embedding_id)
+            with self._write_mutex:
+                self._catch_up()
+            Thread(target=self._refresh_loop, name="index-refresh", daemon=True).start()
+        logger.info(f"Initialized VectorStore with model: {embedding_model} ({self.backend.value} backend)")
 
     def index_document(self, document: PDFDocument) -> None:
-        """Index a PDF document's chunks into the vector store."""
-        if document.chunks is None:
+        """Replace everything in the vector store with a single PDF document's chunks."""
+        for document_id in list(self.documents):
+            self.remove_document(document_id)
+        self.add_document(document)
+
+    def embed_document(self, document: PDFDocument, progress: ProgressCallback | None = None) -> np.ndarray:
+        """Embed a document's chunks, in chunk order, without indexing them."""
+        chunks = document.chunks or []
+        vectors: List[List[float]] = []
+        for start in range(0, len(chunks), EMBEDDING_BATCH_SIZE):
+            # Only this batch's chunk strings are built
+            texts = [chunk.content for chunk in chunks[start:start + EMBEDDING_BATCH_SIZE]]
+            vectors.extend(self.embeddings.embed_documents(texts))
+            if progress:
+                progress(IngestionStage.EMBEDDING, len(vectors), len(chunks))
+        return np.asarray(vectors, dtype=np.float32)
+
+    def add_document(
+        self,
+        document: PDFDocument,
+        vectors: np.ndarray | None = None,
+        progress: ProgressCallback | None = None
+    ) -> None:
+        """
+        Insert a document's chunks into the index alongside the documents already there.
+
+        Only this document's chunks are embedded (or `vectors`, from `embed_document`, are used as is);
+        chunks already in the index are left untouched.
+        """
+        if not document.chunks:
             logger.warning(f"Document {document.filename} has no chunks")
             return
 
+        if self.has_document(document.id):
+            logger.info(f"Document {document.filename} is already indexed")
+            return
+
         logger.info(f"Indexing document: {document.filename} with {len(document.chunks)} chunks")
+        if vectors is None:
+            vectors = self.embed_document(document, progress)
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        chunk_count = len(document.chunks)
 
-        # Convert chunks to LangChain Document format
-        documents = []
-        for chunk in document.chunks:
-            doc = Document(
-                page_content=chunk.content,
-                metadata={
-                    "chunk_id": chunk.chunk_id,
-                    "page_number": chunk.page_number,
-                    "chunk_index": chunk.chunk_index,
-                    "filename": document.filename,
-                    **chunk.metadata
-                }
-            )
-            documents.append(doc)
+        if progress:
+            progress(IngestionStage.INDEXING, 0, chunk_count)
+        with self._mutation() as changes:
+            if document.id in self.documents:
+                return
 
-        # Create FAISS index
-        self.vector_store = FAISS.from_documents(documents, self.embeddings)
-        self.current_document = document
-        logger.info(f"Successfully indexed {len(documents)} chunks")
+            columns = ChunkColumns(document, self._next_row)
+            name = None
+            if self._snapshots is not None:
+                # Only this document is written; the other workers read it when they apply the change
+                name = self._snapshots.write_document(document, columns.chunks, vectors)
+                # Kept mapped from the file rather than in memory, the page cache can evict it
+                vectors = self._snapshots.read_vectors(name)
+            self._insert(replace(document, chunks=None), columns, vectors, name)
+            changes.append({
+                "op": "add",
+                "document_id": str(document.id),
+                "name": name,
+                "first_row": columns.first_row,
+                "count": chunk_count
+            })
+        if progress:
+            progress(IngestionStage.INDEXING, chunk_count, chunk_count)
+
+        logger.info(f"Successfully indexed {chunk_count} chunks")
+
+    def remove_document(self, document_id: UUID) -> bool:
+        """Delete a document's chunks from the index; returns False if it was not indexed."""
+        with self._mutation() as changes:
+            chunk_count = self._delete(document_id)
+            if chunk_count is None:
+                return False
+            changes.append({"op": "remove", "document_id": str(document_id)})
+
+        logger.info(f"Removed document {document_id} ({chunk_count} chunks) from the index")
+        return True
+
+    def has_document(self, document_id: UUID) -> bool:
+        with self._lock.read():
+            return document_id in self.documents
 
     def similarity_search(
         self,
         query: str,
         k: int = 4,
-        score_threshold: float = 0.0
+        score_threshold: Optional[float] = None,
+        document_ids: Optional[Collection[UUID]] = None
     ) -> List[Tuple[Document, float]]:
         """
-        Perform similarity search on the indexed document.
+        Perform similarity search across the indexed documents.
 
         Args:
             query: Natural language query
             k: Number of results to return
-            score_threshold: Minimum similarity score (0-1)
+            score_threshold: Minimum cosine similarity score (no filtering when None)
+            document_ids: Only search these documents (all documents when None)
+
+        Returns:
+            List of (Document, score) tuples, best match first
+        """
+        return self.similarity_search_batch([query], k, score_threshold, document_ids)[0]
+
+    def similarity_search_batch(
+        self,
+        queries: List[str],
+        k: int = 4,
+        score_threshold: Optional[float] = None,
+        document_ids: Optional[Collection[UUID]] = None
+    ) -> List[List[Tuple[Document, float]]]:
+        """
+        Search several queries at once, with one encoder batch and one FAISS search call.
+
+        Args:
+            queries: Natural language queries
+            k: Number of results to return per query
+            score_threshold: Minimum cosine similarity score (no filtering when None)
+            document_ids: Only search these documents (all documents when None)
 
         Returns:
-            List of (Document, score) tuples
+            One list of (Document, score) tuples per query, best match first
         """
-        if not self.vector_store:
+        if self.index is None:
             logger.warning("No document indexed in vector store")
-            return []
+            return [[] for _ in queries]
+
+        logger.info(f"Searching for: {queries} (top {k} results)")
 
-        logger.info(f"Searching for: '{query}' (top {k} results)")
+        # Encode outside the lock, only the index lookup has to wait for writers
+        embeddings = self._embed_queries(queries)
 
-        # Perform similarity search with scores
-        results = self.vector_store.similarity_search_with_score(query, k=k)
+        with self._lock.read():
+            if self.index is None:
+                return [[] for _ in queries]
+
+            # Keep selectors referenced until the search is done, FAISS only holds raw pointers
+            selector, excluded = None, None
+            if document_ids is not None:
+                # Restrict the scan itself to the selected documents' rows
+                rows = [self._document_rows[doc_id] for doc_id in document_ids if doc_id in self._document_rows]
+                if not rows:
+                    return [[] for _ in queries]
+                selector = faiss.IDSelectorBatch(np.concatenate(rows))
+            elif self._tombstones:
+                excluded = faiss.IDSelectorBatch(np.fromiter(self._tombstones, dtype=np.int64))
+                selector = faiss.IDSelectorNot(excluded)
+            params = search_parameters(self.index_type or VectorIndexType.FLAT, self.index_profile, k, selector)
+
+            scores, ids = self.index.search(embeddings, k, params=params)
+            results = [
+                [
+                    # Documents are only built for the hits
+                    (self._chunks.get(row), float(score))
+                    for score, row in zip(query_scores, query_ids)
+                    if row != -1
+                ]
+                for query_scores, query_ids in zip(scores.tolist(), ids.tolist())
+            ]
 
         # Filter by score threshold if needed
-        filtered_results = [
-            (doc, score) for doc, score in results
-            if score >= score_threshold
+        if score_threshold is not None:
+            results = [
+                [(doc, score) for doc, score in query_results if score >= score_threshold]
+                for query_results in results
+            ]
+            logger.info(f"Found {sum(map(len, results))} results above threshold {score_threshold}")
+        else:
+            logger.info(f"Found {sum(map(len, results))} results")
+
+        return results
+
+    def warm_up(self) -> None:
+        """Run a dummy embedding and search so model weights and index pages are loaded before the first query."""
+        embedding = np.asarray([self.embeddings.embed_query("warm up")], dtype=np.float32)
+        with self._lock.read():
+            if self.index is not None:
+                self.index.search(embedding, 1)
+        logger.info("Vector store warmed up")
+
+    def _embed_queries(self, queries: List[str]) -> np.ndarray:
+        """Embed search queries as a (len(queries), dimension) array, through the query cache when enabled."""
+        # Whitespace differences do not change the tokens, so such queries share an entry
+        texts = [" ".join(query.split()) for query in queries]
+        cached = [
+            self.query_cache.get((self.embedding_id, text)) if self.query_cache is not None else None
+            for text in texts
         ]
+        missing = list(dict.fromkeys(text for text, vector in zip(texts, cached) if vector is None))
+
+        computed: dict[str, np.ndarray] = {}
+        if missing:
+            # sentence-transformers encodes queries like documents, so one batch covers them all;
+            # the raw model is used because queries do not belong in the chunk embedding cache
+            vectors = np.asarray(self._query_embeddings.embed_documents(missing), dtype=np.float32)
+            for text, row in zip(missing, vectors):
+                # A copy, so a cached row does not keep the whole batch alive
+                vector = row.copy()
+                # Shared between concurrent searches, so it must not be modified in place
+                vector.flags.writeable = False
+                computed[text] = vector
+                if self.query_cache is not None:
+                    self.query_cache.set((self.embedding_id, text), vector)
 
-        logger.info(f"Found {len(filtered_results)} results above threshold {score_threshold}")
+        return np.stack([
+            vector if vector is not None else computed[text]
+            for text, vector in zip(texts, cached)
+        ])
 
-        return filtered_results
+    def list_documents(self) -> List[dict]:
+        """Get information about every indexed document, in indexing order."""
+        with self._lock.read():
+            documents = [(document, len(self._document_rows[document.id])) for document in self.documents.values()]
 
-    def get_current_document_info(self) -> dict:
-        """Get information about the currently indexed document."""
-        if not self.current_document:
-            return {"status": "No document indexed"}
+        return [self._document_info(document, chunk_count) for document, chunk_count in documents]
 
+    def get_document(self, document_id: UUID) -> Optional[dict]:
+        """Get information about an indexed document, or None if it is not indexed."""
+        with self._lock.read():
+            document = self.documents.get(document_id)
+            if document is None:
+                return None
+            chunk_count = len(self._document_rows[document_id])
+        return self._document_info(document, chunk_count)
+
+    def get_stats(self) -> dict:
+        """Get index size and cache counters of the vector store."""
+        with self._lock.read():
+            total_vectors = self.index.ntotal - len(self._tombstones) if self.index is not None else 0
+            total_documents = len(self.documents)
+            index_type = self.index_type.value if self.index_type else None
+            tombstones = len(self._tombstones)
+            chunk_store_bytes = self._chunks.nbytes
         return {
-            "filename": self.current_document.filename,
-            "total_pages": self.current_document.total_pages,
-            "total_chunks": total_chunks(self.current_document),
-            "upload_date": self.current_document.upload_date.isoformat()
+            "documents": total_documents,
+            "vectors": total_vectors,
+            "index_type": index_type,
+            "tombstones": tombstones,
+            "chunk_store_bytes": chunk_store_bytes,
+            "embedding_cache": self.embedding_cache.stats() if self.embedding_cache else None,
+            "query_cache": self.query_cache.stats() if self.query_cache is not None else None,
+            "snapshot_version": self._journal_seq if self._snapshots is not None else None
         }
 
     def clear(self) -> None:
         """Clear the vector store."""
-        self.vector_store = None
-        self.current_document = None
+        with self._mutation() as changes:
+            self._reset()
+            changes.append({"op": "clear"})
         logger.info("Vector store cleared")
+
+    def close(self) -> None:
+        """Stop applying the changes of other workers."""
+        self._closed.set()
+
+    @staticmethod
+    def _document_info(document: PDFDocument, chunk_count: int) -> dict:
+        return {
+            "id": str(document.id),
+            "filename": document.filename,
+            "total_pages": document.total_pages,
+            "total_chunks": chunk_count,
+            "upload_date": document.upload_date.isoformat()
+        }
+
+    def _insert(
+        self,
+        document: PDFDocument,
+        columns: ChunkColumns,
+        vectors: np.ndarray,
+        name: Optional[str]
+    ) -> None:
+        """Index a document's vectors under the rows of `columns`; runs within a mutation or a catch-up."""
+        rows = np.arange(columns.first_row, columns.first_row + len(columns), dtype=np.int64)
+        live_count = sum(len(document_rows) for document_rows in self._document_rows.values()) + len(rows)
+        target = select_index_type(
+            live_count, self.index_type, self.forced_index_type, VECTOR_INDEX_FLAT_MAX, VECTOR_INDEX_HNSW_MAX
+        )
+        # Moving to another index structure is slow, build it while searches continue on the old one
+        rebuilt = None
+        if self.index is None or target != self.index_type:
+            rebuilt = self._build(target, list(self._document_rows), vectors, rows)
+
+        with self._lock.write():
+            if rebuilt is not None:
+                self._set_index(rebuilt, target)
+            else:
+                assert self.index is not None
+                self.index.add_with_ids(vectors, rows)
+
+            self._next_row = max(self._next_row, columns.first_row + len(columns))
+            self._chunks.add(columns)
+            self._document_rows[document.id] = rows
+            self._vectors[document.id] = vectors
+            self.documents[document.id] = document
+            if name is not None:
+                self._document_names[document.id] = name
+
+    def _delete(self, document_id: UUID) -> Optional[int]:
+        """Remove a document's rows; returns their count, or None if it was not indexed."""
+        rows = self._document_rows.get(document_id)
+        if rows is None:
+            return None
+
+        remaining = [doc_id for doc_id in self._document_rows if doc_id != document_id]
+        removable = self.index_type is not None and supports_removal(self.index_type)
+        compacted = None
+        if (
+            self.index is not None and self.index_type is not None and remaining and not removable
+            and len(self._tombstones) + len(rows) > TOMBSTONE_COMPACTION_RATIO * self.index.ntotal
+        ):
+            compacted = self._build(self.index_type, remaining)
+
+        with self._lock.write():
+            del self._document_rows[document_id]
+            del self._vectors[document_id]
+            self.documents.pop(document_id, None)
+            self._document_names.pop(document_id, None)
+
+            if not self.documents:
+                # Last document gone, drop the index instead of deleting row by row
+                self._set_index(None, None)
+                self._chunks.clear()
+            elif self.index is not None:
+                self._chunks.remove(document_id)
+                if compacted is not None and self.index_type is not None:
+                    self._set_index(compacted, self.index_type)
+                elif removable:
+                    self.index.remove_ids(rows)
+                else:
+                    self._tombstones.update(rows.tolist())
+        return len(rows)
+
+    def _build(
+        self,
+        index_type: VectorIndexType,
+        document_ids: List[UUID],
+        vectors: np.ndarray | None = None,
+        rows: np.ndarray | None = None
+    ) -> faiss.Index:
+        """Build an index of `index_type` from the stored vectors of `document_ids`, plus new `vectors` under `rows`."""
+        # Never read back from the index: IVF-PQ has no direct map and its codes are lossy
+        all_rows = [self._document_rows[document_id] for document_id in document_ids]
+        all_vectors = [self._vectors[document_id] for document_id in document_ids]
+        if vectors is not None and rows is not None:
+            all_rows.append(rows)
+            all_vectors.append(vectors)
+
+        logger.info(f"Building {index_type.value} index for {sum(len(r) for r in all_rows)} vectors")
+        return build_index(index_type, np.concatenate(all_vectors), np.concatenate(all_rows), self.index_profile)
+
+    def _reset(self) -> None:
+        with self._lock.write():
+            self._set_index(None, None)
+            self.documents.clear()
+            self._chunks.clear()
+            self._document_rows.clear()
+            self._vectors.clear()
+            self._document_names.clear()
+
+    def _set_index(self, index: Optional[faiss.Index], index_type: Optional[VectorIndexType]) -> None:
+        self.index = index
+        self.index_type = index_type
+        self._tombstones = set()
+
+    def _refresh_loop(self) -> None:
+        while not self._closed.wait(INDEX_REFRESH_INTERVAL):
+            try:
+                self._refresh()
+            except Exception as e:
+                logger.warning(f"Could not apply index changes of other workers: {e}")
+
+    def _refresh(self) -> None:
+        """Apply the changes other workers published since this one last looked."""
+        if self._snapshots is None or self._snapshots.journal_end() == self._journal_position:
+            return
+        # Searches go on with the current state while another thread applies the changes
+        if not self._write_mutex.acquire(blocking=False):
+            return
+        try:
+            self._catch_up()
+        finally:
+            self._write_mutex.release()
+
+    def _catch_up(self) -> bool:
+        """
+        Apply the journal entries this worker has not seen, starting from the current checkpoint
+        on first use. The caller holds the write mutex.
+
+        Returns:
+            False when files it needed were pruned meanwhile; the state is then left as it was
+        """
+        assert self._snapshots is not None
+        try:
+            if self._journal_position is None:
+                self._load_checkpoint()
+            assert self._journal_position is not None
+            entries, end = self._snapshots.read_journal(self._journal_position)
+            if entries and self._index_mapped:
+                self._unmap_index()
+        except FileNotFoundError:
+            # Checkpoint or journal segment superseded and pruned; the next call starts over from the newest checkpoint
+            logger.warning("Index files were pruned while catching up, reloading on next access")
+            self._journal_position = None
+            return False
+
+        for entry, position in entries:
+            self._apply(entry)
+            self._journal_position = position
+            self._journal_seq = entry["seq"]
+        self._journal_position = end
+        if entries:
+            logger.info(f"Applied {len(entries)} index changes up to {self._journal_seq}")
+        return True
+
+    def _load_checkpoint(self) -> None:
+        """Replace the whole state with the current checkpoint, or with an empty index before the first one."""
+        assert self._snapshots is not None
+        checkpoint = self._snapshots.load_checkpoint()
+        index, mmap = None, False
+        chunks = ChunkStore()
+        documents: dict[UUID, PDFDocument] = {}
+        document_rows: dict[UUID, np.ndarray] = {}
+        vectors: dict[UUID, np.ndarray] = {}
+        document_names: dict[UUID, str] = {}
+        if checkpoint is not None:
+            for document_id, name, first_row in checkpoint.documents:
+                stored = self._snapshots.read_document(name)
+                columns = ChunkColumns(replace(stored.document, chunks=stored.chunks), first_row)
+                chunks.add(columns)
+                documents[document_id] = stored.document
+                document_rows[document_id] = np.arange(first_row, first_row + len(columns), dtype=np.int64)
+                vectors[document_id] = stored.vectors
+                document_names[document_id] = name
+            if checkpoint.has_index:
+                # Mapped only while no later change has to be applied to it
+                mmap = self._snapshots.journal_end() == JournalPosition(checkpoint.seq, 0)
+                index = self._snapshots.load_index(checkpoint.name, mmap)
+
+        with self._lock.write():
+            self.index = index
+            self.index_type = index_type_of(index) if index is not None else None
+            self._tombstones = checkpoint.tombstones if checkpoint is not None else set()
+            self.documents = documents
+            self._chunks = chunks
+            self._document_rows = document_rows
+            self._vectors = vectors
+            self._document_names = document_names
+            self._next_row = checkpoint.next_row if checkpoint is not None else 0
+            self._checkpoint = checkpoint.name if checkpoint is not None else None
+            self._index_mapped = index is not None and mmap
+            self._journal_position = JournalPosition(checkpoint.seq if checkpoint is not None else 0, 0)
+            self._journal_seq = checkpoint.seq if checkpoint is not None else 0
+        if checkpoint is not None:
+            logger.info(
+                f"Loaded index checkpoint {checkpoint.name} ({len(documents)} documents, {len(chunks)} chunks)"
+            )
+
+    def _unmap_index(self) -> None:
+        """Swap the memory-mapped checkpoint index, which is read-only, for an in-memory copy."""
+        assert self._snapshots is not None and self._checkpoint is not None
+        index = self._snapshots.load_index(self._checkpoint, mmap=False)
+        with self._lock.write():
+            self.index = index
+            self._index_mapped = False
+
+    def _apply(self, entry: dict) -> None:
+        """Apply a change published by another worker."""
+        assert self._snapshots is not None
+        if entry["op"] == "add":
+            first_row, count = entry["first_row"], entry["count"]
+            try:
+                stored = self._snapshots.read_document(entry["name"])
+            except FileNotFoundError:
+                # Removed again, and its files pruned, before this worker got to it
+                self._next_row = max(self._next_row, first_row + count)
+                return
+            columns = ChunkColumns(replace(stored.document, chunks=stored.chunks), first_row)
+            self._insert(stored.document, columns, stored.vectors, entry["name"])
+        elif entry["op"] == "remove":
+            self._delete(UUID(entry["document_id"]))
+        elif entry["op"] == "clear":
+            self._reset()
+
+    @contextmanager
+    def _mutation(self) -> Iterator[List[dict]]:
+        """
+        Wrap a change to the index: serialize it with other writers, apply it on top of every change
+        published so far and publish it in turn.
+
+        The change appends its journal entries to the yielded list. Every `INDEX_CHECKPOINT_INTERVAL`
+        entries, and whenever the index becomes empty, the whole index is checkpointed as well.
+
+        Only one mutation runs at a time, so inside it the state can be read without the read lock;
+        the write lock is needed only to change it.
+        """
+        changes: List[dict] = []
+        if self._snapshots is None:
+            with self._write_mutex:
+                yield changes
+            return
+
+        with self._write_mutex, self._snapshots.lock():
+            # Nothing is pruned while the lock is held, so a second attempt finds every file
+            if not self._catch_up() and not self._catch_up():
+                raise RuntimeError("Could not load the published index")
+            if self._index_mapped:
+                self._unmap_index()
+
+            yield changes
+            if not changes:
+                return
+
+            assert self._journal_position is not None
+            for change in changes:
+                self._journal_seq += 1
+                change["seq"] = self._journal_seq
+            self._journal_position = self._snapshots.append(changes, self._journal_position)
+
+            if self.documents and self._journal_seq - self._snapshots.checkpoint_seq() < INDEX_CHECKPOINT_INTERVAL:
+                return
+            self._checkpoint = self._snapshots.save_checkpoint(
+                self.index,
+                self._journal_seq,
+                self._next_row,
+                self._tombstones,
+                [
+                    (document_id, self._document_names[document_id], int(self._document_rows[document_id][0]))
+                    for document_id in self.documents
+                ]
+            )
+            self._journal_position = JournalPosition(self._journal_seq, 0)
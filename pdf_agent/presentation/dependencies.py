@@ -1,4 +1,5 @@
 from collections.abc import Callable
+from threading import Lock
 from typing import Any, overload
 
 from pdf_agent.application.base_service import BaseService
@@ -8,6 +9,28 @@ logger = get_logger()
 
 # Singleton storage for service instances
 _service_instances: dict[type, Any] = {}
+# Warm-up creates services from a background thread while requests may already ask for them
+_service_lock = Lock()
+
+
+def get_service_instance(service_class: type[BaseService]) -> Any:
+    """Return the singleton instance of a service, creating it on first use."""
+    with _service_lock:
+        if service_class not in _service_instances:
+            _service_instances[service_class] = service_class()
+            logger.info(f"Created new singleton instance of {service_class.__name__}")
+        return _service_instances[service_class]
+
+
+async def shutdown_services() -> None:
+    """Close the service instances created so far, e.g. to write out what they still buffer."""
+    with _service_lock:
+        services = list(_service_instances.values())
+    for service in services:
+        try:
+            await service.close()
+        except Exception as e:
+            logger.error(f"Error closing {type(service).__name__}: {e}")
 
 
 @overload
@@ -28,10 +51,7 @@ def get_service(service_class: type[Any]) -> Callable[..., Any]:
     def service_dependency() -> Any:
         if issubclass(service_class, BaseService):
             # Return existing instance or create new one
-            if service_class not in _service_instances:
-                _service_instances[service_class] = service_class()
-                logger.info(f"Created new singleton instance of {service_class.__name__}")
-            return _service_instances[service_class]
+            return get_service_instance(service_class)
         raise ValueError(f'Unsupported service class: {service_class}')
 
     return service_dependency
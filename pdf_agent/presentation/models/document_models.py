@@ -0,0 +1,25 @@
+"""API models for the indexed document corpus."""
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+class DocumentInfo(BaseModel):
+    """An indexed PDF document."""
+    id: UUID
+    filename: str
+    total_pages: int
+    total_chunks: int
+    upload_date: str
+
+
+class ListDocumentsResponse(BaseModel):
+    """All indexed documents."""
+    documents: list[DocumentInfo]
+    total: int
+
+
+class RemoveDocumentResponse(BaseModel):
+    """Result of removing a document from the index."""
+    status: str
+    message: str
@@ -0,0 +1,22 @@
+"""API models for background ingestion jobs."""
+from datetime import datetime
+from typing import Any
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+
+class IngestionJobResponse(BaseModel):
+    """Status of a background PDF ingestion."""
+    id: UUID = Field(..., description="Job id, poll GET /api/jobs/{id} for progress")
+    filename: str
+    stage: str = Field(..., description="queued, extracting, chunking, embedding, indexing, completed or failed")
+    pages_done: int
+    pages_total: int
+    chunks_done: int
+    chunks_total: int
+    progress: float = Field(..., description="Overall completion between 0 and 1")
+    result: dict[str, Any] | None = Field(None, description="Indexed document info once completed")
+    error: str | None = None
+    created_at: datetime
+    updated_at: datetime
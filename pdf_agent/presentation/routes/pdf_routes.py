@@ -1,84 +1,125 @@
 """API routes for PDF Q&A."""
 import os
-import tempfile
+from typing import Any, AsyncIterator
+from uuid import UUID
 
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 
 from pdf_agent.application.services.pdf_qa_service import PDFQAService
 from pdf_agent.configs.log import get_logger
+from pdf_agent.errors import DataNotFoundException
 from pdf_agent.presentation.dependencies import get_service
+from pdf_agent.presentation.models.document_models import ListDocumentsResponse, RemoveDocumentResponse
+from pdf_agent.presentation.models.job_models import IngestionJobResponse
 from pdf_agent.presentation.models.pdf_models import (
-    AskQuestionRequest, AskQuestionResponse, ClearAllResponse, ClearConversationResponse, GetConversationResponse,
-    GetDocumentInfoResponse, UploadPDFResponse
+    AskQuestionRequest, AskQuestionResponse, ClearAllResponse, ClearConversationResponse, GetConversationResponse
 )
+from pdf_agent.presentation.utils.sse import SSE_HEADERS, sse_stream
+from pdf_agent.presentation.utils.upload import UPLOAD_OPENAPI_EXTRA, stream_pdf_upload
 
 logger = get_logger()
 router = APIRouter()
 
+CONVERSATION_ID_DESCRIPTION = "Conversation to continue, as returned in the `X-Conversation-Id` response header"
+UNKNOWN_CONVERSATION_DETAIL = "Conversation not found; ask without `X-Conversation-Id` to start a new one"
+REQUEST_DEADLINE_DESCRIPTION = "Unix time (seconds) by which the answer is needed; shortens `AGENT_TIMEOUT_SECONDS`"
 
-@router.post("/upload", response_model=UploadPDFResponse, summary="Upload a PDF file")
+
+@router.post(
+    "/upload",
+    response_model=IngestionJobResponse,
+    status_code=202,
+    summary="Upload a PDF file",
+    openapi_extra=UPLOAD_OPENAPI_EXTRA
+)
 async def upload_pdf(
-    file: UploadFile = File(...),
+    request: Request,
     service: PDFQAService = Depends(get_service(PDFQAService))
-) -> UploadPDFResponse:
+) -> IngestionJobResponse:
     """
-    Upload and index a PDF file for Q&A.
+    Upload a PDF file and queue it for indexing.
 
-    - **file**: PDF file to upload
+    - **file**: PDF file to upload (at most `MAX_UPLOAD_SIZE_MB`)
 
-    Returns document information and indexing status.
+    Returns the ingestion job right away; poll `/api/jobs/{id}` for progress.
     """
-    # Validate file type
-    if not file.filename or not file.filename.endswith('.pdf'):
-        raise HTTPException(status_code=400, detail="Only PDF files are supported")
+    # Stream to a temporary file; non-PDF and oversized uploads are rejected mid-stream
+    upload = await stream_pdf_upload(request)
 
-    logger.info(f"Received PDF upload: {file.filename}")
+    logger.info(f"Received PDF upload: {upload.filename} ({upload.size} bytes, sha256={upload.content_hash})")
 
-    # Save to temporary file
     try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp_file:
-            content = await file.read()
-            tmp_file.write(content)
-            tmp_path = tmp_file.name
-
-        # Process and index
-        result = service.upload_and_index_pdf(tmp_path, file.filename or "unknown.pdf")
+        # The ingestion job owns the temp file from here on
+        job = service.submit_pdf(upload.path, upload.filename, content_hash=upload.content_hash)
+    except Exception as e:
+        logger.error(f"Error queuing PDF: {e}")
+        os.unlink(upload.path)
+        raise HTTPException(status_code=500, detail=str(e))
 
-        # Clean up temp file
-        os.unlink(tmp_path)
+    return IngestionJobResponse(**job)
 
-        if result.get("status") == "error":
-            raise HTTPException(status_code=500, detail=result.get("message"))
 
-        return UploadPDFResponse(**result)
+@router.get("/jobs/{job_id}", response_model=IngestionJobResponse, summary="Get ingestion job status")
+async def get_ingestion_job(
+    job_id: UUID,
+    service: PDFQAService = Depends(get_service(PDFQAService))
+) -> IngestionJobResponse:
+    """
+    Get the stage and progress of a PDF ingestion job.
 
-    except Exception as e:
-        logger.error(f"Error uploading PDF: {e}")
-        # Clean up temp file if it exists
-        if 'tmp_path' in locals():
-            try:
-                os.unlink(tmp_path)
-            except Exception:
-                pass
-        raise HTTPException(status_code=500, detail=str(e))
+    Stages: queued, extracting, chunking, embedding, indexing, completed, failed.
+    """
+    job = service.get_ingestion_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Ingestion job not found")
+    return IngestionJobResponse(**job)
 
 
 @router.post("/ask", response_model=AskQuestionResponse, summary="Ask a question")
 async def ask_question(
     request: AskQuestionRequest,
+    response: Response,
+    document_ids: list[UUID] | None = Query(None, description="Only search these documents"),
+    x_conversation_id: UUID | None = Header(None, description=CONVERSATION_ID_DESCRIPTION),
+    cache_control: str | None = Header(None, description="`no-cache` to bypass the answer cache"),
+    x_request_deadline: float | None = Header(None, description=REQUEST_DEADLINE_DESCRIPTION),
     service: PDFQAService = Depends(get_service(PDFQAService))
 ) -> AskQuestionResponse:
     """
-    Ask a question about the uploaded PDF.
+    Ask a question about the uploaded PDFs.
 
-    - **question**: Natural language question about the document
+    - **question**: Natural language question about the documents
+    - **document_ids**: Optional documents to restrict the search to (all documents by default)
 
-    Returns an answer grounded in the PDF content with source citations.
+    Returns an answer grounded in the PDF content with source citations. Repeated questions are
+    answered from cache; the `X-Cache` response header is HIT, MISS or BYPASS. Send
+    `Cache-Control: no-cache` to always get a fresh answer.
+
+    Send the `X-Conversation-Id` returned by the first question with the follow-up questions to
+    keep the conversation's history. An id the server does not know (expired, cleared, or held by
+    another worker without `PERSIST_CONVERSATIONS`) is answered with 404.
+
+    The agent stops searching once its iteration, token or time budget is spent and answers with
+    what it found; the `X-Agent-Budget-Exhausted` response header then names the limit reached.
     """
     logger.info(f"Received question: {request.question}")
 
     try:
-        result = service.ask_question(request.question)
+        result = await service.ask_question(
+            request.question,
+            conversation_id=x_conversation_id,
+            document_ids=document_ids,
+            use_cache=_use_answer_cache(cache_control),
+            deadline=x_request_deadline
+        )
+        if "cache" in result:
+            response.headers["X-Cache"] = result["cache"].value
+        if "conversation_id" in result:
+            response.headers["X-Conversation-Id"] = result["conversation_id"]
+        exhausted = result.get("budget", {}).get("exhausted")
+        if exhausted:
+            response.headers["X-Agent-Budget-Exhausted"] = exhausted
 
         return AskQuestionResponse(
             answer=result.get("answer", ""),
@@ -86,30 +127,124 @@ async def ask_question(
             error=result.get("error")
         )
 
+    except DataNotFoundException:
+        raise HTTPException(status_code=404, detail=UNKNOWN_CONVERSATION_DETAIL)
     except Exception as e:
         logger.error(f"Error answering question: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/document", response_model=GetDocumentInfoResponse, summary="Get document info")
-async def get_document_info(service: PDFQAService = Depends(get_service(PDFQAService))) -> GetDocumentInfoResponse:
+@router.post(
+    "/ask/stream",
+    summary="Ask a question and stream the answer",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"text/event-stream": {}}}}
+)
+async def ask_question_stream(
+    request: AskQuestionRequest,
+    document_ids: list[UUID] | None = Query(None, description="Only search these documents"),
+    x_conversation_id: UUID | None = Header(None, description=CONVERSATION_ID_DESCRIPTION),
+    cache_control: str | None = Header(None, description="`no-cache` to bypass the answer cache"),
+    x_request_deadline: float | None = Header(None, description=REQUEST_DEADLINE_DESCRIPTION),
+    service: PDFQAService = Depends(get_service(PDFQAService))
+) -> StreamingResponse:
     """
-    Get information about the currently indexed document.
+    Ask a question about the uploaded PDFs and stream the agent's progress as server-sent events.
+
+    - **tool_call**: the agent searches the documents (`name`, `args`)
+    - **tool_result**: a search returned (`name`, `pages` retrieved)
+    - **token**: a piece of LLM output (`content`), as soon as it is generated
+    - **answer**: always last, with the same `answer`, `sources` and `error` as `/api/ask`, plus `cache`
+      and `budget_exhausted` (the limit that cut the agent short, or null)
 
-    Returns document metadata including filename, page count, and chunk count.
+    An unknown `X-Conversation-Id` is answered with 404, as for `/api/ask`.
     """
-    info = service.get_document_info()
-    return GetDocumentInfoResponse(**info)
+    logger.info(f"Received question to stream: {request.question}")
+
+    # Headers go out before the first event, so the conversation is looked up, or started, here
+    conversation = await service.open_conversation(x_conversation_id)
+    if conversation is None:
+        raise HTTPException(status_code=404, detail=UNKNOWN_CONVERSATION_DETAIL)
+    conversation_id = conversation.id
+
+    async def events() -> AsyncIterator[tuple[str, Any]]:
+        async for event, data in service.stream_question(
+            request.question,
+            conversation_id=conversation_id,
+            document_ids=document_ids,
+            use_cache=_use_answer_cache(cache_control),
+            deadline=x_request_deadline
+        ):
+            if event == "answer":
+                data = {
+                    **AskQuestionResponse(
+                        answer=data.get("answer", ""),
+                        sources=data.get("sources", []),
+                        error=data.get("error")
+                    ).model_dump(mode="json"),
+                    "cache": data.get("cache"),
+                    "budget_exhausted": data.get("budget", {}).get("exhausted")
+                }
+            yield event, data
+
+    return StreamingResponse(
+        sse_stream(events()),
+        media_type="text/event-stream",
+        headers={**SSE_HEADERS, "X-Conversation-Id": str(conversation_id)}
+    )
+
+
+def _use_answer_cache(cache_control: str | None) -> bool:
+    """Cache-Control: no-cache (or no-store) on the request asks for a fresh answer."""
+    directives = {directive.strip().lower() for directive in (cache_control or "").split(",")}
+    return not directives & {"no-cache", "no-store"}
+
+
+@router.get("/documents", response_model=ListDocumentsResponse, summary="List indexed documents")
+def list_documents(service: PDFQAService = Depends(get_service(PDFQAService))) -> ListDocumentsResponse:
+    """
+    List every document in the index.
+
+    Returns document metadata including id, filename, page count, and chunk count.
+    """
+    documents = service.list_documents()
+    return ListDocumentsResponse(documents=documents, total=len(documents))
+
+
+@router.delete("/documents/{document_id}", response_model=RemoveDocumentResponse, summary="Remove a document")
+def remove_document(
+    document_id: UUID,
+    service: PDFQAService = Depends(get_service(PDFQAService))
+) -> RemoveDocumentResponse:
+    """
+    Remove a document and its chunks from the index.
+
+    Other documents stay indexed.
+    """
+    # A plain function, run in the threadpool: removing may compact the index and publishes the change
+    result = service.remove_document(document_id)
+    return RemoveDocumentResponse(**result)
+
+
+@router.get("/stats", summary="Get cache statistics")
+def get_stats(service: PDFQAService = Depends(get_service(PDFQAService))) -> dict[str, Any]:
+    """
+    Get hit/miss counters and sizes of the service caches.
+    """
+    return service.get_stats()
 
 
 @router.get("/conversation", response_model=GetConversationResponse, summary="Get conversation history")
-async def get_conversation(service: PDFQAService = Depends(get_service(PDFQAService))) -> GetConversationResponse:
+async def get_conversation(
+    x_conversation_id: UUID = Header(..., description=CONVERSATION_ID_DESCRIPTION),
+    service: PDFQAService = Depends(get_service(PDFQAService))
+) -> GetConversationResponse:
     """
-    Get the conversation history for the current session.
+    Get the history of the conversation named by the `X-Conversation-Id` header.
 
-    Returns list of messages with timestamps.
+    Returns list of messages with timestamps (empty once the conversation expired and is not stored).
     """
-    history = service.get_conversation_history()
+    history = await service.get_conversation_history(x_conversation_id)
     return GetConversationResponse(
         conversation=history,
         message_count=len(history)
@@ -117,22 +252,25 @@ async def get_conversation(service: PDFQAService = Depends(get_service(PDFQAServ
 
 
 @router.delete("/conversation", response_model=ClearConversationResponse, summary="Clear conversation")
-async def clear_conversation(service: PDFQAService = Depends(get_service(PDFQAService))) -> ClearConversationResponse:
+async def clear_conversation(
+    x_conversation_id: UUID = Header(..., description=CONVERSATION_ID_DESCRIPTION),
+    service: PDFQAService = Depends(get_service(PDFQAService))
+) -> ClearConversationResponse:
     """
-    Clear the current conversation history.
+    Clear the history of the conversation named by the `X-Conversation-Id` header.
 
-    Keeps the indexed document but resets the conversation.
+    Keeps the indexed documents; ask without the id to start a new conversation.
     """
-    result = service.clear_conversation()
+    result = await service.clear_conversation(x_conversation_id)
     return ClearConversationResponse(**result)
 
 
 @router.delete("/all", response_model=ClearAllResponse, summary="Clear everything")
 async def clear_all(service: PDFQAService = Depends(get_service(PDFQAService))) -> ClearAllResponse:
     """
-    Clear the indexed document and conversation.
+    Clear the indexed documents and conversation.
 
     Resets the service to initial state.
     """
-    result = service.clear_all()
+    result = await service.clear_all()
     return ClearAllResponse(**result)
@@ -0,0 +1,21 @@
+import json
+from typing import Any, AsyncIterable, AsyncIterator
+
+from pdf_agent.presentation.utils.response import CustomJSONEncoder
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    # Keep reverse proxies such as nginx from buffering the stream
+    "X-Accel-Buffering": "no"
+}
+
+
+def sse_event(event: str, data: Any) -> str:
+    """Format one server-sent event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data, cls=CustomJSONEncoder)}\n\n"
+
+
+async def sse_stream(events: AsyncIterable[tuple[str, Any]]) -> AsyncIterator[str]:
+    """Format (event, data) pairs as a server-sent event stream."""
+    async for event, data in events:
+        yield sse_event(event, data)
@@ -0,0 +1,201 @@
+"""Streaming multipart upload handling for PDF files."""
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass
+from typing import BinaryIO
+
+from fastapi import HTTPException, Request
+from python_multipart.multipart import MultipartParser, parse_options_header
+from starlette.concurrency import run_in_threadpool
+
+from pdf_agent.configs.env import MAX_UPLOAD_SIZE_MB, UPLOAD_BLOCK_SIZE
+
+PDF_MAGIC = b"%PDF"
+
+# Allowance for multipart boundaries and part headers when checking Content-Length
+MULTIPART_OVERHEAD = 64 * 1024
+
+UPLOAD_OPENAPI_EXTRA = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["file"],
+                    "properties": {"file": {"type": "string", "format": "binary"}}
+                }
+            }
+        }
+    }
+}
+
+
+@dataclass
+class StoredUpload:
+    """A PDF upload written to a temporary file."""
+    path: str
+    filename: str
+    size: int
+    content_hash: str
+
+
+class _PDFPartWriter:
+    """Multipart parser callbacks that write the file part to disk in fixed-size blocks."""
+
+    def __init__(self, field_name: str, max_size: int, block_size: int):
+        self.field_name = field_name.encode()
+        self.max_size = max_size
+        self.block_size = max(block_size, len(PDF_MAGIC))
+        self.filename: str | None = None
+        self.path: str | None = None
+        self.size = 0
+        self._file: BinaryIO | None = None
+        self._digest = hashlib.sha256()
+        self._buffer = bytearray()
+        self._magic_checked = False
+        self._in_file_part = False
+        self._header_field = b""
+        self._header_value = b""
+        self._disposition = b""
+
+    def callbacks(self) -> dict:
+        return {
+            "on_part_begin": self.on_part_begin,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end
+        }
+
+    def on_part_begin(self) -> None:
+        self._disposition = b""
+
+    def on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_field += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def on_header_end(self) -> None:
+        if self._header_field.lower() == b"content-disposition":
+            self._disposition = self._header_value
+        self._header_field = b""
+        self._header_value = b""
+
+    def on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._disposition)
+        self._in_file_part = options.get(b"name") == self.field_name and b"filename" in options
+        if not self._in_file_part:
+            return
+
+        if self.path is not None:
+            raise HTTPException(status_code=400, detail="Only one PDF file can be uploaded at a time")
+
+        self.filename = options[b"filename"].decode("utf-8", "replace")
+        if not self.filename.lower().endswith(".pdf"):
+            raise HTTPException(status_code=400, detail="Only PDF files are supported")
+
+        fd, self.path = tempfile.mkstemp(suffix=".pdf")
+        self._file = os.fdopen(fd, "wb")
+
+    def on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if not self._in_file_part:
+            return
+
+        self.size += end - start
+        if self.size > self.max_size:
+            raise HTTPException(
+                status_code=413,
+                detail=f"PDF exceeds the maximum upload size of {self.max_size // (1024 * 1024)} MB"
+            )
+
+        block = data[start:end]
+        self._digest.update(block)
+        self._buffer += block
+
+        # Nothing is flushed before a full block is buffered, so the header is still in memory
+        if not self._magic_checked and len(self._buffer) >= len(PDF_MAGIC):
+            if not self._buffer.startswith(PDF_MAGIC):
+                raise HTTPException(status_code=400, detail="Uploaded file is not a valid PDF")
+            self._magic_checked = True
+
+    def on_part_end(self) -> None:
+        self._in_file_part = False
+
+    def flush(self) -> None:
+        """Write out every complete block currently buffered."""
+        if self._file is None:
+            return
+        while len(self._buffer) >= self.block_size:
+            self._file.write(self._buffer[:self.block_size])
+            del self._buffer[:self.block_size]
+
+    def close(self) -> StoredUpload:
+        """Write the trailing partial block and return the stored upload."""
+        if self._file is None or self.path is None or self.filename is None:
+            raise HTTPException(status_code=400, detail="No PDF file found in the upload")
+        if not self._magic_checked:
+            raise HTTPException(status_code=400, detail="Uploaded file is not a valid PDF")
+
+        self._file.write(self._buffer)
+        self._buffer.clear()
+        self._file.close()
+        self._file = None
+
+        return StoredUpload(
+            path=self.path,
+            filename=self.filename,
+            size=self.size,
+            content_hash=self._digest.hexdigest()
+        )
+
+    def discard(self) -> None:
+        """Close and delete the partially written file."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self.path is not None and os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+async def stream_pdf_upload(
+    request: Request,
+    field_name: str = "file",
+    max_size: int = MAX_UPLOAD_SIZE_MB * 1024 * 1024,
+    block_size: int = UPLOAD_BLOCK_SIZE
+) -> StoredUpload:
+    """
+    Stream the PDF part of a multipart request to a temporary file.
+
+    The body is consumed as it arrives: the SHA-256 content hash is computed on the fly,
+    and uploads that are too large or do not start with the %PDF magic bytes are
+    rejected as soon as that is known, without reading the rest of the body.
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type"))
+    boundary = params.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise HTTPException(status_code=400, detail="Expected a multipart/form-data upload")
+
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > max_size + MULTIPART_OVERHEAD:
+        raise HTTPException(
+            status_code=413,
+            detail=f"PDF exceeds the maximum upload size of {max_size // (1024 * 1024)} MB"
+        )
+
+    writer = _PDFPartWriter(field_name, max_size, block_size)
+    parser = MultipartParser(boundary, callbacks=writer.callbacks())  # type: ignore[arg-type]
+
+    try:
+        async for chunk in request.stream():
+            parser.write(chunk)
+            await run_in_threadpool(writer.flush)
+        parser.finalize()
+        return await run_in_threadpool(writer.close)
+    except BaseException:
+        writer.discard()
+        raise
@@ -0,0 +1,43 @@
+import asyncio
+import time
+from typing import Optional
+
+from pdf_agent.application.services.pdf_qa_service import PDFQAService
+from pdf_agent.configs.log import get_logger
+from pdf_agent.presentation.dependencies import get_service_instance
+
+logger = get_logger()
+
+
+class WarmUpState:
+    """Progress of the startup warm-up of this worker, reported by the readiness endpoint."""
+
+    def __init__(self) -> None:
+        self.ready = False
+        self.error: Optional[str] = None
+        self.seconds: Optional[float] = None
+
+
+warm_up_state = WarmUpState()
+
+
+def _warm_up() -> None:
+    # Creating the service loads the embedding model and the latest index snapshot
+    service = get_service_instance(PDFQAService)
+    service.warm_up()
+
+
+async def warm_up_services() -> None:
+    """Build the service singletons and exercise them in a worker thread, then mark the worker ready."""
+    started = time.perf_counter()
+    try:
+        await asyncio.to_thread(_warm_up)
+    except Exception as e:
+        # The worker stays unready so the load balancer keeps traffic away from it
+        warm_up_state.error = str(e)
+        logger.exception(f"Warm-up failed: {e}")
+        return
+
+    warm_up_state.seconds = time.perf_counter() - started
+    warm_up_state.ready = True
+    logger.info(f"Warm-up finished in {warm_up_state.seconds:.2f}s")
@@ -0,0 +1,129 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Callable, Generic, Hashable, NamedTuple, Optional, TypeVar
+
+K = TypeVar('K', bound=Hashable)
+V = TypeVar('V')
+
+
+class _Entry(NamedTuple, Generic[V]):
+    value: V
+    expires_at: float
+    size: int
+
+
+class LRUCache(Generic[K, V]):
+    """
+    Thread-safe cache that evicts the least recently used entry once `max_entries` is reached.
+
+    Optionally entries expire `ttl_seconds` after being set (or, with `sliding_ttl`, after their
+    last use), and the cache is also bounded to `max_bytes` as measured by `sizeof`.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+        sizeof: Optional[Callable[[V], int]] = None,
+        sliding_ttl: bool = False
+    ):
+        if max_bytes is not None and sizeof is None:
+            raise ValueError('max_bytes requires a sizeof function')
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.sliding_ttl = sliding_ttl
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._entries: OrderedDict[K, _Entry[V]] = OrderedDict()
+        self._lock = Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: K) -> V | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            if self.sliding_ttl:
+                self._entries[key] = entry._replace(expires_at=self._expires_at())
+            self.hits += 1
+            return entry.value
+
+    def set(self, key: K, value: V) -> None:
+        size = self._sizeof(value) if self._sizeof else 0
+        with self._lock:
+            self._purge_expired()
+            self._remove(key)
+            self._entries[key] = _Entry(value, self._expires_at(), size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes is not None and self._bytes > self.max_bytes and len(self._entries) > 1
+            ):
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+                self.evictions += 1
+
+    def pop(self, key: K) -> V | None:
+        with self._lock:
+            entry = self._remove(key)
+            return entry.value if entry is not None else None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict[str, int | float | None]:
+        with self._lock:
+            self._purge_expired()
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'bytes': self._bytes if self._sizeof else None,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+
+    def _expires_at(self) -> float:
+        return time.monotonic() + self.ttl_seconds if self.ttl_seconds is not None else float('inf')
+
+    def _purge_expired(self) -> None:
+        """Drop expired entries from the least recently used end (exact with a sliding TTL)."""
+        now = time.monotonic()
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if entry.expires_at > now:
+                break
+            self._remove(key)
+            self.expirations += 1
+
+    def _remove(self, key: K) -> Optional[_Entry[V]]:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+        return entry
+
+    def __contains__(self, key: object) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)  # type: ignore[call-overload]
+            return entry is not None and entry.expires_at > time.monotonic()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
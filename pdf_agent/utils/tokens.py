@@ -0,0 +1,29 @@
+from functools import lru_cache
+from typing import Any, Callable
+
+from pdf_agent.configs.log import get_logger
+
+logger = get_logger()
+
+# Typical characters per token of English text, used when no tokenizer is available
+CHARS_PER_TOKEN = 4
+
+
+@lru_cache(maxsize=1)
+def _encoder() -> Callable[[str], Any] | None:
+    try:
+        import tiktoken
+
+        # tiktoken downloads the encoding on first use, which fails on offline hosts
+        return tiktoken.get_encoding('cl100k_base').encode
+    except Exception as e:
+        logger.warning(f'tiktoken encoding unavailable, approximating token counts: {e}')
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """Number of tokens in `text`; an estimate for models whose tokenizer differs from cl100k."""
+    encode = _encoder()
+    if encode is None:
+        return -(-len(text) // CHARS_PER_TOKEN)
+    return len(encode(text))